@@ -4,9 +4,16 @@ import traceback
 
 try:
     from . import config
-    from .apper import apper
+    from .commands.Instrumentation import instrumentation, span
 
-    from .commands.OffsetBoundingBoxCommand import OffsetBoundingBoxCommand, BoxCustomFeature
+    instrumentation.configure(config.INSTRUMENTATION, config.INSTRUMENTATION_BUFFER)
+
+    with span('startup_import', module='apper'):
+        from .apper import apper
+
+    # Commands and the custom feature are registered with stubs that import their modules on first use
+    with span('startup_import', module='LazyCommands'):
+        from .commands.LazyCommands import LazyCommand, LazyCustomFeature
 
     # Create our addin definition object
     my_addin = apper.FusionApp(config.app_name, config.company_name, False)
@@ -14,8 +21,10 @@ try:
 
     my_addin.add_command(
         'Cage',
-        OffsetBoundingBoxCommand,
+        LazyCommand,
         {
+            'command_module': 'OffsetBoundingBoxCommand',
+            'command_class': 'OffsetBoundingBoxCommand',
             'cmd_description': 'Cage Generator for 3D Printing with MJF and SLS',
             'cmd_id': 'offset_b_box',
             'workspace': 'FusionSolidEnvironment',
@@ -29,8 +38,10 @@ try:
 
     my_addin.add_command(
         'Edit Cage',
-        OffsetBoundingBoxCommand,
+        LazyCommand,
         {
+            'command_module': 'OffsetBoundingBoxCommand',
+            'command_class': 'OffsetBoundingBoxCommand',
             'cmd_description': 'Cage Generator for 3D Printing with MJF and SLS',
             'cmd_id': 'offset_b_box_edit',
             'workspace': 'FusionSolidEnvironment',
@@ -42,10 +53,28 @@ try:
         }
     )
 
+    my_addin.add_command(
+        'Cage All',
+        LazyCommand,
+        {
+            'command_module': 'CageAllCommand',
+            'command_class': 'CageAllCommand',
+            'cmd_description': 'Create a cage for each selected body or component',
+            'cmd_id': 'cage_all',
+            'workspace': 'FusionSolidEnvironment',
+            'toolbar_panel_id': 'Commands',
+            'cmd_resources': 'command_icons',
+            'command_visible': True,
+            'command_promoted': False,
+        }
+    )
+
     my_addin.add_custom_feature(
         'Cage',
-        BoxCustomFeature,
+        LazyCustomFeature,
         {
+            'compute_module': 'OffsetBoundingBoxCommand',
+            'compute_class': 'CageFeatureCompute',
             'feature_id': 'offset_b_box_custom_feature',
             'edit_cmd_id': 'offset_b_box_edit',
             'feature_icons': 'command_icons',
@@ -61,7 +90,8 @@ except:
 
 
 def run(context):
-    my_addin.run_app()
+    with span('startup_register'):
+        my_addin.run_app()
 
 
 def stop(context):
@@ -0,0 +1,105 @@
+"""Bounding boxes from body vertex data."""
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+def vertex_bounds(coordinates: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Min and max point of a flat ``[x0, y0, z0, x1, ...]`` list or an (N x 3) array."""
+    vertices = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+    return vertices.min(axis=0), vertices.max(axis=0)
+
+
+def padded_bounds(min_point: Sequence[float], max_point: Sequence[float], padding: float,
+                  limit_min: Sequence[float] = None, limit_max: Sequence[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Grow a box by ``padding`` without letting it exceed an optional limiting box."""
+    b_min = np.asarray(min_point, dtype=float) - padding
+    b_max = np.asarray(max_point, dtype=float) + padding
+    if limit_min is not None:
+        b_min = np.maximum(b_min, limit_min)
+    if limit_max is not None:
+        b_max = np.minimum(b_max, limit_max)
+    return b_min, b_max
+
+
+def combine_bounds(mins: Sequence[Sequence[float]], maxs: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    return np.min(np.asarray(mins, dtype=float).reshape(-1, 3), axis=0), \
+        np.max(np.asarray(maxs, dtype=float).reshape(-1, 3), axis=0)
+
+
+class BoundsAggregate:
+    """Running combined box of a selection, built from a shared per-body store.
+
+    ``store`` maps a body key to ``(version, min, max)`` and is usually shared by several
+    aggregates.  Each aggregate also keeps the version and box it combined for every key, so
+    a body refreshed in the store by another aggregate still counts as changed here.  Adding
+    a body only combines its box with the current result.  Removing a body only triggers a
+    recompute (from the kept boxes, no lookups) when it touched the combined box.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.combined = {}
+        self.min = None
+        self.max = None
+        self.lookups = 0
+
+    @property
+    def selection(self) -> tuple:
+        return tuple(self.combined)
+
+    def body_bounds(self, key, lookup, version=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Box of a body from the store, looked up again when the stored version differs."""
+        entry = self.store.get(key)
+        if entry is None or entry[0] != version:
+            self.lookups += 1
+            entry = (version, *lookup(key))
+            self.store.put(key, entry)
+        return entry[1], entry[2]
+
+    def update(self, keys: Sequence, lookup, versions: Sequence = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Combined box of exactly ``keys``."""
+        keys = tuple(keys)
+        needs_rebuild = self.min is None
+        for key in set(self.combined) - set(keys):
+            _, b_min, b_max = self.combined.pop(key)
+            if not self.is_inside(b_min, b_max):
+                needs_rebuild = True
+        return self.add(keys, lookup, versions, needs_rebuild)
+
+    def add(self, keys: Sequence, lookup, versions: Sequence = None,
+            needs_rebuild: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Combine more bodies into the result without looking at the ones already combined."""
+        keys = tuple(keys)
+        if versions is None:
+            versions = [None] * len(keys)
+
+        added = []
+        for key, version in zip(keys, versions):
+            entry = self.combined.get(key)
+            if entry is not None and entry[0] == version:
+                continue
+            # A changed body may have shrunk, so its old box cannot simply be kept in the result
+            needs_rebuild |= entry is not None
+            self.combined[key] = (version, *self.body_bounds(key, lookup, version))
+            added.append(key)
+
+        if needs_rebuild or self.min is None:
+            self.rebuild()
+        else:
+            for key in added:
+                _, b_min, b_max = self.combined[key]
+                self.min = np.minimum(self.min, b_min)
+                self.max = np.maximum(self.max, b_max)
+        return self.min, self.max
+
+    def rebuild(self):
+        if self.combined:
+            self.min, self.max = combine_bounds([entry[1] for entry in self.combined.values()],
+                                                [entry[2] for entry in self.combined.values()])
+        else:
+            self.min = self.max = None
+
+    def is_inside(self, min_point, max_point) -> bool:
+        """True when the box does not touch the faces of the combined box."""
+        return self.min is not None and bool(np.all(min_point > self.min) and np.all(max_point < self.max))
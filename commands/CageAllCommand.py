@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+import time
+from typing import Callable, Sequence
+
+import adsk.core
+import adsk.fusion
+from ..apper import apper
+
+from .CageLayout import FeatureValues
+from .CageGeometry import expand_box_by_feature_values
+from .OffsetBoundingBoxCommand import create_cage, new_selection_bounds, get_default_offset, get_default_thickness, \
+    add_pattern_input, pattern_from_name, add_orientation_input, orientation_from_name, get_geometry_registry
+
+
+@dataclass
+class BatchResult:
+    created: list
+    cancelled: bool
+    seconds: float
+    # Cages copied from an identical cage instead of built
+    shared: int = 0
+
+    @property
+    def cages_per_second(self) -> float:
+        return len(self.created) / self.seconds if self.seconds > 0 else 0.0
+
+
+def get_item_bodies(item) -> list:
+    """The body, or the bodies of an occurrence and of every occurrence nested in it."""
+    occurrence = adsk.fusion.Occurrence.cast(item)
+    if not occurrence:
+        return [item]
+
+    bodies = [body for body in occurrence.bRepBodies]
+    for child in occurrence.childOccurrences:
+        bodies.extend(get_item_bodies(child))
+    return bodies
+
+
+def create_cages(items: Sequence, feature_values: FeatureValues,
+                 progress: Callable[[int, int], None] = None,
+                 is_cancelled: Callable[[], bool] = None) -> BatchResult:
+    """Create one cage per body or occurrence in a single pass.
+
+    An item can also be an ``(entity, FeatureValues)`` tuple to override the shared values.
+    Cutter templates and per-body bounding boxes are shared by all cages of the batch, and
+    cages of the same size and values are built once and copied.  In a parametric design the
+    new features are collected in one timeline group.
+    """
+    ao = apper.AppObjects()
+    is_parametric = ao.design.designType == adsk.fusion.DesignTypes.ParametricDesignType
+    timeline = ao.design.timeline if is_parametric else None
+    start_index = timeline.markerPosition if is_parametric else 0
+
+    selection_bounds = new_selection_bounds()
+    registry = get_geometry_registry()
+    registry_hits = registry.hits if registry is not None else 0
+    templates = {}
+    created = []
+    cancelled = False
+
+    start = time.perf_counter()
+    for i, item in enumerate(items):
+        if is_cancelled is not None and is_cancelled():
+            cancelled = True
+            break
+
+        if isinstance(item, tuple):
+            entity, values = item
+        else:
+            entity, values = item, feature_values
+
+        bodies = get_item_bodies(entity)
+        if len(bodies) > 0:
+            frame, b_box = selection_bounds.oriented_b_box(bodies, values.orientation)
+            expand_box_by_feature_values(b_box, values)
+            created.append(create_cage(bodies, b_box, values, templates=templates, frame=frame))
+
+        if progress is not None:
+            progress(i + 1, len(items))
+
+    if is_parametric and len(created) > 1:
+        timeline.timelineGroups.add(start_index, timeline.markerPosition - 1)
+
+    shared = registry.hits - registry_hits if registry is not None else 0
+    return BatchResult(created, cancelled, time.perf_counter() - start, shared)
+
+
+class CageAllCommand(apper.Fusion360CommandBase):
+
+    def on_execute(self, command, inputs, args, input_values):
+        ao = apper.AppObjects()
+
+        offset = input_values['offset']
+        feature_values = FeatureValues(
+            input_values['thick_input'], input_values['bar'], input_values['gap'], *([offset] * 6),
+            pattern_from_name(input_values['pattern']), orientation_from_name(input_values['orientation'])
+        )
+        items = input_values['item_select']
+
+        progress_dialog = ao.ui.createProgressDialog()
+        progress_dialog.isCancelButtonShown = True
+        progress_dialog.show('Cage All', 'Creating cage %v of %m', 0, len(items))
+
+        def progress(done, total):
+            progress_dialog.progressValue = done
+            adsk.doEvents()
+
+        try:
+            result = create_cages(items, feature_values, progress, lambda: progress_dialog.wasCancelled)
+        finally:
+            progress_dialog.hide()
+
+        status = 'Cancelled after' if result.cancelled else 'Created'
+        ao.print_msg(f'{status} {len(result.created)} cages in {result.seconds:.2f} s '
+                     f'({result.cages_per_second:.1f} cages/s, {result.shared} copied from identical cages)')
+
+    def on_create(self, command, inputs):
+        ao = apper.AppObjects()
+        units = ao.units_manager.defaultLengthUnits
+
+        selection_input = inputs.addSelectionInput('item_select', "Bodies", "Bodies or components to cage")
+        selection_input.addSelectionFilter('Bodies')
+        selection_input.addSelectionFilter('Occurrences')
+        selection_input.setSelectionLimits(1, 0)
+
+        inputs.addValueInput(
+            'thick_input', "Cage Thickness", units, adsk.core.ValueInput.createByReal(get_default_thickness(units))
+        )
+        inputs.addValueInput('gap', "Bar Spacing", units, adsk.core.ValueInput.createByReal(2))
+        inputs.addValueInput('bar', "Bar Width", units, adsk.core.ValueInput.createByReal(.2))
+        add_pattern_input(inputs, 'grid')
+        add_orientation_input(inputs, 'world')
+        inputs.addValueInput('offset', "Offset", units, adsk.core.ValueInput.createByReal(get_default_offset()))
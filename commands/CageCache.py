@@ -0,0 +1,284 @@
+"""Keys and caches for generated cage bodies."""
+from collections import OrderedDict
+from dataclasses import astuple
+import hashlib
+import os
+from typing import Any, Callable, Hashable, Sequence
+
+import numpy as np
+
+from .CageLayout import FeatureValues
+
+
+# Rough memory footprint of a temporary BRep, per cutter and for the shell
+ESTIMATED_BYTES_PER_CUTTER = 4096
+ESTIMATED_SHELL_BYTES = 16384
+
+
+def cage_key(min_point: Sequence[float], max_point: Sequence[float], feature_values: FeatureValues,
+             digits: int = 6, frame: np.ndarray = None) -> tuple:
+    """Hashable key for a cage at a fixed position.  Lengths are rounded to ``digits`` decimals (cm).
+
+    For a cage turned into ``frame`` the points are in frame coordinates and the frame is part of the key.
+    """
+    values = (*min_point, *max_point, *astuple(feature_values))
+    if frame is not None:
+        values += tuple(np.asarray(frame, dtype=float).ravel().tolist())
+    return tuple(value if isinstance(value, str) else round(value, digits) for value in values)
+
+
+# Change this when cage geometry changes for the same key, so stored fingerprints no longer match
+FINGERPRINT_VERSION = 1
+
+
+def key_fingerprint(key: tuple) -> str:
+    """Short digest of a cage key that is stable across sessions, for storing with a feature."""
+    return hashlib.sha1(repr((FINGERPRINT_VERSION, key)).encode('utf-8')).hexdigest()[:20]
+
+
+def estimate_body_bytes(cutter_count: int) -> int:
+    return ESTIMATED_SHELL_BYTES + cutter_count * ESTIMATED_BYTES_PER_CUTTER
+
+
+class LRUCache:
+    """Least recently used cache bounded by entry count and an estimated size in bytes."""
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 * 2 ** 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: Hashable):
+        return key in self._items
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key: Hashable, value: Any, size: int = 0):
+        if key in self._items:
+            self.total_bytes -= self._items.pop(key)[1]
+
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        self._items[key] = (value, size)
+        self.total_bytes += size
+
+        while len(self._items) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._items.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.put(key, value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._items.pop(key, None)
+        if item is None:
+            return default
+        self.total_bytes -= item[1]
+        return item[0]
+
+    def clear(self):
+        self._items.clear()
+        self.total_bytes = 0
+
+
+class ComputeCache:
+    """Remembers the last key computed for each feature and the bodies built for recent keys.
+
+    It also remembers the key each feature's raw inputs last led to, so a compute with the
+    same inputs can be skipped before the key is worked out again.
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 * 2 ** 20):
+        self.bodies = LRUCache(max_entries, max_bytes)
+        self.feature_keys = {}
+        self.input_keys = {}
+
+    def is_current(self, feature_id: str, key: tuple) -> bool:
+        return self.feature_keys.get(feature_id) == key
+
+    def get_or_create(self, key: tuple, create: Callable[[], Any], size: Callable[[Any], int] = None):
+        body = self.bodies.get(key)
+        if body is None:
+            body = create()
+            self.bodies.put(key, body, size(body) if size is not None else 0)
+        return body
+
+    def set_current(self, feature_id: str, key: tuple):
+        self.feature_keys[feature_id] = key
+
+    def key_for_inputs(self, feature_id: str, inputs: tuple) -> tuple:
+        """Key the feature's ``inputs`` led to last time, or None when they differ."""
+        stored_inputs, key = self.input_keys.get(feature_id, (None, None))
+        return key if stored_inputs == inputs else None
+
+    def set_inputs_key(self, feature_id: str, inputs: tuple, key: tuple):
+        self.input_keys[feature_id] = (inputs, key)
+
+
+class GeometryRegistry:
+    """Cage bodies built at the origin, one per size and ``FeatureValues``.
+
+    Every cage with the same signature gets a copy of the stored body moved into place, so
+    stored bodies are never changed.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 2 ** 20):
+        self.bodies = LRUCache(max_entries, max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key: tuple, create: Callable[[], Any], size: Callable[[Any], int] = None) -> Any:
+        body = self.bodies.get(key)
+        if body is not None:
+            self.hits += 1
+            return body
+
+        self.misses += 1
+        body = create()
+        self.bodies.put(key, body, size(body) if size is not None else 0)
+        return body
+
+    def clear(self):
+        self.bodies.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bodies': len(self.bodies),
+            'bytes': self.bodies.total_bytes,
+        }
+
+
+class DiskCache:
+    """Files in a directory, one per key, bounded by total size with least recently used eviction.
+
+    Values are written and read by the ``save(value, path)`` and ``load(path)`` callables, so
+    the cache does not depend on the file format.  A file that cannot be loaded is removed
+    and counted as a miss, a value that cannot be saved is left out of the cache.  Files are
+    written under a temporary name first, leftovers of interrupted writes are removed on start.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 2 ** 20, extension: str = '.smt'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.failed_writes = 0
+        self.evictions = 0
+
+        self._files = OrderedDict()
+        self.total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(self.temporary_suffix):
+                self._remove(entry.path)
+            elif entry.name.endswith(extension):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.path, stat.st_size))
+        self._files = OrderedDict((path, size) for _, path, size in sorted(files))
+        self.total_bytes = sum(self._files.values())
+
+    @property
+    def temporary_suffix(self) -> str:
+        return '.tmp' + self.extension
+
+    def path(self, key: tuple) -> str:
+        return os.path.join(self.directory, key_fingerprint(key) + self.extension)
+
+    def get(self, key: tuple, load: Callable[[str], Any]) -> Any:
+        path = self.path(key)
+        if path not in self._files:
+            self.misses += 1
+            return None
+
+        try:
+            value = load(path)
+        except Exception:
+            value = None
+        if value is None:
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._files.move_to_end(path)
+        os.utime(path)
+        return value
+
+    def put(self, key: tuple, value: Any, save: Callable[[Any, str], Any]):
+        path = self.path(key)
+        temporary_path = path + self.temporary_suffix
+        try:
+            save(value, temporary_path)
+            os.replace(temporary_path, path)
+        except Exception:
+            self.failed_writes += 1
+            self._remove(temporary_path)
+            return
+
+        if path in self._files:
+            self.total_bytes -= self._files.pop(path)
+        size = os.path.getsize(path)
+        self._files[path] = size
+        self.total_bytes += size
+        self.writes += 1
+
+        while self.total_bytes > self.max_bytes and self._files:
+            self._remove(next(iter(self._files)))
+            self.evictions += 1
+
+    def get_or_create(self, key: tuple, create: Callable[[], Any], load: Callable[[str], Any],
+                      save: Callable[[Any, str], Any]) -> Any:
+        value = self.get(key, load)
+        if value is None:
+            value = create()
+            self.put(key, value, save)
+        return value
+
+    def _remove(self, path: str):
+        self.total_bytes -= self._files.pop(path, 0)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        for path in list(self._files):
+            self._remove(path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'writes': self.writes,
+            'failed_writes': self.failed_writes,
+            'evictions': self.evictions,
+            'files': len(self._files),
+            'bytes': self.total_bytes,
+        }
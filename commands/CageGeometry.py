@@ -0,0 +1,578 @@
+from dataclasses import astuple, replace
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+import adsk.core
+import adsk.fusion
+
+from .BodyBounds import BoundsAggregate, vertex_bounds, padded_bounds
+from .CageCache import ComputeCache, DiskCache, GeometryRegistry, LRUCache, cage_key, estimate_body_bytes, \
+    key_fingerprint
+from .CageLayout import FeatureValues, bar_face_rows, gap_face_rows, gap_layout, shell_extents
+from .Instrumentation import traced, count
+from .OrientedBounds import fit_oriented_box, fit_points
+
+
+# region Geometry Utilities
+def middle(min_p_value: float, max_p_value: float) -> float:
+    return min_p_value + ((max_p_value - min_p_value) / 2)
+
+
+def mid_point(p1: adsk.core.Point3D, p2: adsk.core.Point3D) -> adsk.core.Point3D:
+    return adsk.core.Point3D.create(
+        middle(p1.x, p2.x),
+        middle(p1.y, p2.y),
+        middle(p1.z, p2.z)
+    )
+
+
+def point_tuple(point: adsk.core.Point3D) -> Tuple[float, float, float]:
+    return point.x, point.y, point.z
+
+
+def b_box_points(b_box: adsk.core.BoundingBox3D) -> Tuple[tuple, tuple]:
+    return point_tuple(b_box.minPoint), point_tuple(b_box.maxPoint)
+
+
+def oriented_b_box_from_b_box(b_box: adsk.core.BoundingBox3D) -> adsk.core.OrientedBoundingBox3D:
+    o_box = adsk.core.OrientedBoundingBox3D.create(
+        mid_point(b_box.minPoint, b_box.maxPoint),
+        adsk.core.Vector3D.create(1, 0, 0),
+        adsk.core.Vector3D.create(0, 1, 0),
+        b_box.maxPoint.x - b_box.minPoint.x,
+        b_box.maxPoint.y - b_box.minPoint.y,
+        b_box.maxPoint.z - b_box.minPoint.z
+    )
+    return o_box
+
+
+def b_box_from_points(min_point, max_point) -> adsk.core.BoundingBox3D:
+    return adsk.core.BoundingBox3D.create(
+        adsk.core.Point3D.create(*[float(value) for value in min_point]),
+        adsk.core.Point3D.create(*[float(value) for value in max_point])
+    )
+
+
+def tight_body_bounds(body: adsk.fusion.BRepBody, tolerance: float) -> tuple:
+    """Extents of the body's tessellation.
+
+    The tessellation is within ``tolerance`` of the surface, so the result is padded by it
+    and limited to the (possibly loose) bounding box Fusion reports for the body.
+    """
+    calculator = body.meshManager.createMeshCalculator()
+    calculator.surfaceTolerance = tolerance
+    mesh = calculator.calculate()
+
+    loose_min, loose_max = b_box_points(body.boundingBox)
+    return padded_bounds(*vertex_bounds(mesh.nodeCoordinatesAsDouble), tolerance, loose_min, loose_max)
+
+
+def body_bounds(body: adsk.fusion.BRepBody, tight: bool = False, tolerance: float = 0.005) -> tuple:
+    if tight:
+        return tight_body_bounds(body, tolerance)
+    return tuple(np.array(point) for point in b_box_points(body.boundingBox))
+
+
+def body_points(body: adsk.fusion.BRepBody, tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Tessellation vertices (N x 3) of the body and the few of them an oriented box fit looks at."""
+    calculator = body.meshManager.createMeshCalculator()
+    calculator.surfaceTolerance = tolerance
+    points = np.asarray(calculator.calculate().nodeCoordinatesAsDouble, dtype=float).reshape(-1, 3)
+    return points, fit_points(points)
+
+
+# Boxes of every body seen, shared by all selections.  Entries are keyed by entity token
+# and bounds mode and are replaced when the body's revision changes.
+body_bounds_store = LRUCache(max_entries=4096)
+
+# Tessellation vertices for oriented boxes, keyed and replaced like the boxes above
+body_points_store = LRUCache(max_entries=256, max_bytes=128 * 2 ** 20)
+
+
+class SelectionBounds:
+    """Combined bounding box of a selection that only queries bodies that are new or changed."""
+
+    def __init__(self, tight: bool = False, tolerance: float = 0.005):
+        self.tight = tight
+        self.tolerance = tolerance
+        self.aggregate = BoundsAggregate(body_bounds_store)
+
+    @traced('bounding_box')
+    def b_box(self, bodies: list) -> adsk.core.BoundingBox3D:
+        if len(bodies) == 0:
+            return bounding_box_from_selections(bodies)
+        return self.combine(bodies, self.aggregate.update)
+
+    @traced('bounding_box_extend')
+    def extend(self, bodies: list) -> adsk.core.BoundingBox3D:
+        """Combined box after adding ``bodies`` to the selection.  Only the new bodies are queried."""
+        return self.combine(bodies, self.aggregate.add)
+
+    def combine(self, bodies: list, combine) -> adsk.core.BoundingBox3D:
+        mode = self.tolerance if self.tight else None
+        entities = {(body.entityToken, mode): body for body in bodies}
+        versions = [body.revisionId for body in entities.values()]
+
+        b_min, b_max = combine(
+            entities.keys(),
+            lambda key: body_bounds(entities[key], self.tight, self.tolerance),
+            versions
+        )
+        if b_min is None:
+            return bounding_box_from_selections([])
+        return b_box_from_points(b_min, b_max)
+
+    @traced('oriented_bounding_box')
+    def oriented_b_box(self, bodies: list, orientation: str = 'world') -> Tuple[np.ndarray, adsk.core.BoundingBox3D]:
+        """Frame of the cage and the combined box of the bodies in frame coordinates.
+
+        The frame is None for ``world``, where the box is the same as from ``b_box``.  For
+        ``minimum`` the box is fitted to the tessellation and padded by the tolerance.
+        """
+        if orientation == 'world' or len(bodies) == 0:
+            return None, self.b_box(bodies)
+        elif orientation != 'minimum':
+            raise ValueError(f'Unknown cage orientation: {orientation}')
+
+        entries = []
+        for body in bodies:
+            key = (body.entityToken, self.tolerance)
+            entry = body_points_store.get(key)
+            if entry is None or entry[0] != body.revisionId:
+                entry = (body.revisionId, *body_points(body, self.tolerance))
+                body_points_store.put(key, entry, entry[1].nbytes + entry[2].nbytes)
+            entries.append(entry)
+
+        frame, b_min, b_max = fit_oriented_box(
+            np.concatenate([entry[1] for entry in entries]), np.concatenate([entry[2] for entry in entries])
+        )
+        if np.allclose(frame, np.eye(3)):
+            return None, self.b_box(bodies)
+        return frame, b_box_from_points(b_min - self.tolerance, b_max + self.tolerance)
+
+
+def bounding_box_from_selections(selections):
+    if len(selections) > 0:
+        b_box: adsk.core.BoundingBox3D = selections[0].boundingBox
+        for selection in selections[1:]:
+            b_box.combine(selection.boundingBox)
+
+    else:
+        b_box = adsk.core.BoundingBox3D.create(
+            adsk.core.Point3D.create(-1, -1, -1),
+            adsk.core.Point3D.create(1, 1, 1)
+        )
+    return b_box
+
+
+def expand_box_by_feature_values(b_box: adsk.core.BoundingBox3D, f_values: FeatureValues):
+    min_p = b_box.minPoint
+    max_p = b_box.maxPoint
+
+    points = [
+        adsk.core.Point3D.create(max_p.x + f_values.x_pos, middle(min_p.y, max_p.y), middle(min_p.z, max_p.z)),
+        adsk.core.Point3D.create(min_p.x - f_values.x_neg, middle(min_p.y, max_p.y), middle(min_p.z, max_p.z)),
+        adsk.core.Point3D.create(middle(min_p.x, max_p.x), max_p.y + f_values.y_pos, middle(min_p.z, max_p.z)),
+        adsk.core.Point3D.create(middle(min_p.x, max_p.x), min_p.y - f_values.y_neg, middle(min_p.z, max_p.z)),
+        adsk.core.Point3D.create(middle(min_p.x, max_p.x), middle(min_p.y, max_p.y), max_p.z + f_values.z_pos),
+        adsk.core.Point3D.create(middle(min_p.x, max_p.x), middle(min_p.y, max_p.y), min_p.z - f_values.z_neg)
+    ]
+
+    for point in points:
+        if not b_box.contains(point):
+            b_box.expand(point)
+
+
+def create_outer_box(inner_o_box: adsk.core.OrientedBoundingBox3D, thickness: float) -> adsk.core.OrientedBoundingBox3D:
+    outer_o_box = inner_o_box.copy()
+
+    outer_o_box.length = outer_o_box.length + thickness * 2
+    outer_o_box.width = outer_o_box.width + thickness * 2
+    outer_o_box.height = outer_o_box.height + thickness * 2
+
+    return outer_o_box
+
+
+def o_box_from_row(row) -> adsk.core.OrientedBoundingBox3D:
+    cx, cy, cz, dx, dy, dz = row
+    return adsk.core.OrientedBoundingBox3D.create(
+        adsk.core.Point3D.create(cx, cy, cz),
+        adsk.core.Vector3D.create(1, 0, 0),
+        adsk.core.Vector3D.create(0, 1, 0),
+        dx, dy, dz
+    )
+
+
+def placement_matrix(row, frame: np.ndarray = None) -> adsk.core.Matrix3D:
+    """Matrix that scales a unit cube at the origin to the box ``row`` and moves it into place.
+
+    With a ``frame`` the row is in frame coordinates and the cube is turned into the frame.
+    """
+    cx, cy, cz, dx, dy, dz = row
+    array = [
+        dx, 0.0, 0.0, cx,
+        0.0, dy, 0.0, cy,
+        0.0, 0.0, dz, cz,
+        0.0, 0.0, 0.0, 1.0
+    ]
+    if frame is not None:
+        array = (frame_array(frame) @ np.reshape(array, (4, 4))).ravel().tolist()
+    matrix = adsk.core.Matrix3D.create()
+    matrix.setWithArray(array)
+    return matrix
+
+
+def frame_array(frame: np.ndarray, origin: Sequence[float] = (0.0, 0.0, 0.0)) -> np.ndarray:
+    """4 x 4 matrix that turns frame coordinates into world coordinates, after moving them by ``origin``."""
+    array = np.eye(4)
+    array[:3, :3] = frame
+    array[:3, 3] = frame @ np.asarray(origin, dtype=float)
+    return array
+
+
+def frame_matrix(frame: np.ndarray, origin: Sequence[float] = (0.0, 0.0, 0.0)) -> adsk.core.Matrix3D:
+    matrix = adsk.core.Matrix3D.create()
+    matrix.setWithArray(frame_array(frame, origin).ravel().tolist())
+    return matrix
+
+
+def transform_to_frame(body: adsk.fusion.BRepBody, frame: np.ndarray = None) -> adsk.fusion.BRepBody:
+    """Turn a body built in frame coordinates into place.  Nothing is done without a frame."""
+    if frame is not None:
+        adsk.fusion.TemporaryBRepManager.get().transform(body, frame_matrix(frame))
+    return body
+
+
+def create_unit_box() -> adsk.fusion.BRepBody:
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    return brep_mgr.createBox(o_box_from_row((0.0, 0.0, 0.0, 1.0, 1.0, 1.0)))
+
+
+@traced('create_brep_shell_box')
+def create_brep_shell_box(modified_b_box, thickness, frame: np.ndarray = None):
+    """Hollow box around ``modified_b_box``, which is in ``frame`` coordinates when a frame is given."""
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    inner_row, outer_row = shell_extents(*b_box_points(modified_b_box), thickness)
+
+    inner_box = brep_mgr.createBox(o_box_from_row(inner_row.tolist()))
+    outer_box = brep_mgr.createBox(o_box_from_row(outer_row.tolist()))
+
+    brep_mgr.booleanOperation(outer_box, inner_box, adsk.fusion.BooleanTypes.DifferenceBooleanType)
+    count('boolean_calls')
+
+    return transform_to_frame(outer_box, frame)
+
+
+def create_shell_input(body: adsk.fusion.BRepBody, thickness: float) -> adsk.fusion.ShellFeatureInput:
+    obj_col = adsk.core.ObjectCollection.create()
+    obj_col.add(body)
+
+    shell_input = body.parentComponent.features.shellFeatures.createInput(obj_col)
+    thickness_input = adsk.core.ValueInput.createByReal(thickness)
+    shell_input.outsideThickness = thickness_input
+    return shell_input
+
+
+def cutter_layout(b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues) -> np.ndarray:
+    return gap_layout(*b_box_points(b_box), feature_values)
+
+
+def create_cutters(layout: np.ndarray) -> List[adsk.fusion.BRepBody]:
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    count('cutters_created', len(layout))
+    return [brep_mgr.createBox(o_box_from_row(row)) for row in layout.tolist()]
+
+
+def translation_matrix(x: float, y: float, z: float) -> adsk.core.Matrix3D:
+    matrix = adsk.core.Matrix3D.create()
+    matrix.translation = adsk.core.Vector3D.create(x, y, z)
+    return matrix
+
+
+def instance_body(template: adsk.fusion.BRepBody, x: float, y: float, z: float) -> adsk.fusion.BRepBody:
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    body = brep_mgr.copy(template)
+    brep_mgr.transform(body, translation_matrix(x, y, z))
+    return body
+
+
+def create_cutters_instanced(layout: np.ndarray, templates=None) -> List[adsk.fusion.BRepBody]:
+    """Create one template box per cutter size and place copies of it.
+
+    Pass the same ``templates`` mapping to share templates between cages.
+    """
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    templates = {} if templates is None else templates
+    cutters = []
+    for cx, cy, cz, dx, dy, dz in layout.tolist():
+        key = ('box', dx, dy, dz)
+        template = templates.get(key)
+        if template is None:
+            template = brep_mgr.createBox(o_box_from_row((0.0, 0.0, 0.0, dx, dy, dz)))
+            templates[key] = template
+        cutters.append(instance_body(template, cx, cy, cz))
+    count('cutters_created', len(cutters))
+    return cutters
+
+
+def create_cutter_rows(face_rows: List[np.ndarray], templates=None) -> List[adsk.fusion.BRepBody]:
+    """Union the first row of each face once and place copies of it for the other rows."""
+    templates = {} if templates is None else templates
+    tools = []
+    for rows in face_rows:
+        if rows.size == 0:
+            continue
+
+        first_row = rows[0].copy()
+        origin = first_row[0, :3].copy()
+        first_row[:, :3] -= origin
+
+        key = ('row', first_row.round(9).tobytes())
+        row_template = templates.get(key)
+        if row_template is None:
+            row_template = union_bodies(create_cutters_instanced(first_row, templates))
+            templates[key] = row_template
+
+        for x, y, z in rows[:, 0, :3].tolist():
+            tools.append(instance_body(row_template, x, y, z))
+        count('cutter_rows_created', len(rows))
+
+    return tools
+
+
+def union_bodies(bodies: List[adsk.fusion.BRepBody]) -> adsk.fusion.BRepBody:
+    """Merge bodies into the first one by pairwise (tree) reduction."""
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    union = adsk.fusion.BooleanTypes.UnionBooleanType
+
+    bodies = list(bodies)
+    while len(bodies) > 1:
+        merged = []
+        for i in range(0, len(bodies) - 1, 2):
+            brep_mgr.booleanOperation(bodies[i], bodies[i + 1], union)
+            count('boolean_calls')
+            merged.append(bodies[i])
+        if len(bodies) % 2:
+            merged.append(bodies[-1])
+        bodies = merged
+
+    return bodies[0] if bodies else None
+
+
+def split_groups(items: list, group_sizes) -> List[list]:
+    groups = []
+    start = 0
+    for size in group_sizes:
+        if size > 0:
+            groups.append(items[start:start + size])
+        start += size
+    if start < len(items):
+        groups.append(items[start:])
+    return groups
+
+
+BOOLEAN_STRATEGIES = ('each', 'face', 'tree')
+
+
+@traced('booleans')
+def subtract_cutters(target: adsk.fusion.BRepBody, cutters: List[adsk.fusion.BRepBody],
+                     strategy: str = 'tree', group_sizes=None):
+    """Subtract the cutters from target.
+
+    ``each`` subtracts every cutter on its own, ``face`` merges the cutters of each
+    group (``group_sizes``, usually the per face counts) into one tool first and
+    ``tree`` merges all cutters into a single tool and subtracts once.
+    """
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    difference = adsk.fusion.BooleanTypes.DifferenceBooleanType
+
+    if strategy == 'each':
+        tools = cutters
+    elif strategy == 'face':
+        tools = [union_bodies(group) for group in split_groups(cutters, group_sizes if group_sizes is not None else [])]
+    elif strategy == 'tree':
+        tools = [union_bodies(cutters)] if cutters else []
+    else:
+        raise ValueError(f'Unknown boolean strategy: {strategy}')
+
+    for tool in tools:
+        brep_mgr.booleanOperation(target, tool, difference)
+    count('boolean_calls', len(tools))
+
+    return target
+
+
+CUTTER_MODES = ('box', 'instance', 'row')
+
+
+@traced('create_cutter_tools')
+def create_cutter_tools(b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues,
+                        mode: str = 'row', templates=None) -> List[adsk.fusion.BRepBody]:
+    """Create the gap cutters.
+
+    ``box`` creates every cutter with ``createBox``, ``instance`` copies one template
+    per cutter size and ``row`` copies a pre-unioned template of a whole row.
+    """
+    if mode == 'box':
+        return create_cutters(cutter_layout(b_box, feature_values))
+    elif mode == 'instance':
+        return create_cutters_instanced(cutter_layout(b_box, feature_values), templates)
+    elif mode == 'row':
+        return create_cutter_rows(gap_face_rows(*b_box_points(b_box), feature_values), templates)
+    else:
+        raise ValueError(f'Unknown cutter mode: {mode}')
+
+
+@traced('create_bar_frame')
+def create_bar_frame(b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues,
+                     templates=None) -> adsk.fusion.BRepBody:
+    """Build the cage as the union of its bars, without a shell or cutters."""
+    faces = [
+        union_bodies(create_cutters_instanced(rows, templates))
+        for rows in bar_face_rows(*b_box_points(b_box), feature_values)
+    ]
+    return union_bodies(faces)
+
+
+# Ways to build the cage body, see create_cage_body
+CONSTRUCTIONS = ('subtract', 'bars')
+
+
+@traced('create_cage_body')
+def create_cage_body(b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues,
+                     cutter_mode: str = 'row', templates=None, construction: str = 'subtract') -> adsk.fusion.BRepBody:
+    """Create the perforated cage.
+
+    ``subtract`` cuts the gaps out of a solid shell, ``bars`` unions one box per bar row
+    and column of each face.  Both give the same geometry.
+    """
+    if construction == 'bars':
+        return create_bar_frame(b_box, feature_values, templates)
+    elif construction != 'subtract':
+        raise ValueError(f'Unknown cage construction: {construction}')
+
+    shell_box = create_brep_shell_box(b_box, feature_values.shell_thickness)
+    subtract_cutters(shell_box, create_cutter_tools(b_box, feature_values, cutter_mode, templates))
+    return shell_box
+
+
+def export_body(body: adsk.fusion.BRepBody, path: str):
+    adsk.fusion.TemporaryBRepManager.get().exportToFile([body], path)
+
+
+def import_body(path: str) -> adsk.fusion.BRepBody:
+    bodies = adsk.fusion.TemporaryBRepManager.get().createFromFile(path)
+    if bodies is None or bodies.count != 1:
+        return None
+    return bodies.item(0)
+
+
+def normalized_cage_key(b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues) -> tuple:
+    """Key of a cage moved to the origin.  The offsets are already in the box, so they are left out."""
+    min_point, max_point = b_box_points(b_box)
+    size = np.subtract(max_point, min_point)
+    values = replace(feature_values, x_pos=0.0, x_neg=0.0, y_pos=0.0, y_neg=0.0, z_pos=0.0, z_neg=0.0,
+                     orientation='world')
+    return cage_key((0.0, 0.0, 0.0), size, values)
+
+
+@traced('create_cached_cage_body')
+def create_cached_cage_body(b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues,
+                            cutter_mode: str = 'row', templates=None, construction: str = 'subtract',
+                            disk_cache: DiskCache = None, frame: np.ndarray = None,
+                            registry: GeometryRegistry = None) -> adsk.fusion.BRepBody:
+    """Like ``create_cage_body``, but shares cages of the same size and ``FeatureValues``.
+
+    Cages are built at the origin and moved into place.  A cage already in ``registry`` is
+    copied, otherwise it is loaded from ``disk_cache`` when one of the same size was saved.
+    With a ``frame`` the box is in frame coordinates and the cage is turned into the frame as well.
+    """
+    if disk_cache is None and registry is None:
+        return transform_to_frame(create_cage_body(b_box, feature_values, cutter_mode, templates, construction), frame)
+
+    min_point, max_point = b_box_points(b_box)
+    origin_box = b_box_from_points((0.0, 0.0, 0.0), np.subtract(max_point, min_point))
+    key = normalized_cage_key(b_box, feature_values)
+
+    def create_origin_body():
+        if disk_cache is None:
+            return create_cage_body(origin_box, feature_values, cutter_mode, templates, construction)
+
+        hits = disk_cache.hits
+        origin_body = disk_cache.get_or_create(
+            key,
+            lambda: create_cage_body(origin_box, feature_values, cutter_mode, templates, construction),
+            import_body,
+            export_body
+        )
+        count('disk_cache_hits' if disk_cache.hits > hits else 'disk_cache_misses')
+        return origin_body
+
+    if registry is None:
+        body = create_origin_body()
+    else:
+        hits = registry.hits
+        shared_body = registry.get_or_create(
+            key, create_origin_body, lambda _: estimate_body_bytes(len(cutter_layout(origin_box, feature_values)))
+        )
+        count('geometry_registry_hits' if registry.hits > hits else 'geometry_registry_misses')
+        body = adsk.fusion.TemporaryBRepManager.get().copy(shared_body)
+
+    if frame is None:
+        adsk.fusion.TemporaryBRepManager.get().transform(body, translation_matrix(*min_point))
+    else:
+        adsk.fusion.TemporaryBRepManager.get().transform(body, frame_matrix(frame, min_point))
+    return body
+
+
+def feature_inputs(bodies: list, feature_values: FeatureValues, selection_bounds: SelectionBounds) -> tuple:
+    """Everything a feature's cage key depends on: the body revisions, parameters and bounds mode."""
+    revisions = tuple((body.entityToken, body.revisionId) for body in bodies)
+    return revisions, astuple(feature_values), selection_bounds.tight, selection_bounds.tolerance
+
+
+@traced('compute_feature_body')
+def compute_feature_body(feature_id: str, bodies: list, feature_values: FeatureValues,
+                         selection_bounds: SelectionBounds, compute_cache: ComputeCache,
+                         cutter_mode: str = 'row', templates=None,
+                         construction: str = 'subtract', stored_fingerprint: str = None,
+                         disk_cache: DiskCache = None,
+                         registry: GeometryRegistry = None) -> Tuple[adsk.fusion.BRepBody, tuple]:
+    """Cage body and cache key for a custom feature's compute.
+
+    The body is None when nothing relevant changed since the feature was last computed, in
+    this session or, going by ``stored_fingerprint``, in an earlier one.  Call
+    ``compute_cache.set_current`` with the key once the body has been applied.  Unchanged
+    bodies and parameters are recognized before any box is measured or fitted.
+    """
+    inputs = feature_inputs(bodies, feature_values, selection_bounds)
+    key = compute_cache.key_for_inputs(feature_id, inputs)
+    if key is not None and compute_cache.is_current(feature_id, key):
+        count('compute_skipped')
+        return None, key
+
+    frame, b_box = selection_bounds.oriented_b_box(bodies, feature_values.orientation)
+    expand_box_by_feature_values(b_box, feature_values)
+
+    key = cage_key(*b_box_points(b_box), feature_values, frame=frame)
+    compute_cache.set_inputs_key(feature_id, inputs, key)
+    if compute_cache.is_current(feature_id, key):
+        count('compute_skipped')
+        return None, key
+
+    if stored_fingerprint is not None and stored_fingerprint == key_fingerprint(key):
+        count('compute_skipped_stored')
+        return None, key
+
+    layout = cutter_layout(b_box, feature_values)
+    cage_body = compute_cache.get_or_create(
+        key,
+        lambda: create_cached_cage_body(b_box, feature_values, cutter_mode, templates, construction, disk_cache,
+                                        frame, registry),
+        lambda body: estimate_body_bytes(len(layout))
+    )
+    return cage_body, key
+
+
+# endregion
@@ -0,0 +1,199 @@
+"""Positions and sizes of the cage shell, gaps and bars.
+
+Boxes are described as rows of ``(cx, cy, cz, dx, dy, dz)``: the center point and
+the full extents along the world X, Y and Z axes.
+"""
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class FeatureValues:
+    shell_thickness: float
+    bar: float
+    gap: float
+    x_pos: float
+    x_neg: float
+    y_pos: float
+    y_neg: float
+    z_pos: float
+    z_neg: float
+    pattern: str = 'grid'
+    orientation: str = 'world'
+
+
+# ``grid`` cuts a square hole at every grid position, ``slot`` one long slot per grid column
+PATTERNS = ('grid', 'slot')
+
+# ``world`` aligns the cage with the design axes, ``minimum`` turns it to the smallest box around the bodies
+ORIENTATIONS = ('world', 'minimum')
+
+
+# Cutter rows are grouped by face in this order
+FACES = ('x_neg', 'x_pos', 'y_neg', 'y_pos', 'z_neg', 'z_pos')
+
+
+def other_axes(axis: int) -> Tuple[int, int]:
+    return tuple(i for i in range(3) if i != axis)
+
+
+def grid_counts(sizes: Sequence[float], gap: float, bar: float, thk: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Number of gaps along each axis and the margin left at each end of the row."""
+    sizes = np.asarray(sizes, dtype=float)
+    if gap <= 0 or (gap + bar) <= 0:
+        return np.zeros(3, dtype=int), np.zeros(3)
+
+    valid = (sizes - bar - gap - thk * 2) > 0
+    nums = np.where(valid, np.floor((sizes + bar) / (gap + bar)), 0).astype(int)
+    steps = np.where(valid, (sizes - (gap * nums) - (bar * (nums - 1))) / 2, 0.0)
+    return nums, steps
+
+
+def gap_positions(min_point: Sequence[float], max_point: Sequence[float],
+                  feature_values: FeatureValues) -> list:
+    """Center coordinate of every gap along each axis."""
+    b_min = np.asarray(min_point, dtype=float)
+    b_max = np.asarray(max_point, dtype=float)
+    gap = feature_values.gap
+    bar = feature_values.bar
+
+    nums, steps = grid_counts(b_max - b_min, gap, bar, feature_values.shell_thickness)
+    return [b_min[i] + steps[i] + gap / 2 + np.arange(nums[i]) * (bar + gap) for i in range(3)]
+
+
+def gap_face_counts(min_point: Sequence[float], max_point: Sequence[float],
+                    feature_values: FeatureValues) -> np.ndarray:
+    """Number of cutters on each face, in ``FACES`` order."""
+    return np.array([rows.shape[0] * rows.shape[1] for rows in gap_face_rows(min_point, max_point, feature_values)])
+
+
+def gap_face_rows(min_point: Sequence[float], max_point: Sequence[float],
+                  feature_values: FeatureValues) -> List[np.ndarray]:
+    """Cutters of each face, in ``FACES`` order, as (rows x columns x 6) arrays.
+
+    Rows run along the first of the face's other axes.  The slot pattern has a single row
+    of slots, each spanning every gap along the second axis.
+    """
+    b_min = np.asarray(min_point, dtype=float)
+    b_max = np.asarray(max_point, dtype=float)
+    gap = feature_values.gap
+    thk = feature_values.shell_thickness
+
+    positions = gap_positions(b_min, b_max, feature_values)
+    sizes = [np.full(len(p), gap) for p in positions]
+    if feature_values.pattern == 'slot':
+        spans = [slot_span(p, gap) for p in positions]
+    elif feature_values.pattern != 'grid':
+        raise ValueError(f'Unknown cage pattern: {feature_values.pattern}')
+
+    faces = []
+    for axis in range(3):
+        u, v = other_axes(axis)
+        if feature_values.pattern == 'slot':
+            # Slots run along Z on the side faces, so the bridges above them stay short when printed
+            pos_v, size_v = spans[v]
+        else:
+            pos_v, size_v = positions[v], sizes[v]
+        pos_u, pos_v = np.meshgrid(positions[u], pos_v)
+        size_u, size_v = np.meshgrid(sizes[u], size_v)
+        for side in (b_min[axis] - thk / 2, b_max[axis] + thk / 2):
+            rows = np.empty(pos_u.shape + (6,))
+            rows[..., axis] = side
+            rows[..., u] = pos_u
+            rows[..., v] = pos_v
+            rows[..., 3 + u] = size_u
+            rows[..., 3 + v] = size_v
+            rows[..., 3 + axis] = thk
+            faces.append(rows)
+
+    return faces
+
+
+def slot_span(positions: np.ndarray, gap: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Center and length of a single slot covering every gap along an axis."""
+    if len(positions) == 0:
+        return positions, positions
+    return np.array([(positions[0] + positions[-1]) / 2]), np.array([positions[-1] - positions[0] + gap])
+
+
+def gap_layout(min_point: Sequence[float], max_point: Sequence[float], feature_values: FeatureValues) -> np.ndarray:
+    """All gap cutters of the cage as an (N x 6) array of centers and extents."""
+    faces = gap_face_rows(min_point, max_point, feature_values)
+    return np.concatenate([rows.reshape(-1, 6) for rows in faces])
+
+
+def solid_intervals(low: float, high: float, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """The parts of ``[low, high]`` outside the sorted, disjoint holes ``[starts, ends]`` as (N x 2) rows."""
+    bounds = np.column_stack([np.concatenate([[low], ends]), np.concatenate([starts, [high]])])
+    return bounds[bounds[:, 1] - bounds[:, 0] > 1e-9]
+
+
+def bar_face_rows(min_point: Sequence[float], max_point: Sequence[float],
+                  feature_values: FeatureValues) -> List[np.ndarray]:
+    """Bars of each face, in ``FACES`` order, as (N x 6) arrays.
+
+    Each wall of ``shell_slabs`` is covered by full length bars along both of its axes,
+    placed between the gaps of ``gap_face_rows``.  The bars overlap where they cross, so
+    their union is the wall with the same holes the gap cutters make.  A wall without
+    holes is a single bar.
+    """
+    slabs = shell_slabs(min_point, max_point, feature_values.shell_thickness)
+
+    faces = []
+    for face_index, rows in enumerate(gap_face_rows(min_point, max_point, feature_values)):
+        slab = slabs[face_index]
+        if rows.size == 0:
+            faces.append(slab[None, :].copy())
+            continue
+
+        axis = face_index // 2
+        u, v = other_axes(axis)
+        bars = []
+        # Bars along v sit between the columns of holes, bars along u between the rows
+        for along, across, holes in ((v, u, rows[0]), (u, v, rows[:, 0])):
+            low = slab[across] - slab[3 + across] / 2
+            high = slab[across] + slab[3 + across] / 2
+            half = holes[:, 3 + across] / 2
+            intervals = solid_intervals(low, high, holes[:, across] - half, holes[:, across] + half)
+
+            face_bars = np.repeat(slab[None, :], len(intervals), axis=0)
+            face_bars[:, across] = intervals.mean(axis=1)
+            face_bars[:, 3 + across] = intervals[:, 1] - intervals[:, 0]
+            bars.append(face_bars)
+
+        faces.append(np.concatenate(bars))
+
+    return faces
+
+
+def shell_extents(min_point: Sequence[float], max_point: Sequence[float], thk: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Inner and outer box of the cage shell as ``(center, extents)`` rows."""
+    b_min = np.asarray(min_point, dtype=float)
+    b_max = np.asarray(max_point, dtype=float)
+    center = (b_min + b_max) / 2
+    size = b_max - b_min
+    inner = np.concatenate([center, size])
+    outer = np.concatenate([center, size + thk * 2])
+    return inner, outer
+
+
+def shell_slabs(min_point: Sequence[float], max_point: Sequence[float], thk: float) -> np.ndarray:
+    """The cage shell as six non-overlapping wall boxes, in ``FACES`` order."""
+    b_min = np.asarray(min_point, dtype=float)
+    b_max = np.asarray(max_point, dtype=float)
+    center = (b_min + b_max) / 2
+    size = b_max - b_min
+
+    slabs = np.empty((6, 6))
+    for axis in range(3):
+        # Z walls cover the full outer box, Y walls fit between them and X walls fit between both
+        extents = size + np.array([2 * thk * (i < axis) for i in range(3)])
+        extents[axis] = thk
+        for i, side in enumerate((b_min[axis] - thk / 2, b_max[axis] + thk / 2)):
+            slabs[axis * 2 + i, :3] = center
+            slabs[axis * 2 + i, axis] = side
+            slabs[axis * 2 + i, 3:] = extents
+
+    return slabs
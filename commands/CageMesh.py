@@ -0,0 +1,152 @@
+"""Triangle meshes of cages and binary STL export.
+
+The cage is split into the cells of a rectilinear grid through every wall and gap boundary.
+Each cell is either solid or empty, and the mesh is made of the cell faces between solid
+and empty cells.  All faces lie on the grid, so neighbouring triangles always share whole
+edges and the mesh is watertight.
+"""
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from .CageLayout import FeatureValues, gap_face_rows, other_axes
+
+
+# Axes spanning a face, in the order that makes their cross product point along the face normal
+FACE_AXES = ((1, 2), (2, 0), (0, 1))
+
+# Corners of a face as (u, v) steps and its two counter-clockwise triangles
+QUAD_CORNERS = np.array([[0, 0], [1, 0], [1, 1], [0, 1]])
+QUAD_TRIANGLES = np.array([[0, 1, 2], [0, 2, 3]])
+
+STL_HEADER = b'FusionBoxer cage'
+STL_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+
+def interval_mask(centers: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Which of the cell centers fall inside any of the intervals."""
+    if len(starts) == 0:
+        return np.zeros(len(centers), dtype=bool)
+    index = np.searchsorted(starts, centers, side='right') - 1
+    valid = index >= 0
+    return valid & (centers < ends[np.maximum(index, 0)])
+
+
+def cage_grid(min_point: Sequence[float], max_point: Sequence[float],
+              feature_values: FeatureValues) -> Tuple[list, np.ndarray]:
+    """Grid lines along each axis and the solid cells of the cage as a boolean array."""
+    b_min = np.asarray(min_point, dtype=float)
+    b_max = np.asarray(max_point, dtype=float)
+    thk = feature_values.shell_thickness
+    faces = gap_face_rows(b_min, b_max, feature_values)
+
+    # Hole intervals of each face along its two axes.  Holes form a grid, so both are enough.
+    holes = []
+    for face_index, rows in enumerate(faces):
+        u, v = other_axes(face_index // 2)
+        if rows.size == 0:
+            holes.append(None)
+            continue
+        holes.append({
+            u: (rows[0, :, u] - rows[0, :, 3 + u] / 2, rows[0, :, u] + rows[0, :, 3 + u] / 2),
+            v: (rows[:, 0, v] - rows[:, 0, 3 + v] / 2, rows[:, 0, v] + rows[:, 0, 3 + v] / 2),
+        })
+
+    lines = []
+    for axis in range(3):
+        bounds = [[b_min[axis] - thk, b_min[axis], b_max[axis], b_max[axis] + thk]]
+        for face_holes in holes:
+            if face_holes is not None and axis in face_holes:
+                bounds.extend(face_holes[axis])
+        lines.append(np.unique(np.concatenate(bounds).round(9)))
+
+    centers = [(line[:-1] + line[1:]) / 2 for line in lines]
+    inner = [(c > b_min[axis]) & (c < b_max[axis]) for axis, c in enumerate(centers)]
+    solid = ~(inner[0][:, None, None] & inner[1][None, :, None] & inner[2][None, None, :])
+
+    for face_index, face_holes in enumerate(holes):
+        if face_holes is None:
+            continue
+        axis = face_index // 2
+        side = (b_min[axis] - thk, b_min[axis]) if face_index % 2 == 0 else (b_max[axis], b_max[axis] + thk)
+        masks = [None, None, None]
+        masks[axis] = (centers[axis] > side[0]) & (centers[axis] < side[1])
+        for other in other_axes(axis):
+            masks[other] = interval_mask(centers[other], *face_holes[other])
+        solid &= ~(masks[0][:, None, None] & masks[1][None, :, None] & masks[2][None, None, :])
+
+    return lines, solid
+
+
+def grid_mesh(lines: list, solid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vertices (N x 3) and triangles (M x 3) of the boundary of the solid cells."""
+    shape = np.array([len(line) for line in lines])
+    quads = []
+    for axis, (u, v) in enumerate(FACE_AXES):
+        pad = [(0, 0)] * 3
+        pad[axis] = (1, 1)
+        padded = np.pad(solid, pad)
+        lower = np.take(padded, np.arange(shape[axis]), axis=axis)
+        upper = np.take(padded, np.arange(1, shape[axis] + 1), axis=axis)
+
+        # Faces with solid below point along +axis, faces with solid above along -axis
+        for faces, flip in ((lower & ~upper, False), (upper & ~lower, True)):
+            cells = np.argwhere(faces)
+            if len(cells) == 0:
+                continue
+            corners = np.repeat(cells[:, None, :], 4, axis=1)
+            corners[:, :, u] += QUAD_CORNERS[:, 0]
+            corners[:, :, v] += QUAD_CORNERS[:, 1]
+            quads.append(corners[:, ::-1] if flip else corners)
+
+    if not quads:
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+
+    corners = np.concatenate(quads)
+    flat = np.ravel_multi_index(corners.reshape(-1, 3).T, shape)
+    used, indices = np.unique(flat, return_inverse=True)
+    grid_index = np.unravel_index(used, shape)
+    vertices = np.column_stack([lines[axis][grid_index[axis]] for axis in range(3)])
+
+    quad_indices = indices.reshape(-1, 4)
+    triangles = quad_indices[:, QUAD_TRIANGLES].reshape(-1, 3)
+    return vertices, triangles
+
+
+def cage_mesh(min_point: Sequence[float], max_point: Sequence[float],
+              feature_values: FeatureValues) -> Tuple[np.ndarray, np.ndarray]:
+    """Watertight triangle mesh of the perforated cage around an already expanded box."""
+    return grid_mesh(*cage_grid(min_point, max_point, feature_values))
+
+
+def stl_records(vertices: np.ndarray, triangles: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """Binary STL records of a mesh in one preallocated array."""
+    records = np.zeros(len(triangles), dtype=STL_DTYPE)
+    corners = vertices[triangles] * scale
+    records['vertices'] = corners
+
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    records['normal'] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    return records
+
+
+def write_stl(path: str, vertices: np.ndarray, triangles: np.ndarray, scale: float = 10.0):
+    """Write a mesh as binary STL.  The default scale converts cm, the Fusion 360 unit, to mm."""
+    records = stl_records(vertices, triangles, scale)
+    with open(path, 'wb') as stl_file:
+        stl_file.write(STL_HEADER.ljust(80, b' '))
+        stl_file.write(np.uint32(len(records)).tobytes())
+        records.tofile(stl_file)
+
+
+def write_cage_stl(path: str, min_point: Sequence[float], max_point: Sequence[float],
+                   feature_values: FeatureValues, scale: float = 10.0) -> int:
+    """Write the cage around an already expanded box as binary STL and return the triangle count."""
+    vertices, triangles = cage_mesh(min_point, max_point, feature_values)
+    write_stl(path, vertices, triangles, scale)
+    return len(triangles)
@@ -0,0 +1,262 @@
+"""Packs cages into a printer build volume.
+
+Boxes are placed on the axis aligned grid of the build volume, with Z up.  A placement is
+the min corner of a box and its extents after any rotation.  Heuristics choose candidate
+positions and can be registered with ``register_heuristic``.
+"""
+from dataclasses import dataclass
+from typing import Dict, Sequence, Type
+
+import numpy as np
+
+from .CageLayout import shell_extents
+
+
+# Axis orders for the allowed rotations.  Turning about Z keeps the print direction of the cage.
+ROTATIONS = {
+    'none': [(0, 1, 2)],
+    'z': [(0, 1, 2), (1, 0, 2)],
+    'all': [(0, 1, 2), (1, 0, 2), (0, 2, 1), (2, 0, 1), (1, 2, 0), (2, 1, 0)],
+}
+
+# Candidate positions are tested for overlaps in chunks of this size
+CHUNK_SIZE = 256
+
+# Number of placements between removing candidates that no remaining box fits into
+PRUNE_INTERVAL = 8
+
+
+def cage_size(min_point: Sequence[float], max_point: Sequence[float], thickness: float) -> np.ndarray:
+    """Outer extents of a cage around the expanded bounding box."""
+    _, outer = shell_extents(min_point, max_point, thickness)
+    return outer[3:]
+
+
+@dataclass
+class PackingResult:
+    positions: np.ndarray
+    sizes: np.ndarray
+    placed: np.ndarray
+    build_volume: np.ndarray
+    # Axis order of each placed box, as in ROTATIONS: placed extent i is the original extent rotations[:, i]
+    rotations: np.ndarray = None
+
+    @property
+    def placed_count(self) -> int:
+        return int(self.placed.sum())
+
+    @property
+    def packed_height(self) -> float:
+        if not self.placed.any():
+            return 0.0
+        return float((self.positions[self.placed, 2] + self.sizes[self.placed, 2]).max())
+
+    @property
+    def density(self) -> float:
+        """Volume of the placed cages over the build volume used up to the packed height."""
+        height = self.packed_height
+        if height == 0:
+            return 0.0
+        used = self.build_volume[0] * self.build_volume[1] * height
+        return float(np.prod(self.sizes[self.placed], axis=1).sum() / used)
+
+
+class PackingState:
+    """Placed boxes as arrays of min and max corners."""
+
+    def __init__(self, build_volume: np.ndarray, capacity: int):
+        self.build_volume = build_volume
+        self.mins = np.empty((capacity, 3))
+        self.maxs = np.empty((capacity, 3))
+        self.count = 0
+
+    def fits(self, positions: np.ndarray, size: np.ndarray) -> np.ndarray:
+        """Which candidate positions are inside the build volume and free of overlaps."""
+        free = np.all(positions >= -1e-9, axis=1) & np.all(positions + size <= self.build_volume + 1e-9, axis=1)
+        if self.count == 0 or not free.any():
+            return free
+
+        mins = self.mins[:self.count]
+        maxs = self.maxs[:self.count]
+        inside = np.flatnonzero(free)
+        overlap = None
+        for axis in range(3):
+            start = positions[inside, axis][:, None]
+            axis_overlap = (start < maxs[None, :, axis] - 1e-9) & (start + size[axis] > mins[None, :, axis] + 1e-9)
+            overlap = axis_overlap if overlap is None else overlap & axis_overlap
+        free[inside] = ~overlap.any(axis=1)
+        return free
+
+    def add(self, position: np.ndarray, size: np.ndarray):
+        self.mins[self.count] = position
+        self.maxs[self.count] = position + size
+        self.count += 1
+
+    def project(self, point: np.ndarray, axis: int) -> np.ndarray:
+        """Move a point along -axis until it touches a placed box or the build volume."""
+        point = point.copy()
+        if self.count == 0:
+            point[axis] = 0.0
+            return point
+
+        mins = self.mins[:self.count]
+        maxs = self.maxs[:self.count]
+        others = [i for i in range(3) if i != axis]
+        blocking = np.all(
+            (mins[:, others] <= point[others]) & (maxs[:, others] > point[others]), axis=1
+        ) & (maxs[:, axis] <= point[axis] + 1e-9)
+        point[axis] = maxs[blocking, axis].max() if blocking.any() else 0.0
+        return point
+
+
+class PackingHeuristic:
+    """Chooses where to place each box from a set of candidate points."""
+
+    def __init__(self, state: PackingState):
+        self.state = state
+        self.points = np.zeros((1, 3))
+
+    def candidates(self) -> np.ndarray:
+        return self.points
+
+    def prune(self, min_size: np.ndarray):
+        """Drop candidates where not even the smallest remaining box fits.  They can never be used again."""
+        if len(self.points) > 0:
+            self.points = self.points[self.state.fits(self.points, min_size)]
+
+    def settle(self, position: np.ndarray, size: np.ndarray) -> np.ndarray:
+        return position
+
+    def placed(self, position: np.ndarray, size: np.ndarray):
+        pass
+
+    def best_position(self, size: np.ndarray):
+        """First free candidate in bottom (Z), back (Y), left (X) order."""
+        candidates = self.candidates()
+        order = np.lexsort((candidates[:, 0], candidates[:, 1], candidates[:, 2]))
+        candidates = candidates[order]
+        for start in range(0, len(candidates), CHUNK_SIZE):
+            chunk = candidates[start:start + CHUNK_SIZE]
+            free = np.flatnonzero(self.state.fits(chunk, size))
+            if len(free) > 0:
+                return self.settle(chunk[free[0]], size)
+        return None
+
+
+class ExtremePointHeuristic(PackingHeuristic):
+    """Extreme point placement: corners of placed boxes projected onto the surfaces below and behind them."""
+
+    def placed(self, position: np.ndarray, size: np.ndarray):
+        new_points = []
+        for axis in range(3):
+            corner = position.copy()
+            corner[axis] += size[axis]
+            for direction in range(3):
+                if direction != axis:
+                    new_points.append(self.state.project(corner, direction))
+
+        # Existing points only need checking against the new box, new points against all boxes
+        new_points = np.array(new_points)
+        mins = self.state.mins[:self.state.count]
+        maxs = self.state.maxs[:self.state.count]
+        new_inside = np.all((new_points[:, None, :] >= mins[None, :, :] - 1e-9) &
+                            (new_points[:, None, :] < maxs[None, :, :] - 1e-9), axis=2).any(axis=1)
+        old_inside = np.all((self.points >= position - 1e-9) & (self.points < position + size - 1e-9), axis=1)
+
+        points = np.concatenate([self.points[~old_inside], new_points[~new_inside]])
+        self.points = np.unique(points.round(9), axis=0)
+
+
+class BottomLeftFillHeuristic(PackingHeuristic):
+    """Bottom left fill: try the corners of placed boxes and slide the box down, back and left."""
+
+    def settle(self, position: np.ndarray, size: np.ndarray) -> np.ndarray:
+        position = position.copy()
+        moved = True
+        while moved:
+            moved = False
+            for axis in (2, 1, 0):
+                target = self.slide(position, size, axis)
+                if target < position[axis] - 1e-9:
+                    position[axis] = target
+                    moved = True
+        return position
+
+    def slide(self, position: np.ndarray, size: np.ndarray, axis: int) -> float:
+        """Lowest coordinate along axis the box can slide to without hitting a placed box."""
+        count = self.state.count
+        if count == 0:
+            return 0.0
+        mins = self.state.mins[:count]
+        maxs = self.state.maxs[:count]
+        others = [i for i in range(3) if i != axis]
+        in_path = np.all(
+            (mins[:, others] < position[others] + size[others] - 1e-9) & (maxs[:, others] > position[others] + 1e-9),
+            axis=1
+        ) & (maxs[:, axis] <= position[axis] + 1e-9)
+        return float(maxs[in_path, axis].max()) if in_path.any() else 0.0
+
+    def placed(self, position: np.ndarray, size: np.ndarray):
+        corners = np.repeat(position[None, :], 3, axis=0)
+        corners[np.arange(3), np.arange(3)] += size
+        self.points = np.unique(np.concatenate([self.points, corners]).round(9), axis=0)
+
+
+HEURISTICS: Dict[str, Type[PackingHeuristic]] = {}
+
+
+def register_heuristic(name: str, heuristic: Type[PackingHeuristic]):
+    HEURISTICS[name] = heuristic
+
+
+register_heuristic('extreme_point', ExtremePointHeuristic)
+register_heuristic('bottom_left_fill', BottomLeftFillHeuristic)
+
+
+def pack(sizes: Sequence[Sequence[float]], build_volume: Sequence[float], heuristic: str = 'extreme_point',
+         rotations: str = 'z', spacing: float = 0.0) -> PackingResult:
+    """Place boxes of the given extents in the build volume, largest first.
+
+    ``spacing`` is kept free between cages and to the walls of the build volume.  Boxes that
+    do not fit are left unplaced.
+    """
+    sizes = np.asarray(sizes, dtype=float).reshape(-1, 3)
+    volume = np.asarray(build_volume, dtype=float) - spacing
+    count = len(sizes)
+
+    state = PackingState(volume, count)
+    packer = HEURISTICS[heuristic](state)
+
+    positions = np.full((count, 3), np.nan)
+    placed_sizes = sizes.copy()
+    placed = np.zeros(count, dtype=bool)
+    box_rotations = np.tile(np.arange(3), (count, 1))
+
+    order = np.argsort(-np.prod(sizes, axis=1), kind='stable')
+    rotated = np.stack([sizes[:, list(axes)] for axes in ROTATIONS[rotations]], axis=1)
+    # Smallest extents along each axis of the boxes still to place, over all their rotations
+    remaining_min = np.minimum.accumulate(rotated.min(axis=1)[order][::-1], axis=0)[::-1] + spacing
+
+    for step, index in enumerate(order):
+        if step % PRUNE_INTERVAL == 0:
+            packer.prune(remaining_min[step])
+
+        best = None
+        for axes in ROTATIONS[rotations]:
+            size = sizes[index, list(axes)] + spacing
+            position = packer.best_position(size)
+            if position is not None and (best is None or tuple(position[::-1]) < tuple(best[0][::-1])):
+                best = (position, size, axes)
+
+        if best is None:
+            continue
+
+        position, size, axes = best
+        state.add(position, size)
+        packer.placed(position, size)
+        positions[index] = position + spacing
+        placed_sizes[index] = size - spacing
+        placed[index] = True
+        box_rotations[index] = axes
+
+    return PackingResult(positions, placed_sizes, placed, np.asarray(build_volume, dtype=float), box_rotations)
@@ -0,0 +1,93 @@
+"""Vertex and index arrays for cage previews."""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .CageLayout import FeatureValues, gap_face_rows, other_axes, shell_extents
+
+
+# Corners of a unit cube centered at the origin and its twelve edges
+BOX_CORNERS = np.array([
+    [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+    [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1],
+], dtype=float) / 2
+
+BOX_EDGES = np.array([
+    [0, 1], [1, 2], [2, 3], [3, 0],
+    [4, 5], [5, 6], [6, 7], [7, 4],
+    [0, 4], [1, 5], [2, 6], [3, 7],
+], dtype=np.int64)
+
+
+# Two counter-clockwise triangles per side of the cube, seen from outside
+BOX_TRIANGLES = np.array([
+    [0, 2, 1], [0, 3, 2], [4, 5, 6], [4, 6, 7],
+    [0, 1, 5], [0, 5, 4], [3, 7, 6], [3, 6, 2],
+    [0, 4, 7], [0, 7, 3], [1, 2, 6], [1, 6, 5],
+], dtype=np.int64)
+
+
+def box_vertices(rows: np.ndarray) -> np.ndarray:
+    """Corners (N x 8 x 3) of each (center, size) box row."""
+    rows = np.asarray(rows, dtype=float).reshape(-1, 6)
+    return rows[:, None, :3] + BOX_CORNERS[None, :, :] * rows[:, None, 3:]
+
+
+def box_edges(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vertices (8N x 3) and line indices (24N) outlining each box row."""
+    vertices = box_vertices(rows)
+    indices = BOX_EDGES[None, :, :] + (np.arange(len(vertices)) * 8)[:, None, None]
+    return vertices.reshape(-1, 3), indices.ravel()
+
+
+def box_triangles(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vertices (8N x 3) and triangle indices (36N) of every box row in one mesh."""
+    vertices = box_vertices(rows)
+    indices = BOX_TRIANGLES[None, :, :] + (np.arange(len(vertices)) * 8)[:, None, None]
+    return vertices.reshape(-1, 3), indices.ravel()
+
+
+RECTANGLE_CORNERS = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=float) / 2
+RECTANGLE_EDGES = np.array([[0, 1], [1, 2], [2, 3], [3, 0]], dtype=np.int64)
+
+
+def gap_outlines(face_rows: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vertices (4N x 3) and line indices (8N) outlining every gap on the outside of the cage."""
+    vertices = []
+    for face_index, rows in enumerate(face_rows):
+        rows = rows.reshape(-1, 6)
+        axis = face_index // 2
+        outward = 1 if face_index % 2 else -1
+        u, v = other_axes(axis)
+
+        corners = np.repeat(rows[:, None, :3], 4, axis=1)
+        corners[:, :, axis] += outward * rows[:, None, 3 + axis] / 2
+        corners[:, :, u] += RECTANGLE_CORNERS[None, :, 0] * rows[:, None, 3 + u]
+        corners[:, :, v] += RECTANGLE_CORNERS[None, :, 1] * rows[:, None, 3 + v]
+        vertices.append(corners.reshape(-1, 3))
+
+    vertices = np.concatenate(vertices) if vertices else np.empty((0, 3))
+    count = len(vertices) // 4
+    indices = RECTANGLE_EDGES[None, :, :] + (np.arange(count) * 4)[:, None, None]
+    return vertices, indices.ravel()
+
+
+def merge_lines(*parts: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    vertices = []
+    indices = []
+    offset = 0
+    for part_vertices, part_indices in parts:
+        vertices.append(part_vertices)
+        indices.append(part_indices + offset)
+        offset += len(part_vertices)
+    return np.concatenate(vertices), np.concatenate(indices)
+
+
+def cage_outline(min_point: Sequence[float], max_point: Sequence[float], feature_values: FeatureValues,
+                 show_grid: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Line vertices and indices for the inner and outer cage box, optionally with every gap outlined."""
+    inner, outer = shell_extents(min_point, max_point, feature_values.shell_thickness)
+    parts = [box_edges(np.stack([inner, outer]))]
+    if show_grid:
+        parts.append(gap_outlines(gap_face_rows(min_point, max_point, feature_values)))
+    return merge_lines(*parts)
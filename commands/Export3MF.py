@@ -0,0 +1,178 @@
+"""Streaming 3MF export of build plates of cages.
+
+Meshes are written to the ZIP container as they are added, so only the build items (an
+object id and a transform each) are kept until the plate is closed.  Cages with the same
+size and ``FeatureValues`` share one mesh resource and differ only in their item transform.
+"""
+from typing import Hashable, Iterable, Sequence, Tuple
+import zipfile
+
+import numpy as np
+
+from .CageCache import cage_key
+from .CageLayout import FeatureValues
+from .CageMesh import cage_mesh
+
+
+MODEL_PATH = '3D/3dmodel.model'
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>'
+)
+
+RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    f'<Relationship Target="/{MODEL_PATH}" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>'
+)
+
+MODEL_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<model unit="{unit}" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
+    '<resources>\n'
+)
+
+# Vertices and triangles are formatted in chunks of this many rows
+CHUNK_SIZE = 8192
+
+VERTEX_FORMAT = '<vertex x="%.6g" y="%.6g" z="%.6g"/>\n'
+TRIANGLE_FORMAT = '<triangle v1="%d" v2="%d" v3="%d"/>\n'
+
+
+def format_rows(row_format: str, rows: np.ndarray) -> Iterable[str]:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[start:start + CHUNK_SIZE]
+        yield (row_format * len(chunk)) % tuple(chunk.ravel().tolist())
+
+
+def placement_transform(position: Sequence[float], size: Sequence[float],
+                        axes: Sequence[int] = (0, 1, 2)) -> np.ndarray:
+    """4 x 4 matrix that places a box with its min corner at the origin at ``position``.
+
+    ``axes`` is the axis order of the placed box, as in ``CagePacking.ROTATIONS``, and
+    ``size`` its extents after the rotation.  Axis orders that would mirror the box are
+    turned into a rotation by flipping one axis within the box.
+    """
+    matrix = np.eye(4)
+    rotation = np.zeros((3, 3))
+    rotation[np.arange(3), list(axes)] = 1.0
+    if np.linalg.det(rotation) < 0:
+        flipped = next(i for i in range(3) if axes[i] != i)
+        rotation[flipped] *= -1
+        matrix[flipped, 3] += size[flipped]
+    matrix[:3, :3] = rotation
+    matrix[:3, 3] += position
+    return matrix
+
+
+def transform_attribute(matrix: np.ndarray) -> str:
+    """3MF transform of a 4 x 4 column vector matrix.  3MF multiplies row vectors from the left."""
+    values = np.concatenate([matrix[:3, :3].T.ravel(), matrix[:3, 3]])
+    return ' '.join(f'{value:.6g}' for value in values)
+
+
+class PlateWriter:
+    """Writes a 3MF build plate, one mesh resource per unique key and one item per placement.
+
+    ``scale`` converts mesh and transform coordinates into ``unit``; the default converts
+    cm, the Fusion 360 unit, to mm.
+    """
+
+    def __init__(self, path: str, unit: str = 'millimeter', scale: float = 10.0):
+        self.scale = scale
+        self.zip_file = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self.zip_file.writestr('[Content_Types].xml', CONTENT_TYPES)
+        self.zip_file.writestr('_rels/.rels', RELATIONSHIPS)
+        self.model = self.zip_file.open(MODEL_PATH, 'w', force_zip64=True)
+        self.write(MODEL_HEADER.format(unit=unit))
+
+        self.objects = {}
+        self.items = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def write(self, text: str):
+        self.model.write(text.encode('utf-8'))
+
+    def add_mesh(self, key: Hashable, vertices: np.ndarray, triangles: np.ndarray) -> int:
+        """Write a mesh resource unless one with the same key was already written, and return its id."""
+        object_id = self.objects.get(key)
+        if object_id is not None:
+            return object_id
+
+        object_id = len(self.objects) + 1
+        self.objects[key] = object_id
+        self.write(f'<object id="{object_id}" type="model">\n<mesh>\n<vertices>\n')
+        for text in format_rows(VERTEX_FORMAT, np.asarray(vertices, dtype=float) * self.scale):
+            self.write(text)
+        self.write('</vertices>\n<triangles>\n')
+        for text in format_rows(TRIANGLE_FORMAT, np.asarray(triangles, dtype=np.int64)):
+            self.write(text)
+        self.write('</triangles>\n</mesh>\n</object>\n')
+        return object_id
+
+    def add_item(self, object_id: int, matrix: np.ndarray = None):
+        matrix = np.eye(4) if matrix is None else np.array(matrix, dtype=float)
+        matrix[:3, 3] *= self.scale
+        self.items.append((object_id, transform_attribute(matrix)))
+
+    def add_cage(self, min_point: Sequence[float], max_point: Sequence[float], feature_values: FeatureValues,
+                 position: Sequence[float], axes: Sequence[int] = (0, 1, 2)):
+        """Place a cage with the min corner of its outer box at ``position``.
+
+        The mesh is built around the origin once for every size and ``FeatureValues``.
+        """
+        thk = feature_values.shell_thickness
+        size = np.asarray(max_point, dtype=float) - np.asarray(min_point, dtype=float)
+        local_min = np.full(3, thk)
+        local_max = local_min + size
+
+        key = cage_key(local_min, local_max, feature_values)
+        object_id = self.objects.get(key)
+        if object_id is None:
+            object_id = self.add_mesh(key, *cage_mesh(local_min, local_max, feature_values))
+
+        outer_size = (size + 2 * thk)[list(axes)]
+        self.add_item(object_id, placement_transform(position, outer_size, axes))
+
+    def close(self):
+        if self.model is None:
+            return
+        self.write('</resources>\n<build>\n')
+        for object_id, transform in self.items:
+            self.write(f'<item objectid="{object_id}" transform="{transform}"/>\n')
+        self.write('</build>\n</model>\n')
+        self.model.close()
+        self.zip_file.close()
+        self.model = None
+
+
+def export_plate(path: str, cages: Iterable[tuple], scale: float = 10.0) -> PlateWriter:
+    """Write a plate of cages to a 3MF file.
+
+    Each cage is a ``(min_point, max_point, feature_values, position)`` tuple, optionally
+    followed by the axis order of its rotation.  ``cages`` can be a generator, such as
+    ``packed_cages`` over the result of ``CagePacking.pack``.
+    """
+    with PlateWriter(path, scale=scale) as writer:
+        for cage in cages:
+            writer.add_cage(*cage)
+    return writer
+
+
+def packed_cages(boxes: Sequence[Tuple[Sequence[float], Sequence[float], FeatureValues]], result) -> Iterable[tuple]:
+    """Cages of a packing result, with the position and rotation of every placed box, for ``add_cage``."""
+    for index in np.flatnonzero(result.placed):
+        min_point, max_point, feature_values = boxes[index]
+        yield min_point, max_point, feature_values, result.positions[index], result.rotations[index].tolist()
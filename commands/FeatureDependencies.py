@@ -0,0 +1,75 @@
+"""Incremental updates of custom feature dependencies.
+
+Every dependency that is added or deleted invalidates the feature, so only the difference
+between the current dependencies and the selection is applied.  Works on any collection with
+``add(id, entity)`` whose items have ``id``, ``entity`` and ``deleteMe()``, like
+``adsk.fusion.CustomFeatureDependencies``.
+"""
+from typing import Iterable, List, Tuple
+
+from .Instrumentation import count
+
+
+DEPENDENCY_PREFIX = 'body_'
+
+
+def dependency_index(dependency_id: str, prefix: str = DEPENDENCY_PREFIX) -> int:
+    """Number at the end of a dependency id made by ``add_dependencies``, or -1 for other ids."""
+    suffix = dependency_id[len(prefix):] if dependency_id.startswith(prefix) else ''
+    return int(suffix) if suffix.isdigit() else -1
+
+
+def dependency_changes(dependencies: Iterable, entities: list) -> Tuple[list, list]:
+    """Dependencies to delete and entities to add so the dependencies match ``entities``.
+
+    Entities are matched by entity token first.  The few left over on both sides are compared
+    with ``==``, which Fusion 360 implements for the same entity behind different tokens.
+    A dependency whose entity was deleted is always removed, and so are duplicates.
+    """
+    remaining = {}
+    for entity in entities:
+        remaining.setdefault(entity.entityToken, []).append(entity)
+
+    stale = []
+    for dependency in dependencies:
+        entity = dependency.entity
+        matches = remaining.get(entity.entityToken) if entity is not None else None
+        if matches:
+            matches.pop()
+        else:
+            stale.append(dependency)
+
+    missing = [entity for matches in remaining.values() for entity in matches]
+    if stale and missing:
+        unmatched = []
+        for dependency in stale:
+            entity = dependency.entity
+            match = next((i for i, other in enumerate(missing) if entity is not None and entity == other), None)
+            if match is None:
+                unmatched.append(dependency)
+            else:
+                missing.pop(match)
+        stale = unmatched
+    return stale, missing
+
+
+def sync_dependencies(dependencies, entities: list, prefix: str = DEPENDENCY_PREFIX) -> bool:
+    """Make ``dependencies`` refer to exactly ``entities`` and return whether anything changed.
+
+    New dependencies get ids numbered after the highest existing one, so ids stay unique.
+    """
+    current: List = list(dependencies)
+    stale, missing = dependency_changes(current, entities)
+    if not stale and not missing:
+        count('dependencies_unchanged')
+        return False
+
+    next_index = max((dependency_index(dependency.id, prefix) for dependency in current), default=-1) + 1
+    for dependency in stale:
+        dependency.deleteMe()
+    for offset, entity in enumerate(missing):
+        dependencies.add(f'{prefix}{next_index + offset}', entity)
+
+    count('dependencies_removed', len(stale))
+    count('dependencies_added', len(missing))
+    return True
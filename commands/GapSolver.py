@@ -0,0 +1,96 @@
+"""Chooses bar spacing and width for a cage.
+
+Every candidate (gap, bar) pair is evaluated for all three axes at once with the same
+spacing rules as ``CageLayout.grid_counts``.  The chosen pair gives the least cage material,
+which is what the cage costs in powder and print time.
+"""
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from .CageLayout import other_axes
+
+
+# Evenly spaced gap candidates, on top of the exact gaps at which the hole count changes
+GAP_SAMPLES = 256
+BAR_SAMPLES = 16
+# Highest hole count per axis whose exact gap is a candidate
+MAX_BREAKPOINTS = 256
+
+
+@dataclass
+class GapSolution:
+    gap: float
+    bar: float
+    volume: float
+    hole_counts: np.ndarray
+
+
+def hole_spans(sizes: np.ndarray, gaps: np.ndarray, bars: np.ndarray, thickness: float,
+               pattern: str = 'grid') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Hole counts and hole lengths along each axis, each as (candidates x 3) arrays.
+
+    ``across`` is the summed gap length across a row of holes and ``along`` the length the
+    holes cover along the other axis of a face.  They only differ for slots.
+    """
+    gaps = gaps[:, None]
+    bars = bars[:, None]
+    valid = (sizes - bars - gaps - thickness * 2) > 0
+    nums = np.where(valid, np.floor((sizes + bars) / (gaps + bars)), 0)
+    across = nums * gaps
+    if pattern == 'slot':
+        along = np.where(nums > 0, nums * gaps + (nums - 1) * bars, 0)
+    else:
+        along = across
+    return nums.astype(int), across, along
+
+
+def cage_volumes(sizes: Sequence[float], gaps: np.ndarray, bars: np.ndarray, thickness: float,
+                 pattern: str = 'grid') -> np.ndarray:
+    """Material volume of the cage for every (gap, bar) candidate pair."""
+    sizes = np.asarray(sizes, dtype=float)
+    shell = np.prod(sizes + thickness * 2) - np.prod(sizes)
+    _, across, along = hole_spans(sizes, gaps, bars, thickness, pattern)
+
+    holes = np.zeros(len(gaps))
+    for axis in range(3):
+        u, v = other_axes(axis)
+        holes += 2 * across[:, u] * along[:, v]
+    return shell - holes * thickness
+
+
+def gap_candidates(sizes: np.ndarray, bars: np.ndarray, min_gap: float, max_gap: float) -> np.ndarray:
+    """Candidate gaps for each bar as (bars x gaps).
+
+    The widest gap for each hole count is included, just below the exact value so rounding
+    cannot drop a hole.
+    """
+    counts = np.arange(1, MAX_BREAKPOINTS + 1)
+    breakpoints = (sizes[None, :, None] + bars[:, None, None]) / counts[None, None, :] - bars[:, None, None] - 1e-9
+    samples = np.broadcast_to(np.linspace(min_gap, max_gap, GAP_SAMPLES), (len(bars), GAP_SAMPLES))
+    candidates = np.concatenate([samples, breakpoints.reshape(len(bars), -1)], axis=1)
+    return np.clip(candidates, min_gap, max_gap)
+
+
+def solve_gap_bar(sizes: Sequence[float], thickness: float, min_gap: float, max_gap: float,
+                  min_bar: float, max_bar: float = None, pattern: str = 'grid') -> GapSolution:
+    """Gap and bar within the limits that give the cage around a box of ``sizes`` the least material.
+
+    ``max_gap`` is usually a bit below the smallest side of the caged part, so it cannot fall
+    through.  Without ``max_bar`` the bar width is fixed at ``min_bar``.
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    max_gap = max(max_gap, min_gap)
+    max_bar = min_bar if max_bar is None else max(max_bar, min_bar)
+    bars = np.unique(np.linspace(min_bar, max_bar, BAR_SAMPLES))
+
+    gaps = gap_candidates(sizes, bars, min_gap, max_gap)
+    bar_grid = np.broadcast_to(bars[:, None], gaps.shape).ravel()
+    gaps = gaps.ravel()
+
+    volumes = cage_volumes(sizes, gaps, bar_grid, thickness, pattern)
+    # Lowest volume first, then the narrowest gap, which spreads the load over more bars
+    best = np.lexsort((gaps, np.round(volumes, 12)))[0]
+    nums, _, _ = hole_spans(sizes, gaps[best:best + 1], bar_grid[best:best + 1], thickness, pattern)
+    return GapSolution(float(gaps[best]), float(bar_grid[best]), float(volumes[best]), nums[0])
@@ -0,0 +1,140 @@
+"""Timing spans and counters.
+
+Everything is recorded on the module level ``instrumentation`` object, which is disabled by
+default.  While disabled ``span`` returns a shared no-op context and ``count`` returns
+immediately, so instrumented code pays one attribute check.
+"""
+from collections import Counter, deque
+from functools import wraps
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, owner, name: str, args: dict):
+        self.owner = owner
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = self.owner.clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.owner.record(self.name, self.start, self.owner.clock() - self.start, self.args)
+        return False
+
+
+class Instrumentation:
+    """Nestable timing spans and counters kept in a ring buffer."""
+
+    def __init__(self, enabled: bool = False, capacity: int = 10000, clock: Callable[[], float] = time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.events = deque(maxlen=capacity)
+        self.counters = Counter()
+
+    def configure(self, enabled: bool, capacity: int = None):
+        self.enabled = enabled
+        if capacity is not None and capacity != self.events.maxlen:
+            self.events = deque(self.events, maxlen=capacity)
+
+    def span(self, name: str, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, args)
+
+    def traced(self, name: str = None):
+        """Decorator that records a span around every call."""
+        def decorator(function):
+            span_name = name or function.__name__
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.span(span_name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        self.counters[name] += value
+
+    def record(self, name: str, start: float, duration: float, args: dict = None):
+        self.events.append((name, start, duration, threading.get_ident(), args or None))
+
+    def clear(self):
+        self.events.clear()
+        self.counters.clear()
+
+    def hit_rates(self) -> dict:
+        """Hits over lookups for every pair of ``<name>_hits`` and ``<name>_misses`` counters, by name."""
+        names = {name.rsplit('_', 1)[0] for name in self.counters if name.endswith(('_hits', '_misses'))}
+        rates = {}
+        for name in sorted(names):
+            hits = self.counters[f'{name}_hits']
+            lookups = hits + self.counters[f'{name}_misses']
+            rates[name] = hits / lookups if lookups else 0.0
+        return rates
+
+    def summary(self) -> dict:
+        """Call count and total seconds per span name."""
+        totals = {}
+        for name, _, duration, _, _ in self.events:
+            calls, seconds = totals.get(name, (0, 0.0))
+            totals[name] = (calls + 1, seconds + duration)
+        return totals
+
+    def to_chrome_trace(self) -> dict:
+        """Events in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        trace_events = []
+        for name, start, duration, thread_id, args in self.events:
+            event = {'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': duration * 1e6, 'pid': pid, 'tid': thread_id}
+            if args:
+                event['args'] = {key: str(value) for key, value in args.items()}
+            trace_events.append(event)
+
+        last = max((start + duration for _, start, duration, _, _ in self.events), default=0.0)
+        for name, value in sorted(self.counters.items()):
+            trace_events.append({'name': name, 'ph': 'C', 'ts': last * 1e6, 'pid': pid, 'args': {name: value}})
+        for name, rate in self.hit_rates().items():
+            rate_name = f'{name}_hit_rate'
+            trace_events.append({'name': rate_name, 'ph': 'C', 'ts': last * 1e6, 'pid': pid, 'args': {rate_name: rate}})
+
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'spans': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self.summary().items()},
+            'counters': dict(self.counters),
+            'hit_rates': self.hit_rates(),
+        }, indent=2)
+
+    def export_chrome_trace(self, path: str):
+        with open(path, 'w') as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+
+
+instrumentation = Instrumentation()
+span = instrumentation.span
+count = instrumentation.count
+traced = instrumentation.traced
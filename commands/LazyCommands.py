@@ -0,0 +1,85 @@
+"""Command and custom feature stubs that import their implementation on first use.
+
+Only this module, apper and the configuration are imported when Fusion 360 starts the
+add-in.  The modules behind a command (geometry, NumPy, exporters) are imported when the
+command is first created, and the custom feature compute when a Cage feature first computes.
+"""
+import importlib
+
+import adsk.fusion
+from ..apper import apper
+from .. import config
+
+from .Instrumentation import span
+
+
+def load_attribute(module_name: str, attribute_name: str):
+    """An attribute of a module in this package, importing the module if needed."""
+    with span('lazy_import', module=module_name):
+        module = importlib.import_module(f'.{module_name}', __package__)
+    return getattr(module, attribute_name)
+
+
+class LazyCommand(apper.Fusion360CommandBase):
+    """Registers a command and creates the real command object when the command is first created.
+
+    The options name the implementation with ``command_module`` and ``command_class`` and are
+    passed on to it unchanged.
+    """
+
+    def __init__(self, name: str, options: dict):
+        self.lazy_name = name
+        self.lazy_options = options
+        self.command_object = None
+        super().__init__(name, options)
+
+    def load(self) -> apper.Fusion360CommandBase:
+        if self.command_object is None:
+            command_class = load_attribute(self.lazy_options['command_module'], self.lazy_options['command_class'])
+            with span('lazy_init', command=self.lazy_name):
+                self.command_object = command_class(self.lazy_name, self.lazy_options)
+        return self.command_object
+
+    def on_create(self, command, inputs):
+        self.load().on_create(command, inputs)
+
+    def on_activate(self, command, inputs, args, input_values):
+        self.load().on_activate(command, inputs, args, input_values)
+
+    def on_preview(self, command, inputs, args, input_values):
+        self.load().on_preview(command, inputs, args, input_values)
+
+    def on_input_changed(self, command, inputs, changed_input, input_values):
+        self.load().on_input_changed(command, inputs, changed_input, input_values)
+
+    def on_mouse_drag_begin(self, command, inputs, args, input_values):
+        self.load().on_mouse_drag_begin(command, inputs, args, input_values)
+
+    def on_mouse_drag_end(self, command, inputs, args, input_values):
+        self.load().on_mouse_drag_end(command, inputs, args, input_values)
+
+    def on_execute(self, command, inputs, args, input_values):
+        self.load().on_execute(command, inputs, args, input_values)
+
+    def on_destroy(self, command, inputs, reason, input_values):
+        self.load().on_destroy(command, inputs, reason, input_values)
+
+
+class LazyCustomFeature(apper.Fusion360CustomFeatureBase):
+    """Registers a custom feature and creates its compute object on the first compute.
+
+    ``compute_module`` and ``compute_class`` in the options name a class with an ``on_compute(args)``
+    method, created without arguments.
+    """
+
+    def __init__(self, name: str, options: dict):
+        self.lazy_options = options
+        self.compute = None
+        super().__init__(name, options)
+        config.custom_feature_definition = self.definition
+
+    def on_compute(self, args: adsk.fusion.CustomFeatureEventArgs):
+        if self.compute is None:
+            compute_class = load_attribute(self.lazy_options['compute_module'], self.lazy_options['compute_class'])
+            self.compute = compute_class()
+        self.compute.on_compute(args)
@@ -1,25 +1,64 @@
-from dataclasses import dataclass
-import math
-from typing import List
+import os
+import tempfile
+import threading
+import traceback
+
+import numpy as np
 
 import adsk.core
 import adsk.fusion
 from ..apper import apper
 from .. import config
 
+from .CageLayout import FeatureValues, ORIENTATIONS, PATTERNS, shell_slabs
+from .CageGeometry import (
+    mid_point, b_box_points, oriented_b_box_from_b_box, bounding_box_from_selections, create_brep_shell_box,
+    create_unit_box, placement_matrix, cutter_layout, create_cached_cage_body, compute_feature_body, SelectionBounds
+)
+from .CageCache import ComputeCache, DiskCache, GeometryRegistry, LRUCache, key_fingerprint
+from .CagePreviewMesh import box_triangles, cage_outline
+from .FeatureDependencies import DEPENDENCY_PREFIX, sync_dependencies
+from .GapSolver import solve_gap_bar
+from .OrientedBounds import to_local, to_world
+from .Instrumentation import instrumentation, traced, count
+from .PreviewScheduler import PreviewScheduler, OUTLINE, SHELL, FULL
+
 
 # region Custom Feature Utilities
-@dataclass
-class FeatureValues:
-    shell_thickness: float
-    bar: float
-    gap: float
-    x_pos: float
-    x_neg: float
-    y_pos: float
-    y_neg: float
-    z_pos: float
-    z_neg: float
+# Custom feature parameters in the order they are added to a new feature
+CAGE_PARAMETERS = {
+    'gap': 'Bar Spacing',
+    'bar': 'Bar Width',
+    'shell_thickness': 'Cage Thickness',
+    'x_pos': 'X Positive',
+    'x_neg': 'X Negative',
+    'y_pos': 'Y Positive',
+    'y_neg': 'Y Negative',
+    'z_pos': 'Z Positive',
+    'z_neg': 'Z Negative',
+}
+
+# Names of the cage patterns in the command dialog
+PATTERN_NAMES = {
+    'grid': 'Grid',
+    'slot': 'Slots',
+}
+
+# Names of the cage orientations in the command dialog
+ORIENTATION_NAMES = {
+    'world': 'Design Axes',
+    'minimum': 'Smallest Box',
+}
+
+# Axis and side of the cage box each offset direction moves
+DIRECTION_AXES = {
+    'x_pos': (0, 1),
+    'x_neg': (0, -1),
+    'y_pos': (1, 1),
+    'y_neg': (1, -1),
+    'z_pos': (2, 1),
+    'z_neg': (2, -1),
+}
 
 
 def get_feature_values(feature: adsk.fusion.CustomFeature) -> FeatureValues:
@@ -35,7 +74,64 @@ def get_feature_values(feature: adsk.fusion.CustomFeature) -> FeatureValues:
         params.itemById('y_neg').value,
         params.itemById('z_pos').value,
         params.itemById('z_neg').value,
+        get_feature_pattern(feature),
+        get_feature_orientation(feature),
+    )
+
+
+def get_feature_choice(feature: adsk.fusion.CustomFeature, key: str, choices: tuple) -> str:
+    """Choice stored as a unitless index parameter, the first choice when the index is missing or out of range."""
+    parameter = feature.parameters.itemById(key)
+    if parameter is None:
+        return choices[0]
+    index = int(round(parameter.value))
+    return choices[index] if 0 <= index < len(choices) else choices[0]
+
+
+def set_feature_choice(feature: adsk.fusion.CustomFeature, key: str, name: str, index: int):
+    """Store a choice index, adding the parameter to features created before it existed."""
+    parameter = feature.parameters.itemById(key)
+    if parameter is None:
+        feature.parameters.add(key, name, adsk.core.ValueInput.createByReal(index), '', True)
+    else:
+        parameter.value = index
+
+
+def get_feature_pattern(feature: adsk.fusion.CustomFeature) -> str:
+    # Features created before patterns were added have no pattern parameter and are grids
+    return get_feature_choice(feature, 'pattern', PATTERNS)
+
+
+def get_feature_orientation(feature: adsk.fusion.CustomFeature) -> str:
+    # Features created before orientations were added are aligned with the design axes
+    return get_feature_choice(feature, 'orientation', ORIENTATIONS)
+
+
+def pattern_from_name(name: str) -> str:
+    return next(pattern for pattern, pattern_name in PATTERN_NAMES.items() if pattern_name == name)
+
+
+def orientation_from_name(name: str) -> str:
+    return next(orientation for orientation, orientation_name in ORIENTATION_NAMES.items()
+                if orientation_name == name)
+
+
+def add_pattern_input(inputs: adsk.core.CommandInputs, pattern: str) -> adsk.core.DropDownCommandInput:
+    pattern_input = inputs.addDropDownCommandInput(
+        'pattern', "Pattern", adsk.core.DropDownStyles.TextListDropDownStyle
     )
+    for key, name in PATTERN_NAMES.items():
+        pattern_input.listItems.add(name, key == pattern)
+    return pattern_input
+
+
+def add_orientation_input(inputs: adsk.core.CommandInputs, orientation: str) -> adsk.core.DropDownCommandInput:
+    orientation_input = inputs.addDropDownCommandInput(
+        'orientation', "Orientation", adsk.core.DropDownStyles.TextListDropDownStyle
+    )
+    for key, name in ORIENTATION_NAMES.items():
+        orientation_input.listItems.add(name, key == orientation)
+    return orientation_input
 
 
 def get_feature_bodies(feature: adsk.fusion.CustomFeature) -> list:
@@ -61,6 +157,7 @@ def get_base_feature(feature: adsk.fusion.CustomFeature) -> adsk.fusion.BaseFeat
     return feature.features[0]
 
 
+@traced('update_base_feature_body')
 def update_base_feature_body(base: adsk.fusion.BaseFeature, tool: adsk.fusion.BRepBody):
     base.startEdit()
     source_body = base.bodies[0]
@@ -68,186 +165,148 @@ def update_base_feature_body(base: adsk.fusion.BaseFeature, tool: adsk.fusion.BR
     base.finishEdit()
 
 
-def update_feature_dependencies(feature: adsk.fusion.CustomFeature, bodies: list):
-    dependency: adsk.fusion.CustomFeatureDependency
-    for dependency in feature.dependencies:
-        dependency.deleteMe()
+# Attribute group and name of the fingerprint of the inputs a feature was last computed from
+FINGERPRINT_ATTRIBUTE = ('FusionBoxer', 'fingerprint')
 
-    body: adsk.fusion.BRepBody
-    for i, body in enumerate(bodies):
-        feature.dependencies.add('body_' + str(i), body)
 
+def get_stored_fingerprint(feature: adsk.fusion.CustomFeature) -> str:
+    attribute = feature.attributes.itemByName(*FINGERPRINT_ATTRIBUTE)
+    if attribute is None or get_base_feature(feature).bodies.count == 0:
+        return None
+    return attribute.value
 
-# endregion
 
+def store_fingerprint(feature: adsk.fusion.CustomFeature, fingerprint: str):
+    attribute = feature.attributes.itemByName(*FINGERPRINT_ATTRIBUTE)
+    if attribute is None:
+        feature.attributes.add(*FINGERPRINT_ATTRIBUTE, fingerprint)
+    elif attribute.value != fingerprint:
+        attribute.value = fingerprint
 
-# region Geometry Utilities
-def middle(min_p_value: float, max_p_value: float) -> float:
-    return min_p_value + ((max_p_value - min_p_value) / 2)
 
+_disk_cache = None
 
-def mid_point(p1: adsk.core.Point3D, p2: adsk.core.Point3D) -> adsk.core.Point3D:
-    return adsk.core.Point3D.create(
-        middle(p1.x, p2.x),
-        middle(p1.y, p2.y),
-        middle(p1.z, p2.z)
-    )
 
+def get_disk_cache() -> DiskCache:
+    """The shared on-disk body cache, or None when it is turned off or cannot be created."""
+    global _disk_cache
+    if _disk_cache is None and config.BODY_CACHE_MEGABYTES > 0:
+        directory = config.BODY_CACHE_DIRECTORY or os.path.join(tempfile.gettempdir(), 'FusionBoxer', 'bodies')
+        try:
+            _disk_cache = DiskCache(directory, config.BODY_CACHE_MEGABYTES * 2 ** 20)
+        except OSError:
+            return None
+    return _disk_cache
 
-def oriented_b_box_from_b_box(b_box: adsk.core.BoundingBox3D) -> adsk.core.OrientedBoundingBox3D:
-    ao = apper.AppObjects()
-    o_box = adsk.core.OrientedBoundingBox3D.create(
-        mid_point(b_box.minPoint, b_box.maxPoint),
-        ao.root_comp.yZConstructionPlane.geometry.normal.copy(),
-        ao.root_comp.xZConstructionPlane.geometry.normal.copy(),
-        b_box.maxPoint.x - b_box.minPoint.x,
-        b_box.maxPoint.y - b_box.minPoint.y,
-        b_box.maxPoint.z - b_box.minPoint.z
-    )
-    return o_box
 
+_geometry_registry = None
 
-def bounding_box_from_selections(selections):
-    if len(selections) > 0:
-        b_box: adsk.core.BoundingBox3D = selections[0].boundingBox
-        for selection in selections[1:]:
-            b_box.combine(selection.boundingBox)
 
-    else:
-        b_box = adsk.core.BoundingBox3D.create(
-            adsk.core.Point3D.create(-1, -1, -1),
-            adsk.core.Point3D.create(1, 1, 1)
+def get_geometry_registry() -> GeometryRegistry:
+    """Cage bodies shared by feature computes and batch creation, or None when it is turned off."""
+    global _geometry_registry
+    if _geometry_registry is None and config.GEOMETRY_REGISTRY_ENTRIES > 0:
+        _geometry_registry = GeometryRegistry(
+            config.GEOMETRY_REGISTRY_ENTRIES, config.GEOMETRY_REGISTRY_MEGABYTES * 2 ** 20
         )
-    return b_box
+    return _geometry_registry
 
 
-def expand_box_by_feature_values(b_box: adsk.core.BoundingBox3D, f_values: FeatureValues):
-    min_p = b_box.minPoint
-    max_p = b_box.maxPoint
+def new_selection_bounds() -> SelectionBounds:
+    return SelectionBounds(config.TIGHT_BOUNDS, config.TIGHT_BOUNDS_TOLERANCE)
 
-    points = [
-        adsk.core.Point3D.create(max_p.x + f_values.x_pos, middle(min_p.y, max_p.y), middle(min_p.z, max_p.z)),
-        adsk.core.Point3D.create(min_p.x - f_values.x_neg, middle(min_p.y, max_p.y), middle(min_p.z, max_p.z)),
-        adsk.core.Point3D.create(middle(min_p.x, max_p.x), max_p.y + f_values.y_pos, middle(min_p.z, max_p.z)),
-        adsk.core.Point3D.create(middle(min_p.x, max_p.x), min_p.y - f_values.y_neg, middle(min_p.z, max_p.z)),
-        adsk.core.Point3D.create(middle(min_p.x, max_p.x), middle(min_p.y, max_p.y), max_p.z + f_values.z_pos),
-        adsk.core.Point3D.create(middle(min_p.x, max_p.x), middle(min_p.y, max_p.y), min_p.z - f_values.z_neg)
-    ]
 
-    for point in points:
-        if not b_box.contains(point):
-            b_box.expand(point)
+@traced('update_feature_dependencies')
+def update_feature_dependencies(feature: adsk.fusion.CustomFeature, bodies: list) -> bool:
+    """Add and remove only the dependencies that differ from ``bodies``.  False when none did."""
+    return sync_dependencies(feature.dependencies, bodies)
 
 
-def create_outer_box(inner_o_box: adsk.core.OrientedBoundingBox3D, thickness: float) -> adsk.core.OrientedBoundingBox3D:
-    outer_o_box = inner_o_box.copy()
+def create_cage(selections: list, b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues,
+                expressions: dict = None, templates=None, frame: np.ndarray = None):
+    """Create a new cage component around the expanded box ``b_box``.
 
-    outer_o_box.length = outer_o_box.length + thickness * 2
-    outer_o_box.width = outer_o_box.width + thickness * 2
-    outer_o_box.height = outer_o_box.height + thickness * 2
+    In a parametric design this adds the Cage custom feature.  Parameters use ``expressions``
+    where given and the matching feature value otherwise.  With a ``frame`` the box is in
+    frame coordinates, see ``SelectionBounds.oriented_b_box``.
+    """
+    ao = apper.AppObjects()
+    expressions = expressions or {}
 
-    return outer_o_box
+    new_occ: adsk.fusion.Occurrence = ao.root_comp.occurrences.addNewComponent(adsk.core.Matrix3D.create())
+    new_comp = new_occ.component
+    new_comp.name = "Cage Part"
+    # new_comp.opacity = .5
 
+    if ao.design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
 
-def create_brep_shell_box(modified_b_box, thickness):
-    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
-    inner_o_box = oriented_b_box_from_b_box(modified_b_box)
+        base_feature = new_comp.features.baseFeatures.add()
+        base_feature.startEdit()
 
-    outer_o_box = create_outer_box(inner_o_box, thickness)
+        shell_box = create_brep_shell_box(b_box, feature_values.shell_thickness, frame)
 
-    inner_box = brep_mgr.createBox(inner_o_box)
-    outer_box = brep_mgr.createBox(outer_o_box)
+        new_body = new_comp.bRepBodies.add(shell_box, base_feature)
 
-    brep_mgr.booleanOperation(outer_box, inner_box, adsk.fusion.BooleanTypes.DifferenceBooleanType)
+        # shell_input = create_shell_input(new_body, thickness)
+        # shell_input.targetBaseFeature = base_feature
+        # new_comp.features.shellFeatures.add(shell_input)
 
-    return outer_box
+        base_feature.finishEdit()
+        # shell_input = create_shell_input(new_body, thickness)
 
+        # shell_feature = new_comp.features.shellFeatures.add(shell_input)
 
-def create_shell_input(body: adsk.fusion.BRepBody, thickness: float) -> adsk.fusion.ShellFeatureInput:
-    obj_col = adsk.core.ObjectCollection.create()
-    obj_col.add(body)
+        custom_features = new_comp.features.customFeatures
+        cf_input = custom_features.createInput(config.custom_feature_definition)
+        cf_input.setStartAndEndFeatures(base_feature, base_feature)
 
-    shell_input = body.parentComponent.features.shellFeatures.createInput(obj_col)
-    thickness_input = adsk.core.ValueInput.createByReal(thickness)
-    shell_input.outsideThickness = thickness_input
-    return shell_input
+        for i, selection in enumerate(selections):
+            cf_input.addDependency(DEPENDENCY_PREFIX + str(i), selection)
 
+        for key, name in CAGE_PARAMETERS.items():
+            expression = expressions.get(key)
+            if expression is not None:
+                value_input = adsk.core.ValueInput.createByString(expression)
+            else:
+                value_input = adsk.core.ValueInput.createByReal(getattr(feature_values, key))
 
-def create_gaps(b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues) -> List[adsk.fusion.BRepBody]:
-    gap = feature_values.gap
-    bar = feature_values.bar
-    thk = feature_values.shell_thickness
+            cf_input.addCustomParameter(
+                key, name,
+                value_input,
+                ao.design.fusionUnitsManager.defaultLengthUnits,
+                True
+            )
 
-    o_box = oriented_b_box_from_b_box(b_box)
-    create_o_box = adsk.core.OrientedBoundingBox3D.create
-    create_point = adsk.core.Point3D.create
+        # Unitless index into PATTERNS
+        cf_input.addCustomParameter(
+            'pattern', 'Pattern',
+            adsk.core.ValueInput.createByReal(PATTERNS.index(feature_values.pattern)),
+            '',
+            True
+        )
 
-    if (o_box.length - bar - gap - thk * 2) > 0:
-        x_num = int(math.floor((o_box.length + bar) / (gap + bar)))
-        x_step = (o_box.length - (gap * x_num) - (bar * (x_num - 1))) / 2
-    else:
-        x_num = 0
-        x_step = 0
+        # Unitless index into ORIENTATIONS
+        cf_input.addCustomParameter(
+            'orientation', 'Orientation',
+            adsk.core.ValueInput.createByReal(ORIENTATIONS.index(feature_values.orientation)),
+            '',
+            True
+        )
 
-    if (o_box.width - bar - gap - thk * 2) > 0:
-        y_num = int(math.floor((o_box.width + bar) / (gap + bar)))
-        y_step = (o_box.width - (gap * y_num) - (bar * (y_num - 1))) / 2
-    else:
-        y_num = 0
-        y_step = 0
+        return custom_features.add(cf_input)
 
-    if (o_box.height - bar - gap - thk * 2) > 0:
-        z_num = int(math.floor((o_box.height + bar) / (gap + bar)))
-        z_step = (o_box.height - (gap * z_num) - (bar * (z_num - 1))) / 2
     else:
-        z_num = 0
-        z_step = 0
-
-    x_min = b_box.minPoint.x + x_step + gap / 2
-    y_min = b_box.minPoint.y + y_step + gap / 2
-    z_min = b_box.minPoint.z + z_step + gap / 2
-
-    gaps = []
-    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
-
-    for z in range(z_num):
-        for y in range(y_num):
-            cp_x = create_point(
-                o_box.centerPoint.x - (o_box.length + thk) / 2, y_min + y * (bar + gap), z_min + z * (bar + gap))
-            x_box = create_o_box(cp_x, o_box.lengthDirection, o_box.widthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(x_box))
-
-            cp_x = create_point(
-                o_box.centerPoint.x + (o_box.length + thk) / 2, y_min + y * (bar + gap), z_min + z * (bar + gap))
-            x_box = create_o_box(cp_x, o_box.lengthDirection, o_box.widthDirection, thk, gap, gap)
-            # x_box = create_o_box(cp_x, o_box.lengthDirection, o_box.widthDirection, o_box.length + thk * 2, gap, gap)
-            gaps.append(brep_mgr.createBox(x_box))
-
-    for z in range(z_num):
-        for x in range(x_num):
-            cp_y = create_point(
-                x_min + x * (bar + gap), o_box.centerPoint.y - (o_box.width + thk) / 2, z_min + z * (bar + gap))
-            y_box = create_o_box(cp_y, o_box.widthDirection, o_box.lengthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(y_box))
-
-            cp_y = create_point(
-                x_min + x * (bar + gap), o_box.centerPoint.y + (o_box.width + thk) / 2, z_min + z * (bar + gap))
-            y_box = create_o_box(cp_y, o_box.widthDirection, o_box.lengthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(y_box))
-
-    for y in range(y_num):
-        for x in range(x_num):
-            cp_z = create_point(
-                x_min + x * (bar + gap), y_min + y * (bar + gap), o_box.centerPoint.z - (o_box.height + thk) / 2)
-            z_box = create_o_box(cp_z, o_box.heightDirection, o_box.widthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(z_box))
-
-            cp_z = create_point(
-                x_min + x * (bar + gap), y_min + y * (bar + gap), o_box.centerPoint.z + (o_box.height + thk) / 2)
-            z_box = create_o_box(cp_z, o_box.heightDirection, o_box.widthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(z_box))
-
-    return gaps
+        # The box is already expanded, so the offsets are not applied again
+        direct_values = FeatureValues(
+            feature_values.shell_thickness, feature_values.bar, feature_values.gap,
+            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, feature_values.pattern, feature_values.orientation
+        )
+        shell_box = create_cached_cage_body(
+            b_box, direct_values, config.CUTTER_MODE, templates, config.CAGE_CONSTRUCTION, get_disk_cache(), frame,
+            get_geometry_registry()
+        )
+
+        return new_comp.bRepBodies.add(shell_box)
 
 
 # endregion
@@ -342,65 +401,111 @@ class TheBox:
             "z_neg": Direction("Z Negative", self.z_neg_vector, inputs, self.feature_values.z_neg)
         }
 
+        # Cage axes as columns of a rotation, None when the cage is aligned with the design axes
+        self.frame = None
+
         self.graphics_group = ao.root_comp.customGraphicsGroups.add()
         self.brep_mgr = adsk.fusion.TemporaryBRepManager.get()
         self.graphics_box = None
+        self.shell_graphics = []
+        self.outline_graphic = None
+        # Preview level of the graphics in the group, None when it is empty
+        self.shown_level = None
+        self.unit_box = None
         self.selections = []
 
     def initialize_box(self, b_box):
         self.modified_b_box = b_box.copy()
 
+    def set_frame(self, frame):
+        """Work in the frame of an oriented cage.  The box is then kept in frame coordinates."""
+        self.frame = frame
+        for key, (axis, sign) in DIRECTION_AXES.items():
+            if frame is None:
+                self.directions[key].direction = getattr(self, f'{key}_vector')
+            else:
+                self.directions[key].direction = adsk.core.Vector3D.create(*(frame[:, axis] * sign).tolist())
+
     def update_box(self, point: adsk.core.Point3D):
+        # Manipulator points are in world coordinates
+        if self.frame is not None:
+            point = adsk.core.Point3D.create(*to_local(point.asArray(), self.frame).tolist())
         self.modified_b_box.expand(point)
 
     def update_manipulators(self):
-        min_p = self.modified_b_box.minPoint
-        max_p = self.modified_b_box.maxPoint
-
-        self.directions["x_pos"].update_manipulator(adsk.core.Point3D.create(
-            max_p.x, middle(min_p.y, max_p.y), middle(min_p.z, max_p.z))
-        )
-        self.directions["x_neg"].update_manipulator(adsk.core.Point3D.create(
-            min_p.x, middle(min_p.y, max_p.y), middle(min_p.z, max_p.z))
-        )
-        self.directions["y_pos"].update_manipulator(adsk.core.Point3D.create(
-            middle(min_p.x, max_p.x), max_p.y, middle(min_p.z, max_p.z))
-        )
-        self.directions["y_neg"].update_manipulator(adsk.core.Point3D.create(
-            middle(min_p.x, max_p.x), min_p.y, middle(min_p.z, max_p.z))
-        )
-        self.directions["z_pos"].update_manipulator(adsk.core.Point3D.create(
-            middle(min_p.x, max_p.x), middle(min_p.y, max_p.y), max_p.z)
-        )
-        self.directions["z_neg"].update_manipulator(adsk.core.Point3D.create(
-            middle(min_p.x, max_p.x), middle(min_p.y, max_p.y), min_p.z)
-        )
+        min_p, max_p = (np.array(point) for point in b_box_points(self.modified_b_box))
+        center = (min_p + max_p) / 2
+
+        for key, (axis, sign) in DIRECTION_AXES.items():
+            origin = center.copy()
+            origin[axis] = max_p[axis] if sign > 0 else min_p[axis]
+            self.directions[key].update_manipulator(
+                adsk.core.Point3D.create(*to_world(origin, self.frame).tolist())
+            )
 
     def box_center(self):
         return mid_point(self.modified_b_box.minPoint, self.modified_b_box.maxPoint)
 
+    def shell_graphics_valid(self):
+        return len(self.shell_graphics) == 6 and all(graphic.isValid for graphic in self.shell_graphics)
+
+    @traced('update_graphics')
     def update_graphics(self):
-        self.clear_graphics()
+        # The shell is shown as six wall slabs, each a transformed unit cube.
+        # Later previews only move and scale the existing slabs.
+        slabs = shell_slabs(*b_box_points(self.modified_b_box), self.thickness_input.value)
+
+        if self.shown_level != SHELL or not self.shell_graphics_valid():
+            self.clear_graphics()
+
+            if self.unit_box is None:
+                self.unit_box = create_unit_box()
+
+            color = adsk.core.Color.create(10, 200, 50, 125)
+            color_effect = adsk.fusion.CustomGraphicsSolidColorEffect.create(color)
+            count('graphics_entities', 6)
+            for _ in range(6):
+                graphic = self.graphics_group.addBRepBody(self.unit_box)
+                graphic.color = color_effect
+                self.shell_graphics.append(graphic)
+
+        for graphic, slab in zip(self.shell_graphics, slabs.tolist()):
+            graphic.transform = placement_matrix(slab, self.frame)
+        self.shown_level = SHELL
+
+    @traced('update_graphics_outline')
+    def update_graphics_outline(self, show_grid: bool = False):
+        # Wireframe proxy used while dragging, no BRep is created
+        if self.shown_level == OUTLINE and self.outline_graphic is not None and self.outline_graphic.isValid:
+            self.outline_graphic.deleteMe()
+        else:
+            self.clear_graphics()
 
-        shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value)
+        vertices, indices = cage_outline(*b_box_points(self.modified_b_box), self.feature_values, show_grid)
 
-        color = adsk.core.Color.create(10, 200, 50, 125)
-        color_effect = adsk.fusion.CustomGraphicsSolidColorEffect.create(color)
-        self.graphics_box = self.graphics_group.addBRepBody(shell_box)
-        self.graphics_box.color = color_effect
+        coordinates = adsk.core.CustomGraphicsCoordinates.create(to_world(vertices, self.frame).ravel().tolist())
+        self.outline_graphic = self.graphics_group.addLines(coordinates, indices.tolist(), False)
+        count('graphics_entities')
+        color = adsk.core.Color.create(10, 200, 50, 255)
+        self.outline_graphic.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(color)
+        self.shown_level = OUTLINE
 
+    @traced('update_graphics_full')
     def update_graphics_full(self):
         self.clear_graphics()
 
-        shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value)
-        gaps = create_gaps(self.modified_b_box, self.feature_values)
+        shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value, self.frame)
+        layout = cutter_layout(self.modified_b_box, self.feature_values)
 
-        g_color = adsk.core.Color.create(0, 0, 0, 0)
-        g_color_effect = adsk.fusion.CustomGraphicsSolidColorEffect.create(g_color)
-        for gap in gaps:
-            g_graphic = self.graphics_group.addBRepBody(gap)
-            g_graphic.depthPriority = 1
-            g_graphic.color = g_color_effect
+        # All cutters are one mesh, so the preview is two graphics entities however many holes there are
+        count('graphics_entities')
+        if len(layout) > 0:
+            vertices, indices = box_triangles(layout)
+            coordinates = adsk.core.CustomGraphicsCoordinates.create(to_world(vertices, self.frame).ravel().tolist())
+            gap_graphic = self.graphics_group.addMesh(coordinates, indices.tolist(), [], [])
+            gap_graphic.depthPriority = 1
+            gap_graphic.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(adsk.core.Color.create(0, 0, 0, 0))
+            count('graphics_entities')
 
         # brep_mgr = adsk.fusion.TemporaryBRepManager.get()
         # for gap in gaps:
@@ -410,94 +515,38 @@ class TheBox:
         color_effect = adsk.fusion.CustomGraphicsSolidColorEffect.create(color)
         self.graphics_box = self.graphics_group.addBRepBody(shell_box)
         self.graphics_box.color = color_effect
+        self.shown_level = FULL
 
     def clear_graphics(self):
         if self.graphics_box is not None:
             if self.graphics_box.isValid:
                 self.graphics_box.deleteMe()
+        self.shell_graphics = []
+        self.outline_graphic = None
+        self.shown_level = None
         for entity in self.graphics_group:
             if entity.isValid:
                 entity.deleteMe()
 
     def create_brep(self):
-        ao = apper.AppObjects()
-
-        new_occ: adsk.fusion.Occurrence = ao.root_comp.occurrences.addNewComponent(adsk.core.Matrix3D.create())
-        new_comp = new_occ.component
-        new_comp.name = "Cage Part"
-        # new_comp.opacity = .5
-
-        if ao.design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
-
-            base_feature = new_comp.features.baseFeatures.add()
-            base_feature.startEdit()
-
-            shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value)
-
-            new_body = new_comp.bRepBodies.add(shell_box, base_feature)
-
-            # shell_input = create_shell_input(new_body, thickness)
-            # shell_input.targetBaseFeature = base_feature
-            # new_comp.features.shellFeatures.add(shell_input)
-
-            base_feature.finishEdit()
-            # shell_input = create_shell_input(new_body, thickness)
-
-            # shell_feature = new_comp.features.shellFeatures.add(shell_input)
-
-            custom_features = new_comp.features.customFeatures
-            cf_input = custom_features.createInput(config.custom_feature_definition)
-            cf_input.setStartAndEndFeatures(base_feature, base_feature)
-
-            for i, selection in enumerate(self.selections):
-                cf_input.addDependency('body_' + str(i), selection)
-
-            cf_input.addCustomParameter(
-                'gap', 'Bar Spacing',
-                adsk.core.ValueInput.createByString(self.inputs.itemById('gap').expression),
-                ao.design.fusionUnitsManager.defaultLengthUnits,
-                True
-            )
-
-            cf_input.addCustomParameter(
-                'bar', 'Bar Width',
-                adsk.core.ValueInput.createByString(self.inputs.itemById('bar').expression),
-                ao.design.fusionUnitsManager.defaultLengthUnits,
-                True
-            )
-
-            cf_input.addCustomParameter(
-                'shell_thickness', 'Cage Thickness',
-                adsk.core.ValueInput.createByString(self.thickness_input.expression),
-                ao.design.fusionUnitsManager.defaultLengthUnits,
-                True
-            )
-
-            direction: Direction
-            for key, direction in self.directions.items():
-                cf_input.addCustomParameter(
-                    key, direction.name,
-                    adsk.core.ValueInput.createByString(direction.dist_input.expression),
-                    ao.design.fusionUnitsManager.defaultLengthUnits,
-                    True
-                )
-
-            custom_features.add(cf_input)
+        feature_values = FeatureValues(
+            self.thickness_input.value,
+            self.bar_input.value,
+            self.gap_input.value,
+            *[direction.dist_input.value for direction in self.directions.values()],
+            self.feature_values.pattern,
+            self.feature_values.orientation
+        )
 
-        else:
-            shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value)
-            feature_values = FeatureValues(
-                self.thickness_input.value,
-                self.inputs.itemById('bar').value,
-                self.inputs.itemById('gap').value,
-                0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-            )
-            gaps = create_gaps(self.modified_b_box, feature_values)
-            brep_mgr = adsk.fusion.TemporaryBRepManager.get()
-            for gap in gaps:
-                brep_mgr.booleanOperation(shell_box, gap, adsk.fusion.BooleanTypes.DifferenceBooleanType)
+        expressions = {
+            'gap': self.gap_input.expression,
+            'bar': self.bar_input.expression,
+            'shell_thickness': self.thickness_input.expression,
+        }
+        for key, direction in self.directions.items():
+            expressions[key] = direction.dist_input.expression
 
-            new_comp.bRepBodies.add(shell_box)
+        create_cage(self.selections, self.modified_b_box, feature_values, expressions, frame=self.frame)
 
     def edit_brep(self, custom_feature: adsk.fusion.CustomFeature):
         # shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value)
@@ -518,9 +567,74 @@ class TheBox:
         parameter = custom_feature.parameters.itemById('bar')
         parameter.expression = self.bar_input.expression
 
+        set_feature_choice(custom_feature, 'pattern', 'Pattern', PATTERNS.index(self.feature_values.pattern))
+
+        set_feature_choice(
+            custom_feature, 'orientation', 'Orientation', ORIENTATIONS.index(self.feature_values.orientation)
+        )
+
         update_feature_dependencies(custom_feature, self.selections)
 
 
+# Fired from a timer thread once preview events have stopped, handled on the main thread
+IDLE_PREVIEW_EVENT = 'offset_b_box_idle_preview'
+
+
+class IdlePreview(adsk.core.CustomEventHandler):
+    """Shows the requested preview level again once a burst of events has stopped.
+
+    A degraded preview starts a timer, each further event restarts it.  When it runs out the
+    custom event brings the check back to the main thread, where the command is asked for a
+    new preview if the scheduler still needs an upgrade.
+    """
+
+    def __init__(self, scheduler: PreviewScheduler):
+        super().__init__()
+        self.scheduler = scheduler
+        self.command = None
+        self.event = None
+        self.timer = None
+
+    def start(self, command: adsk.core.Command):
+        self.stop()
+        self.command = command
+        self.event = apper.AppObjects().app.registerCustomEvent(IDLE_PREVIEW_EVENT)
+        self.event.add(self)
+
+    def stop(self):
+        self.cancel()
+        if self.event is not None:
+            self.event.remove(self)
+            apper.AppObjects().app.unregisterCustomEvent(IDLE_PREVIEW_EVENT)
+            self.event = None
+        self.command = None
+
+    def schedule(self):
+        self.cancel()
+        self.timer = threading.Timer(
+            self.scheduler.idle_delay(), apper.AppObjects().app.fireCustomEvent, (IDLE_PREVIEW_EVENT,)
+        )
+        self.timer.daemon = True
+        self.timer.start()
+
+    def cancel(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def notify(self, args):
+        try:
+            self.timer = None
+            if self.command is None:
+                return
+            if self.scheduler.needs_upgrade():
+                self.command.doExecutePreview()
+            elif self.scheduler.upgrade_pending():
+                self.schedule()
+        except:
+            apper.AppObjects().ui.messageBox('Idle preview failed:\n{}'.format(traceback.format_exc()))
+
+
 class OffsetBoundingBoxCommand(apper.Fusion360CommandBase):
     def __init__(self, name: str, options: dict):
         self.create_feature: bool = options.get('create_feature', True)
@@ -535,15 +649,23 @@ class OffsetBoundingBoxCommand(apper.Fusion360CommandBase):
         super().__init__(name, options)
 
         self.make_full_preview = False
-
+        self.dragging = False
+        self.scheduler = PreviewScheduler(config.PREVIEW_BUDGET_MS / 1000)
+        self.idle_preview = IdlePreview(self.scheduler)
+        self.selection_bounds = None
+        self.selection_b_box = None
+        self.selection_count = 0
+        self.selection_orientation = None
+        self.gap_edited = False
+
+    @traced('on_preview')
     def on_preview(self, command, inputs, args, input_values):
-        ao = apper.AppObjects()
-        ao.print_msg(f'Preview Event - editing_feature = {self.editing_feature}')
-
         selections = input_values['body_select']
         if len(selections) > 0:
-            new_box = bounding_box_from_selections(selections)
-            self.the_box.initialize_box(new_box)
+            # The combined box is updated in on_input_changed when the selection changes
+            if self.selection_b_box is None or self.selection_count != len(selections):
+                self.update_selection_b_box(selections)
+            self.the_box.initialize_box(self.selection_b_box)
 
             direction: Direction
             for key, direction in self.the_box.directions.items():
@@ -556,84 +678,119 @@ class OffsetBoundingBoxCommand(apper.Fusion360CommandBase):
                 # if not self.the_box.modified_b_box.contains(point):
                 self.the_box.update_box(point)
 
-            if self.make_full_preview:
-                self.the_box.update_graphics_full()
-                self.make_full_preview = False
+            if self.dragging and config.DRAG_PREVIEW in ('outline', 'grid'):
+                requested = OUTLINE
+            elif self.make_full_preview:
+                requested = FULL
             else:
-                self.the_box.update_graphics()
+                requested = SHELL
 
+            # Bursts of events get a cheaper level, the full preview is kept pending until it is shown
+            level = self.scheduler.choose_level(requested)
+            self.scheduler.measure(level, lambda: self.show_preview(level))
+            if level == FULL:
+                self.make_full_preview = False
+            if level < requested:
+                self.idle_preview.schedule()
+
+    def update_selection_b_box(self, selections: list) -> adsk.core.BoundingBox3D:
+        """Combined box of the selection, in the frame of the cage orientation, which is passed on to the box."""
+        orientation = self.the_box.feature_values.orientation
+        if orientation == self.selection_orientation == 'world' and 0 < self.selection_count < len(selections):
+            # Selecting appends to the selection, so only the new bodies are looked at
+            frame, self.selection_b_box = None, self.selection_bounds.extend(selections[self.selection_count:])
+        else:
+            frame, self.selection_b_box = self.selection_bounds.oriented_b_box(selections, orientation)
+        self.the_box.set_frame(frame)
+        self.selection_count = len(selections)
+        self.selection_orientation = orientation
+        return self.selection_b_box
+
+    def show_preview(self, level: int):
+        if level == OUTLINE:
+            self.the_box.update_graphics_outline(config.DRAG_PREVIEW == 'grid')
+        elif level == SHELL:
+            self.the_box.update_graphics()
+        else:
+            self.the_box.update_graphics_full()
+
+    @traced('on_input_changed')
     def on_input_changed(self, command, inputs, changed_input, input_values):
-        ao = apper.AppObjects()
-        ao.print_msg(f'Input Changed Event - editing_feature = {self.editing_feature}')
         self.make_full_preview = True
 
         thickness_value = input_values['thick_input']
         bar_value = input_values['bar']
         gap_value = input_values['gap']
-        gap_limit = thickness_value * 2
 
-        if changed_input.id == 'body_select':
+        if changed_input.id == 'orientation':
+            self.the_box.feature_values.orientation = orientation_from_name(input_values['orientation'])
+
+        if changed_input.id in ('body_select', 'orientation'):
             selections = input_values['body_select']
 
             if len(selections) > 0:
                 self.the_box.selections = selections
 
-                new_box = bounding_box_from_selections(selections)
+                new_box = self.update_selection_b_box(selections)
 
                 self.the_box.initialize_box(new_box)
                 self.the_box.update_manipulators()
-
-                o_box = oriented_b_box_from_b_box(new_box)
-                # min_side = min(o_box.length, o_box.width, o_box.height)
-
-                min_gaps = []
-                for side in [o_box.length, o_box.width, o_box.height]:
-                    min_gap = side * .9
-                    if min_gap > gap_limit:
-                        min_gaps.append(min_gap)
-
-                if len(min_gaps) > 0:
-                    most_min_gap = min(min_gaps)
-                else:
-                    most_min_gap = thickness_value
-
-                four_gaps = (side - bar_value * 3) / 4
-                three_gaps = (side - bar_value * 2) / 3
-                two_gaps = (side - bar_value) / 2
-
-                if four_gaps > gap_limit:
-                    new_gap = four_gaps
-                elif three_gaps > gap_limit:
-                    new_gap = three_gaps
-                elif two_gaps > gap_limit:
-                    new_gap = two_gaps
-                else:
-                    new_gap = most_min_gap
-
-                inputs.itemById('gap').value = new_gap
-                self.the_box.feature_values.gap = new_gap
+                self.solve_gap(inputs, new_box, thickness_value, bar_value)
 
         elif changed_input.id == 'bar':
             self.the_box.feature_values.bar = bar_value
 
         elif changed_input.id == 'gap':
             self.the_box.feature_values.gap = gap_value
+            self.gap_edited = True
 
         elif changed_input.id == 'thick_input':
             self.the_box.feature_values.shell_thickness = thickness_value
+
+        elif changed_input.id == 'pattern':
+            self.the_box.feature_values.pattern = pattern_from_name(input_values['pattern'])
+            # Slots leave different material than a grid, so the best gap changes with the pattern
+            if self.selection_b_box is not None and len(input_values['body_select']) > 0:
+                self.solve_gap(inputs, self.selection_b_box, thickness_value, bar_value)
         else:
             self.make_full_preview = False
 
+    def solve_gap(self, inputs: adsk.core.CommandInputs, part_b_box: adsk.core.BoundingBox3D, thickness: float,
+                  bar: float):
+        """Least material, with gaps from twice the thickness up to just below the smallest part side.
+
+        The gap of an edited feature, or one the user typed in, is kept.
+        """
+        if self.gap_edited:
+            return
+
+        min_point, max_point = b_box_points(part_b_box)
+        part_sizes = np.subtract(max_point, min_point)
+        offsets = {key: direction.dist_input.value for key, direction in self.the_box.directions.items()}
+        cage_sizes = part_sizes + [
+            offsets['x_pos'] + offsets['x_neg'], offsets['y_pos'] + offsets['y_neg'],
+            offsets['z_pos'] + offsets['z_neg']
+        ]
+        solution = solve_gap_bar(
+            cage_sizes, thickness, thickness * 2, part_sizes.min() * .9, bar,
+            pattern=self.the_box.feature_values.pattern
+        )
+
+        inputs.itemById('gap').value = solution.gap
+        self.the_box.feature_values.gap = solution.gap
+
+    def on_mouse_drag_begin(self, command, inputs, args, input_values):
+        self.dragging = True
+
+    @traced('on_mouse_drag_end')
     def on_mouse_drag_end(self, command, inputs, args, input_values):
-        ao = apper.AppObjects()
-        ao.print_msg(f'Mouse Drag End Event - editing_feature = {self.editing_feature}')
+        self.dragging = False
         self.make_full_preview = True
+        self.scheduler.reset()
         command.doExecutePreview()
 
+    @traced('on_execute')
     def on_execute(self, command, inputs, args, input_values):
-        ao = apper.AppObjects()
-        ao.print_msg(f'Execute Event - editing_feature = {self.editing_feature}')
-
         self.the_box.clear_graphics()
         if self.create_feature:
             self.the_box.create_brep()
@@ -643,18 +800,27 @@ class OffsetBoundingBoxCommand(apper.Fusion360CommandBase):
             if self.restore_timeline_object is not None:
                 self.restore_timeline_object.rollTo(False)
 
+    @traced('on_destroy')
     def on_destroy(self, command, inputs, reason, input_values):
-        ao = apper.AppObjects()
-        ao.print_msg(f'Destroy Event - editing_feature = {self.editing_feature}')
-
+        self.idle_preview.stop()
         self.the_box.clear_graphics()
 
+        if instrumentation.enabled and config.INSTRUMENTATION_TRACE_FILE:
+            instrumentation.export_chrome_trace(config.INSTRUMENTATION_TRACE_FILE)
+
+    @traced('on_create')
     def on_create(self, command, inputs):
         ao = apper.AppObjects()
-        ao.print_msg(f'Create Event - editing_feature = {self.editing_feature}')
 
         self.inputs_initialized = False
         self.rolled_for_edit = False
+        self.selection_bounds = new_selection_bounds()
+        self.selection_b_box = None
+        self.selection_count = 0
+        self.selection_orientation = None
+        self.gap_edited = not self.create_feature
+        self.scheduler.reset()
+        self.idle_preview.start(command)
 
         units = ao.units_manager.defaultLengthUnits
 
@@ -676,6 +842,8 @@ class OffsetBoundingBoxCommand(apper.Fusion360CommandBase):
 
             gap_input = adsk.core.ValueInput.createByReal(2)
             bar_input = adsk.core.ValueInput.createByReal(.2)
+            pattern = 'grid'
+            orientation = 'world'
         else:
             self.editing_feature = get_editing_feature()
             thickness_expression = self.editing_feature.parameters.itemById('shell_thickness').expression
@@ -684,19 +852,21 @@ class OffsetBoundingBoxCommand(apper.Fusion360CommandBase):
             gap_input = adsk.core.ValueInput.createByString(gap_expression)
             bar_expression = self.editing_feature.parameters.itemById('bar').expression
             bar_input = adsk.core.ValueInput.createByString(bar_expression)
+            pattern = get_feature_pattern(self.editing_feature)
+            orientation = get_feature_orientation(self.editing_feature)
 
         inputs.addValueInput('thick_input', "Cage Thickness", units, thickness_input)
 
         inputs.addValueInput('gap', "Bar Spacing", units, gap_input)
         inputs.addValueInput('bar', "Bar Width", units, bar_input)
+        add_pattern_input(inputs, pattern)
+        add_orientation_input(inputs, orientation)
 
         # Create main box class
         self.the_box = TheBox(b_box, inputs, self.editing_feature)
 
+    @traced('on_activate')
     def on_activate(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        ao = apper.AppObjects()
-        ao.print_msg(f'Activate Event - editing_feature = {self.editing_feature}')
-
         if not self.create_feature:
 
             if not self.rolled_for_edit:
@@ -720,31 +890,45 @@ class OffsetBoundingBoxCommand(apper.Fusion360CommandBase):
             pass
 
 
-class BoxCustomFeature(apper.Fusion360CustomFeatureBase):
-    def __init__(self, name: str, options: dict):
-        super().__init__(name, options)
-        config.custom_feature_definition = self.definition
+class CageFeatureCompute:
+    """Compute of the Cage custom feature, apart from its registration so it can be loaded on first use."""
 
+    def __init__(self):
+        self.selection_bounds = {}
+        self.cutter_templates = LRUCache(max_entries=256)
+        self.compute_cache = ComputeCache(config.COMPUTE_CACHE_ENTRIES, config.COMPUTE_CACHE_MEGABYTES * 2 ** 20)
+
+    @traced('on_compute')
     def on_compute(self, args: adsk.fusion.CustomFeatureEventArgs):
+        custom_feature = args.customFeature
+
         # Get feature parameters and dependencies
-        feature_bodies = get_feature_bodies(args.customFeature)
-        feature_values = get_feature_values(args.customFeature)
+        feature_bodies = get_feature_bodies(custom_feature)
+        feature_values = get_feature_values(custom_feature)
 
         # Make the box
-        b_box = bounding_box_from_selections(feature_bodies)
-        expand_box_by_feature_values(b_box, feature_values)
-
-        # TODO Only if necessary, Best way to tell if this is different?  Maybe check min/max points?
-        shell_box = create_brep_shell_box(b_box, feature_values.shell_thickness)
+        selection_bounds = self.selection_bounds.get(custom_feature.entityToken)
+        if selection_bounds is None:
+            selection_bounds = new_selection_bounds()
+            self.selection_bounds[custom_feature.entityToken] = selection_bounds
+
+        cage_body, key = compute_feature_body(
+            custom_feature.entityToken, feature_bodies, feature_values, selection_bounds, self.compute_cache,
+            config.CUTTER_MODE, self.cutter_templates, config.CAGE_CONSTRUCTION,
+            get_stored_fingerprint(custom_feature), get_disk_cache(), get_geometry_registry()
+        )
 
-        gaps = create_gaps(b_box, feature_values)
-        brep_mgr = adsk.fusion.TemporaryBRepManager.get()
-        for gap in gaps:
-            brep_mgr.booleanOperation(shell_box, gap, adsk.fusion.BooleanTypes.DifferenceBooleanType)
+        # Nothing relevant changed since this feature was last computed, the base feature body is kept
+        if cage_body is None:
+            self.compute_cache.set_current(custom_feature.entityToken, key)
+            return
 
         # Update base feature
-        base = get_base_feature(args.customFeature)
-        update_base_feature_body(base, shell_box)
+        brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+        base = get_base_feature(custom_feature)
+        update_base_feature_body(base, brep_mgr.copy(cage_body))
+        self.compute_cache.set_current(custom_feature.entityToken, key)
+        store_fingerprint(custom_feature, key_fingerprint(key))
 
         # TODO Update shell feature.  How to properly do this, or is possible today?
         # shell = _getShellFeature(args.customFeature)
@@ -0,0 +1,197 @@
+"""Small oriented boxes around point clouds.
+
+A frame is a 3 x 3 rotation whose columns are the box axes in world coordinates.  Points
+are taken into a frame with ``points @ frame`` and back with ``local @ frame.T``.
+
+The fit starts from the world axes and from the principal axes of the points, and turns
+each start frame about one of its axes at a time to the smallest rectangle around the
+points projected along that axis, until no turn makes the box smaller.  The rectangles are
+found with rotating calipers on the 2D convex hull.  All of this runs on the few points
+that are extreme along a fixed set of directions, and only the final extents use every point.
+"""
+import itertools
+from typing import Tuple
+
+import numpy as np
+
+from .CageLayout import other_axes
+
+
+# Directions, on top of the world axes, along which extreme points are kept for the fit
+DIRECTION_SAMPLES = 64
+# Points projected at a time when looking for extreme points
+POINT_CHUNK = 65536
+MAX_REFINE_PASSES = 8
+# The world axes are kept unless the fitted box is at least this much smaller
+WORLD_AXES_MARGIN = 0.02
+
+
+def sphere_directions(count: int) -> np.ndarray:
+    """``count`` roughly evenly spread unit vectors on a half sphere, plus the world axes."""
+    index = np.arange(count) + 0.5
+    z = index / count
+    radius = np.sqrt(1 - z ** 2)
+    angle = np.pi * (1 + 5 ** 0.5) * index
+    directions = np.column_stack([radius * np.cos(angle), radius * np.sin(angle), z])
+    return np.concatenate([np.eye(3), directions])
+
+
+def extreme_points(points: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    """Points with the lowest or highest projection on any of the directions."""
+    high = np.full(len(directions), -np.inf)
+    low = np.full(len(directions), np.inf)
+    high_index = np.zeros(len(directions), dtype=np.int64)
+    low_index = np.zeros(len(directions), dtype=np.int64)
+    rows = np.arange(len(directions))
+    # Single precision is enough to pick the points, the box extents are measured in double
+    single_directions = directions.astype(np.float32)
+
+    for start in range(0, len(points), POINT_CHUNK):
+        # One row per direction, so the reductions run along contiguous memory
+        projections = single_directions @ points[start:start + POINT_CHUNK].astype(np.float32).T
+        arg_max = projections.argmax(axis=1)
+        arg_min = projections.argmin(axis=1)
+        chunk_high = projections[rows, arg_max]
+        chunk_low = projections[rows, arg_min]
+        high_index = np.where(chunk_high > high, arg_max + start, high_index)
+        low_index = np.where(chunk_low < low, arg_min + start, low_index)
+        high = np.maximum(high, chunk_high)
+        low = np.minimum(low, chunk_low)
+
+    return points[np.unique(np.concatenate([high_index, low_index]))]
+
+
+def convex_hull_2d(points: np.ndarray) -> np.ndarray:
+    """Counter-clockwise convex hull of a small set of 2D points (monotone chain)."""
+    points = np.unique(points, axis=0)
+    if len(points) < 3:
+        return points
+
+    def half_hull(ordered):
+        hull = []
+        for x, y in ordered:
+            while len(hull) >= 2:
+                (ax, ay), (bx, by) = hull[-2], hull[-1]
+                if (bx - ax) * (y - ay) - (by - ay) * (x - ax) > 0:
+                    break
+                hull.pop()
+            hull.append((x, y))
+        return hull
+
+    ordered = points.tolist()
+    lower = half_hull(ordered)
+    upper = half_hull(reversed(ordered))
+    return np.array(lower[:-1] + upper[:-1])
+
+
+def min_area_rectangle(points: np.ndarray) -> Tuple[float, float]:
+    """Angle and area of the smallest rectangle around 2D points.
+
+    One side of that rectangle lies along a hull edge, so only the hull edge directions
+    are tried, all at once.  The angle turns the x axis onto the rectangle.
+    """
+    hull = convex_hull_2d(points)
+    if len(hull) < 3:
+        extents = np.ptp(points, axis=0) if len(points) else np.zeros(2)
+        return 0.0, float(np.prod(extents))
+
+    edges = np.roll(hull, -1, axis=0) - hull
+    angles = np.unique(np.arctan2(edges[:, 1], edges[:, 0]) % (np.pi / 2))
+    cos, sin = np.cos(angles)[:, None], np.sin(angles)[:, None]
+    x = hull[:, 0][None, :] * cos + hull[:, 1][None, :] * sin
+    y = hull[:, 1][None, :] * cos - hull[:, 0][None, :] * sin
+    areas = np.ptp(x, axis=1) * np.ptp(y, axis=1)
+
+    best = int(np.argmin(areas))
+    return float(angles[best]), float(areas[best])
+
+
+def box_volume(points: np.ndarray, frame: np.ndarray, padding: float = 0.0) -> float:
+    """Volume of the box around the points in the frame.  ``padding`` keeps flat boxes comparable."""
+    return float(np.prod(np.ptp(points @ frame, axis=0) + padding))
+
+
+def principal_frame(points: np.ndarray) -> np.ndarray:
+    """Eigenvectors of the point covariance as a right handed frame."""
+    centered = points - points.mean(axis=0)
+    _, vectors = np.linalg.eigh(centered.T @ centered)
+    if np.linalg.det(vectors) < 0:
+        vectors[:, 0] *= -1
+    return vectors
+
+
+def refine_frame(points: np.ndarray, frame: np.ndarray, padding: float) -> Tuple[np.ndarray, float]:
+    """Turn the frame about its own axes while that makes the box around the points smaller."""
+    volume = box_volume(points, frame, padding)
+    for _ in range(MAX_REFINE_PASSES):
+        improved = False
+        for axis in range(3):
+            u, v = other_axes(axis)
+            angle, _ = min_area_rectangle(points @ frame[:, [u, v]])
+            if angle == 0.0:
+                continue
+
+            candidate = frame.copy()
+            candidate[:, u] = np.cos(angle) * frame[:, u] + np.sin(angle) * frame[:, v]
+            candidate[:, v] = np.cos(angle) * frame[:, v] - np.sin(angle) * frame[:, u]
+            candidate_volume = box_volume(points, candidate, padding)
+            if candidate_volume < volume * (1 - 1e-9):
+                frame, volume, improved = candidate, candidate_volume, True
+        if not improved:
+            break
+    return frame, volume
+
+
+def canonical_frame(frame: np.ndarray) -> np.ndarray:
+    """The same box axes, ordered and signed to be as close as possible to the world X, Y and Z."""
+    order = max(itertools.permutations(range(3)), key=lambda axes: np.abs(frame[[0, 1, 2], list(axes)]).sum())
+    frame = frame[:, list(order)]
+    frame = frame * np.where(np.diag(frame) < 0, -1.0, 1.0)
+    if np.linalg.det(frame) < 0:
+        weakest = int(np.argmin(np.abs(np.diag(frame))))
+        frame[:, weakest] *= -1
+    return frame
+
+
+def fit_points(points: np.ndarray, direction_samples: int = DIRECTION_SAMPLES) -> np.ndarray:
+    """The points the fit looks at.  Those of a union of point sets are among the union of theirs."""
+    return extreme_points(np.asarray(points, dtype=float).reshape(-1, 3), sphere_directions(direction_samples))
+
+
+def fit_oriented_box(points: np.ndarray, candidates: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Frame, and min and max point in it, of a close to minimum volume box around the points.
+
+    The box always contains every point.  The frame is the identity when the world axes give
+    a box that is about as small.  ``candidates`` can be passed when ``fit_points`` were
+    already taken, for example for each of several bodies.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if len(points) == 0:
+        return np.eye(3), np.zeros(3), np.zeros(3)
+
+    candidates = fit_points(points) if candidates is None else np.asarray(candidates, dtype=float).reshape(-1, 3)
+    padding = 1e-6 * max(float(np.ptp(candidates, axis=0).max()), 1e-12)
+
+    world_volume = box_volume(candidates, np.eye(3), padding)
+    best_frame, best_volume = np.eye(3), world_volume
+    for start in (np.eye(3), principal_frame(candidates)):
+        frame, volume = refine_frame(candidates, start, padding)
+        if volume < best_volume:
+            best_frame, best_volume = frame, volume
+
+    if best_volume > world_volume * (1 - WORLD_AXES_MARGIN):
+        best_frame = np.eye(3)
+
+    frame = canonical_frame(best_frame)
+    local = points @ frame
+    return frame, local.min(axis=0), local.max(axis=0)
+
+
+def to_local(points: np.ndarray, frame: np.ndarray = None) -> np.ndarray:
+    points = np.asarray(points, dtype=float)
+    return points if frame is None else points @ frame
+
+
+def to_world(points: np.ndarray, frame: np.ndarray = None) -> np.ndarray:
+    points = np.asarray(points, dtype=float)
+    return points if frame is None else points @ frame.T
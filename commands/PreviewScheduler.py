@@ -0,0 +1,93 @@
+"""Chooses how much preview work to do for each event."""
+import time
+from typing import Callable
+
+
+# Preview levels, cheapest first
+OUTLINE = 0
+SHELL = 1
+FULL = 2
+
+
+class PreviewScheduler:
+    """Coalesces bursts of preview events and degrades the level of detail to stay in a latency budget.
+
+    Call ``choose_level`` at the start of a preview event and run the preview at the returned
+    level through ``measure``, which records the time it took.  While events keep arriving
+    closer together than ``burst_interval`` they are treated as one burst and get the cheapest
+    level that has recently fit into ``budget``.  Once the events stop for ``idle_interval``
+    ``needs_upgrade`` is true until the requested level has been shown, and the next event
+    gets the requested level again.
+
+    All times are in seconds.  ``clock`` can be replaced for testing.
+    """
+
+    def __init__(self, budget: float = 0.05, burst_interval: float = 0.15, idle_interval: float = 0.3,
+                 smoothing: float = 0.5, clock: Callable[[], float] = time.perf_counter):
+        self.budget = budget
+        self.burst_interval = burst_interval
+        self.idle_interval = idle_interval
+        self.smoothing = smoothing
+        self.clock = clock
+
+        self.durations = {}
+        self.last_event = None
+        self.in_burst = False
+        self.requested = None
+        self.shown_level = None
+
+    def expected_duration(self, level: int) -> float:
+        return self.durations.get(level, 0.0)
+
+    def choose_level(self, requested: int = FULL) -> int:
+        now = self.clock()
+        self.in_burst = self.last_event is not None and (now - self.last_event) < self.burst_interval
+        self.last_event = now
+        self.requested = requested
+
+        if not self.in_burst:
+            return requested
+
+        level = requested
+        while level > OUTLINE and self.expected_duration(level) > self.budget:
+            level -= 1
+        return level
+
+    def record(self, level: int, duration: float):
+        previous = self.durations.get(level)
+        if previous is None:
+            self.durations[level] = duration
+        else:
+            self.durations[level] = previous + self.smoothing * (duration - previous)
+
+    def measure(self, level: int, preview: Callable[[], None]):
+        start = self.clock()
+        preview()
+        end = self.clock()
+        self.record(level, end - start)
+        self.shown_level = level
+        # Events queued behind a slow preview still belong to the same burst
+        self.last_event = end
+
+    def is_idle(self) -> bool:
+        return self.last_event is None or (self.clock() - self.last_event) >= self.idle_interval
+
+    def idle_delay(self) -> float:
+        """Time until the events count as stopped."""
+        if self.last_event is None:
+            return 0.0
+        return max(0.0, self.last_event + self.idle_interval - self.clock())
+
+    def upgrade_pending(self) -> bool:
+        """True when a lower level than requested is showing."""
+        return self.shown_level is not None and self.shown_level < self.requested
+
+    def needs_upgrade(self) -> bool:
+        """True when the events have stopped and a lower level than requested is showing."""
+        return self.upgrade_pending() and self.is_idle()
+
+    def reset(self):
+        self.last_event = None
+        self.in_burst = False
+        self.requested = None
+        self.shown_level = None
@@ -7,4 +7,40 @@ company_name = "Autodesk"
 DEFAULT_OFFSET = "3 mm"
 DEFAULT_SHELL = "2 mm"
 
+# Size cages from the tessellation of curved bodies instead of their (possibly loose) bounding box.
+# The tolerance is in cm, the internal Fusion 360 length unit.
+TIGHT_BOUNDS = False
+TIGHT_BOUNDS_TOLERANCE = 0.005
+
+# How gap cutters are built: 'box', 'instance' or 'row' (see CageGeometry.create_cutter_tools)
+CUTTER_MODE = 'row'
+
+# How cage bodies are built: 'subtract' cuts gaps out of a solid shell, 'bars' unions the bars of each face
+CAGE_CONSTRUCTION = 'subtract'
+
+# Preview while dragging a manipulator: 'outline', 'grid' (outline plus every gap) or 'shell'
+DRAG_PREVIEW = 'outline'
+
+# Latency budget for one preview event during a burst of events
+PREVIEW_BUDGET_MS = 50
+
+# Bodies kept in memory by the custom feature compute cache
+COMPUTE_CACHE_ENTRIES = 64
+COMPUTE_CACHE_MEGABYTES = 256
+
+# Cage bodies built at the origin and copied for every cage of the same size and parameters
+GEOMETRY_REGISTRY_ENTRIES = 256
+GEOMETRY_REGISTRY_MEGABYTES = 256
+
+# Cage bodies saved to disk and reused across documents and sessions, 0 MB turns it off.
+# Without a directory FusionBoxer/bodies in the system temp directory is used.
+BODY_CACHE_MEGABYTES = 512
+BODY_CACHE_DIRECTORY = ''
+
+# Timing spans and counters, see commands/Instrumentation.py.  Costs nothing when disabled.
+# If a trace file is set, a Chrome trace is written there when the Cage command closes.
+INSTRUMENTATION = False
+INSTRUMENTATION_BUFFER = 10000
+INSTRUMENTATION_TRACE_FILE = ''
+
 cf_def_boxer = None
@@ -0,0 +1,67 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  BenchmarkBooleans.py                                                        ~
+#  Counts boolean calls per cage size for each cutter subtraction strategy.    ~
+#  Runs outside of Fusion 360 against the stand-in in scripts/fake_adsk.       ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH / 'fake_adsk'))
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+import adsk.core
+import adsk.fusion
+from adsk.recording import recorder
+
+from commands.CageLayout import FeatureValues, gap_face_counts
+from commands.CageGeometry import b_box_points, create_brep_shell_box, cutter_layout, create_cutters, \
+    subtract_cutters, BOOLEAN_STRATEGIES
+
+
+CAGE_SIZES = [5.0, 10.0, 20.0, 40.0]
+FEATURE_VALUES = FeatureValues(0.2, 0.2, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def run_case(size: float, strategy: str) -> dict:
+    b_box = adsk.core.BoundingBox3D.create(
+        adsk.core.Point3D.create(0, 0, 0),
+        adsk.core.Point3D.create(size, size, size)
+    )
+
+    shell_box = create_brep_shell_box(b_box, FEATURE_VALUES.shell_thickness)
+    layout = cutter_layout(b_box, FEATURE_VALUES)
+    cutters = create_cutters(layout)
+    group_sizes = gap_face_counts(*b_box_points(b_box), FEATURE_VALUES)
+
+    recorder.reset()
+    start = time.perf_counter()
+    subtract_cutters(shell_box, cutters, strategy, group_sizes)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'size': size,
+        'strategy': strategy,
+        'cutters': len(cutters),
+        'boolean_calls': recorder.calls['TemporaryBRepManager.booleanOperation'],
+        'difference_calls': recorder.calls[
+            f'TemporaryBRepManager.booleanOperation.{adsk.fusion.BooleanTypes.DifferenceBooleanType}'
+        ],
+        'simulated_seconds': recorder.cost,
+        'seconds': elapsed,
+    }
+
+
+def main():
+    print(f"{'size':>6} {'strategy':>8} {'cutters':>8} {'booleans':>9} {'diffs':>6} {'simulated s':>12}")
+    for size in CAGE_SIZES:
+        for strategy in BOOLEAN_STRATEGIES:
+            result = run_case(size, strategy)
+            print(f"{result['size']:>6} {result['strategy']:>8} {result['cutters']:>8} "
+                  f"{result['boolean_calls']:>9} {result['difference_calls']:>6} {result['simulated_seconds']:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  BenchmarkCutters.py                                                         ~
+#  Times the cutter creation modes and patterns for 10, 100 and 1000+ holes  ~
+#  per face.                                                                   ~
+#  Run it as a Fusion 360 script for real timings, or from a shell to run     ~
+#  against the stand-in in scripts/fake_adsk.                                  ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+try:
+    import adsk.core
+except ImportError:
+    sys.path.insert(0, str(SCRIPTS_PATH / 'fake_adsk'))
+    import adsk.core
+
+import adsk.fusion
+
+from commands.CageLayout import FeatureValues, PATTERNS
+from commands.CageGeometry import create_cutter_tools, CUTTER_MODES
+
+
+GAP = 1.0
+BAR = 0.2
+# Gaps per axis, giving 9, 100 and 1024 holes per face
+GAPS_PER_AXIS = [3, 10, 32]
+
+
+def cage_box(gaps_per_axis: int) -> adsk.core.BoundingBox3D:
+    size = gaps_per_axis * (GAP + BAR) - BAR + GAP / 10
+    return adsk.core.BoundingBox3D.create(
+        adsk.core.Point3D.create(0, 0, 0),
+        adsk.core.Point3D.create(size, size, size)
+    )
+
+
+def run_benchmark() -> list:
+    results = []
+    for gaps_per_axis in GAPS_PER_AXIS:
+        b_box = cage_box(gaps_per_axis)
+        for pattern in PATTERNS:
+            feature_values = FeatureValues(0.2, BAR, GAP, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, pattern)
+            for mode in CUTTER_MODES:
+                start = time.perf_counter()
+                tools = create_cutter_tools(b_box, feature_values, mode)
+                elapsed = time.perf_counter() - start
+                results.append({
+                    'holes_per_face': gaps_per_axis ** 2,
+                    'pattern': pattern,
+                    'mode': mode,
+                    'tools': len(tools),
+                    'seconds': elapsed,
+                })
+    return results
+
+
+def format_results(results: list) -> str:
+    lines = [f"{'holes/face':>10} {'pattern':>8} {'mode':>8} {'tools':>6} {'ms':>10}"]
+    for result in results:
+        lines.append(f"{result['holes_per_face']:>10} {result['pattern']:>8} {result['mode']:>8} {result['tools']:>6} "
+                     f"{result['seconds'] * 1000:>10.1f}")
+    return '\n'.join(lines)
+
+
+def run(context):
+    app = adsk.core.Application.get()
+    app.userInterface.messageBox(format_results(run_benchmark()))
+
+
+def main():
+    print(format_results(run_benchmark()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  BenchmarkSuite.py                                                           ~
+#  Times the cage geometry code over a matrix of box sizes, gap/bar ratios,    ~
+#  selection counts and patterns, outside of Fusion 360 against               ~
+#  scripts/fake_adsk.                                                          ~
+#                                                                              ~
+#  python scripts/BenchmarkSuite.py --output new.json --compare old.json       ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH / 'fake_adsk'))
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+import adsk.core
+import adsk.fusion
+from adsk.recording import recorder
+
+import config
+
+from commands.CageCache import ComputeCache, DiskCache, GeometryRegistry
+from commands.CageLayout import FeatureValues, PATTERNS
+from commands.CageMesh import cage_mesh
+from commands.CagePreviewMesh import box_triangles
+from commands.CageGeometry import b_box_points, create_cutter_tools, cutter_layout, create_brep_shell_box, \
+    expand_box_by_feature_values, compute_feature_body, SelectionBounds, body_bounds_store
+
+
+BOX_SIZES = [5.0, 10.0, 20.0]
+# Bar spacing over bar width, with a bar width of 2 mm
+GAP_BAR_RATIOS = [2.5, 5.0, 10.0]
+BAR_WIDTH = 0.2
+# Cube numbers so the selection always spans the whole box
+SELECTION_COUNTS = [1, 8, 64]
+SHELL_THICKNESS = 0.2
+OFFSET = 0.1
+
+# A ratio above this is reported as a regression by --compare
+REGRESSION_THRESHOLD = 1.2
+
+
+def make_selection(size: float, count: int, case_id: str, origin: float = 0.0) -> list:
+    """``count`` bodies on a grid in a cube of ``size`` with its min corner at ``origin`` on every axis.
+
+    They span the whole cube when ``count`` is a cube number.
+    """
+    per_axis = int(round(count ** (1 / 3)))
+    while per_axis ** 3 < count:
+        per_axis += 1
+    step = size / per_axis
+
+    bodies = []
+    for i, (x, y, z) in enumerate(itertools.product(range(per_axis), repeat=3)):
+        if i == count:
+            break
+        b_box = adsk.core.BoundingBox3D.create(
+            adsk.core.Point3D.create(origin + x * step, origin + y * step, origin + z * step),
+            adsk.core.Point3D.create(origin + (x + 1) * step, origin + (y + 1) * step, origin + (z + 1) * step)
+        )
+        bodies.append(adsk.fusion.BRepBody(bounding_box=b_box, entity_token=f'{case_id}/{i}', revision_id='1'))
+    return bodies
+
+
+def measure(function, repeat: int) -> dict:
+    """Best wall time of ``repeat`` calls, and the calls and simulated time of one."""
+    best = float('inf')
+    for _ in range(repeat):
+        recorder.reset()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return {'seconds': best, 'simulated_seconds': recorder.cost, 'calls': dict(recorder.calls)}
+
+
+def run_case(size: float, ratio: float, selection_count: int, pattern: str, repeat: int,
+             disk_cache: DiskCache) -> dict:
+    case_id = f'{size:g}-{ratio:g}-{selection_count}-{pattern}'
+    feature_values = FeatureValues(SHELL_THICKNESS, BAR_WIDTH, BAR_WIDTH * ratio, *([OFFSET] * 6), pattern)
+    bodies = make_selection(size, selection_count, case_id)
+
+    def b_box():
+        return adsk.core.BoundingBox3D.create(
+            adsk.core.Point3D.create(0, 0, 0), adsk.core.Point3D.create(size, size, size)
+        )
+
+    expanded = b_box()
+    expand_box_by_feature_values(expanded, feature_values)
+
+    def compute(selection_bounds, compute_cache, cache_on_disk=None):
+        body, key = compute_feature_body(case_id, bodies, feature_values, selection_bounds, compute_cache,
+                                         disk_cache=cache_on_disk)
+        compute_cache.set_current(case_id, key)
+
+    def compute_cold(cache_on_disk=None):
+        body_bounds_store.clear()
+        compute(SelectionBounds(), ComputeCache(), cache_on_disk)
+
+    # A new session, with the body saved to disk by an earlier one
+    compute_cold(disk_cache)
+
+    # Same feature computed again with nothing changed
+    warm_bounds, warm_cache = SelectionBounds(), ComputeCache()
+    compute(warm_bounds, warm_cache)
+
+    # An identical cage elsewhere, after the first one was built in this session
+    moved_id = f'{case_id}/moved'
+    moved_bodies = make_selection(size, selection_count, moved_id, origin=size * 2)
+    registry = GeometryRegistry()
+    compute_feature_body(case_id, bodies, feature_values, SelectionBounds(), ComputeCache(), registry=registry)
+
+    def compute_shared():
+        compute_feature_body(moved_id, moved_bodies, feature_values, SelectionBounds(), ComputeCache(),
+                             registry=registry)
+
+    return {
+        'case': case_id,
+        'size': size,
+        'gap_bar_ratio': ratio,
+        'selection_count': selection_count,
+        'pattern': pattern,
+        'results': {
+            'expand_box_by_feature_values': measure(lambda: expand_box_by_feature_values(b_box(), feature_values),
+                                                    repeat),
+            'create_brep_shell_box': measure(lambda: create_brep_shell_box(expanded, SHELL_THICKNESS), repeat),
+            'create_cutter_tools': measure(lambda: create_cutter_tools(expanded, feature_values, config.CUTTER_MODE),
+                                           repeat),
+            'preview_full_mesh': measure(lambda: box_triangles(cutter_layout(expanded, feature_values)), repeat),
+            'cage_mesh': measure(lambda: cage_mesh(*b_box_points(expanded), feature_values), repeat),
+            'compute_cold': measure(compute_cold, repeat),
+            'compute_disk_cached': measure(lambda: compute_cold(disk_cache), repeat),
+            'compute_unchanged': measure(lambda: compute(warm_bounds, warm_cache), repeat),
+            'compute_shared': measure(compute_shared, repeat),
+        }
+    }
+
+
+def run(repeat: int = 3) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        disk_cache = DiskCache(directory)
+        cases = [
+            run_case(size, ratio, count, pattern, repeat, disk_cache)
+            for size, ratio, count, pattern in itertools.product(BOX_SIZES, GAP_BAR_RATIOS, SELECTION_COUNTS, PATTERNS)
+        ]
+        disk_cache_stats = disk_cache.stats()
+
+    return {
+        'python': platform.python_version(),
+        'cost_model': recorder.costs,
+        'disk_cache': disk_cache_stats,
+        'cases': cases,
+    }
+
+
+def compare(current: dict, baseline: dict, metric: str):
+    """Print the ratio of current over baseline for every case and operation both runs contain."""
+    baseline_cases = {case['case']: case['results'] for case in baseline['cases']}
+    regressions = 0
+
+    print(f"\n{'case':>19} {'operation':>30} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for case in current['cases']:
+        old_results = baseline_cases.get(case['case'])
+        if old_results is None:
+            continue
+        for operation, result in case['results'].items():
+            if operation not in old_results:
+                continue
+            old, new = old_results[operation][metric], result[metric]
+            ratio = new / old if old > 0 else float('inf') if new > 0 else 1.0
+            flag = ' !' if ratio > REGRESSION_THRESHOLD else ''
+            regressions += bool(flag)
+            print(f"{case['case']:>19} {operation:>30} {old:>10.5f} {new:>10.5f} {ratio:>7.2f}{flag}")
+
+    print(f'\n{regressions} regressions above {REGRESSION_THRESHOLD:.2f}x ({metric})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cage geometry code against the stand-in adsk package.')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of an earlier run to compare against')
+    parser.add_argument('--metric', default='simulated_seconds', choices=['simulated_seconds', 'seconds'],
+                        help='Value compared between runs')
+    parser.add_argument('--costs', help='JSON file of call costs in seconds that replace the defaults')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, the fastest is kept')
+    args = parser.parse_args()
+
+    if args.costs:
+        with open(args.costs) as costs_file:
+            recorder.configure(json.load(costs_file))
+
+    results = run(args.repeat)
+
+    print(f"{'case':>19} {'operation':>30} {'seconds':>10} {'simulated':>10}")
+    for case in results['cases']:
+        for operation, result in case['results'].items():
+            print(f"{case['case']:>19} {operation:>30} "
+                  f"{result['seconds']:>10.5f} {result['simulated_seconds']:>10.5f}")
+
+    print(f"\ndisk cache: {results['disk_cache']}")
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(results, json.load(baseline_file), args.metric)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckCageMesh.py                                                            ~
+#  Checks the grid-cell cage meshes: every edge is shared by exactly two       ~
+#  triangles with opposite winding, the signed volume is the shell less the    ~
+#  gap cutters of CageLayout.gap_layout, and binary STL files read back.       ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+from commands.CageLayout import FeatureValues, gap_layout
+from commands.CageMesh import STL_DTYPE, STL_HEADER, cage_mesh, write_stl
+
+# Name, expanded box and feature values
+CASES = [
+    ('grid', (0, 0, 0), (8, 5, 3), FeatureValues(0.2, 0.3, 0.8, 0, 0, 0, 0, 0, 0, 'grid')),
+    ('slot', (0, 0, 0), (8, 5, 3), FeatureValues(0.2, 0.3, 0.8, 0, 0, 0, 0, 0, 0, 'slot')),
+    ('offset grid', (-3, 2, 1), (4.5, 3.1, 9), FeatureValues(0.15, 0.2, 0.4, 0, 0, 0, 0, 0, 0, 'grid')),
+    ('thin side without holes', (0, 0, 0), (6, 6, 0.5), FeatureValues(0.2, 0.3, 0.8, 0, 0, 0, 0, 0, 0, 'grid')),
+    ('no holes', (0, 0, 0), (1, 1, 1), FeatureValues(0.2, 0.3, 2.0, 0, 0, 0, 0, 0, 0, 'grid')),
+]
+
+
+def edge_counts(triangles: np.ndarray) -> tuple:
+    """Directed edges that are not matched by exactly one opposite edge, and repeated directed edges."""
+    directed = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+    unique, counts = np.unique(directed, axis=0, return_counts=True)
+    repeated = int((counts > 1).sum())
+
+    forward = {tuple(edge) for edge in unique.tolist()}
+    unmatched = sum(1 for a, b in forward if (b, a) not in forward)
+    return unmatched, repeated
+
+
+def signed_volume(vertices: np.ndarray, triangles: np.ndarray) -> float:
+    corners = vertices[triangles]
+    return float(np.einsum('ij,ij->i', corners[:, 0], np.cross(corners[:, 1], corners[:, 2])).sum() / 6)
+
+
+def layout_volume(min_point, max_point, feature_values: FeatureValues) -> float:
+    sizes = np.subtract(max_point, min_point)
+    thickness = feature_values.shell_thickness
+    shell = np.prod(sizes + thickness * 2) - np.prod(sizes)
+    cutters = gap_layout(min_point, max_point, feature_values)
+    return float(shell - np.prod(cutters[:, 3:], axis=1).sum())
+
+
+def read_stl(path: str) -> tuple:
+    with open(path, 'rb') as stl_file:
+        header = stl_file.read(80)
+        count = int(np.frombuffer(stl_file.read(4), dtype=np.uint32)[0])
+        records = np.fromfile(stl_file, dtype=STL_DTYPE)
+    return header, count, records
+
+
+def check_stl(directory: str, vertices: np.ndarray, triangles: np.ndarray) -> bool:
+    path = os.path.join(directory, 'cage.stl')
+    write_stl(path, vertices, triangles, scale=10.0)
+    header, count, records = read_stl(path)
+
+    corners = vertices[triangles] * 10.0
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    return (header.rstrip(b' ') == STL_HEADER and count == len(triangles) == len(records)
+            and os.path.getsize(path) == 84 + 50 * len(triangles)
+            and bool(np.allclose(records['vertices'], corners, atol=1e-4))
+            and bool(np.allclose(records['normal'], normals, atol=1e-5)))
+
+
+def main():
+    results = []
+    print(f"{'case':>24} {'triangles':>10} {'unmatched':>10} {'volume':>9} {'layout':>9} {'stl':>5}  result")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, min_point, max_point, feature_values in CASES:
+            vertices, triangles = cage_mesh(min_point, max_point, feature_values)
+            unmatched, repeated = edge_counts(triangles)
+            volume = signed_volume(vertices, triangles)
+            expected = layout_volume(min_point, max_point, feature_values)
+            stl_ok = check_stl(directory, vertices, triangles)
+
+            # Outward facing triangles give a positive volume
+            ok = unmatched == 0 and repeated == 0 and volume > 0 and np.isclose(volume, expected) and stl_ok
+            results.append(ok)
+            print(f'{name:>24} {len(triangles):>10} {unmatched + repeated:>10} {volume:>9.4f} {expected:>9.4f} '
+                  f'{"ok" if stl_ok else "bad":>5}  {"ok" if ok else "MISMATCH"}')
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
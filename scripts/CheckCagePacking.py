@@ -0,0 +1,97 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckCagePacking.py                                                         ~
+#  Packs a few hundred cages of random sizes with every registered heuristic   ~
+#  and rotation mode, and checks that no two placed cages overlap, that every  ~
+#  cage is inside the build volume and that the rotations match the extents.   ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+from commands.CagePacking import HEURISTICS, ROTATIONS, cage_size, pack
+
+CAGE_COUNT = 300
+BUILD_VOLUME = (38.0, 28.4, 38.0)
+SPACING = 0.3
+
+rng = np.random.default_rng(11)
+
+
+def random_cages(count: int) -> np.ndarray:
+    """Outer extents of cages around random parts, some of them flat or long."""
+    parts = rng.uniform(0.5, 6.0, (count, 3)) * rng.choice([1.0, 0.2, 2.5], (count, 3), p=[0.8, 0.1, 0.1])
+    return np.array([cage_size((0, 0, 0), part + 0.6, 0.2) for part in parts])
+
+
+def overlapping_pairs(mins: np.ndarray, maxs: np.ndarray, spacing: float) -> int:
+    """Pairs of boxes closer than ``spacing`` along every axis."""
+    apart = np.zeros((len(mins), len(mins)), dtype=bool)
+    for axis in range(3):
+        apart |= (mins[:, None, axis] >= maxs[None, :, axis] + spacing - 1e-6)
+        apart |= (maxs[:, None, axis] + spacing - 1e-6 <= mins[None, :, axis])
+    np.fill_diagonal(apart, True)
+    return int((~apart).sum() // 2)
+
+
+def check_packing(heuristic: str, rotations: str, sizes: np.ndarray) -> bool:
+    start = time.perf_counter()
+    result = pack(sizes, BUILD_VOLUME, heuristic, rotations, SPACING)
+    seconds = time.perf_counter() - start
+
+    placed = result.placed
+    mins = result.positions[placed]
+    maxs = mins + result.sizes[placed]
+    volume = np.asarray(BUILD_VOLUME)
+
+    inside = bool(np.all(mins >= SPACING - 1e-6) and np.all(maxs <= volume - SPACING + 1e-6))
+    overlaps = overlapping_pairs(mins, maxs, SPACING)
+
+    allowed = {tuple(axes) for axes in ROTATIONS[rotations]}
+    turned = np.take_along_axis(sizes, result.rotations, axis=1)
+    rotated_ok = (all(tuple(axes) in allowed for axes in result.rotations[placed].tolist())
+                  and bool(np.allclose(turned[placed], result.sizes[placed])))
+    # Boxes that were left out keep their extents and no position
+    unplaced_ok = bool(np.isnan(result.positions[~placed]).all() and np.allclose(result.sizes[~placed], sizes[~placed]))
+
+    ok = inside and overlaps == 0 and rotated_ok and unplaced_ok and result.placed_count > 0
+    print(f'{heuristic:>18} {rotations:>5} {result.placed_count:>7} {result.density:>8.3f} {seconds * 1000:>8.0f} '
+          f'{overlaps:>9}  {"ok" if ok else "MISMATCH"}')
+    return ok
+
+
+def check_rotation_needed() -> bool:
+    """A cage only fits turned about Z, and only Z turns are used unless all rotations are allowed."""
+    tall = [[30.0, 10.0, 5.0]]
+    plate = (12.0, 32.0, 38.0)
+    ok = True
+    for heuristic in HEURISTICS:
+        unturned = pack(tall, plate, heuristic, 'none')
+        turned = pack(tall, plate, heuristic, 'z')
+        ok &= unturned.placed_count == 0 and turned.placed_count == 1
+        ok &= tuple(turned.rotations[0]) == (1, 0, 2) and np.allclose(turned.sizes[0], [10.0, 30.0, 5.0])
+
+        flat_plate = (40.0, 40.0, 6.0)
+        upright = [[5.0, 5.0, 20.0]]
+        ok &= pack(upright, flat_plate, heuristic, 'z').placed_count == 0
+        laid_down = pack(upright, flat_plate, heuristic, 'all')
+        ok &= laid_down.placed_count == 1 and laid_down.sizes[0, 2] <= 6.0
+    print(f'{"rotation handling":>18} {"":>5} {"":>7} {"":>8} {"":>8} {"":>9}  {"ok" if ok else "MISMATCH"}')
+    return ok
+
+
+def main():
+    sizes = random_cages(CAGE_COUNT)
+    print(f"{'heuristic':>18} {'turn':>5} {'placed':>7} {'density':>8} {'ms':>8} {'overlaps':>9}  result")
+    results = [check_packing(heuristic, rotations, sizes) for heuristic in HEURISTICS for rotations in ROTATIONS]
+    results.append(check_rotation_needed())
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
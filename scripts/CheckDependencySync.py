@@ -0,0 +1,104 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckDependencySync.py                                                      ~
+#  Checks that custom feature dependencies are updated incrementally, against  ~
+#  the stand-in dependency collection in scripts/fake_adsk, and compares the   ~
+#  API calls with deleting and re-adding every dependency.                     ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import sys
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH / 'fake_adsk'))
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+import adsk.fusion
+from adsk.recording import recorder
+
+from commands.FeatureDependencies import sync_dependencies
+
+
+class Body(adsk.fusion.BRepBody):
+    """Body that equals another with the same name, like one entity behind two entity tokens."""
+
+    def __init__(self, name: str, token: str = None):
+        super().__init__(entity_token=token or name)
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Body) and other.name == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return self.name
+
+
+def make_dependencies(bodies: list) -> adsk.fusion.CustomFeatureDependencies:
+    dependencies = adsk.fusion.CustomFeatureDependencies()
+    for i, body in enumerate(bodies):
+        dependencies.add(f'body_{i}', body)
+    return dependencies
+
+
+def delete_and_add(dependencies, bodies: list):
+    """The previous update: delete every dependency and add one per body."""
+    for dependency in list(dependencies):
+        dependency.deleteMe()
+    for i, body in enumerate(bodies):
+        dependencies.add(f'body_{i}', body)
+
+
+def calls() -> int:
+    return recorder.calls['CustomFeatureDependencies.add'] + recorder.calls['CustomFeatureDependency.deleteMe']
+
+
+def check(name: str, before: list, after: list, expected_calls: int, deleted: list = ()) -> bool:
+    dependencies = make_dependencies(before)
+    for dependency in dependencies:
+        if dependency.entity.name in deleted:
+            dependency.entity = None
+
+    recorder.reset()
+    changed = sync_dependencies(dependencies, after)
+    sync_calls = calls()
+
+    entities = sorted(dependency.entity.name for dependency in dependencies)
+    ids = [dependency.id for dependency in dependencies]
+    ok = (entities == sorted(body.name for body in after) and len(set(ids)) == len(ids)
+          and sync_calls == expected_calls and changed == (expected_calls > 0))
+
+    dependencies = make_dependencies(before)
+    recorder.reset()
+    delete_and_add(dependencies, after)
+    print(f'{name:>28} {sync_calls:>6} {calls():>8}  {"ok" if ok else "MISMATCH"}')
+    return ok
+
+
+def main():
+    a, b, c, d = Body('a'), Body('b'), Body('c'), Body('d')
+    many = [Body(f'part{i}') for i in range(500)]
+
+    cases = [
+        ('unchanged', [a, b, c], [a, b, c], 0),
+        ('reordered', [a, b, c], [c, a, b], 0),
+        ('body added', [a, b], [a, b, c], 1),
+        ('body removed', [a, b, c], [a, c], 1),
+        ('body replaced', [a, b, c], [a, d, c], 2),
+        ('all replaced', [a, b], [c, d], 4),
+        ('new entity token', [a, b], [Body('a', 'a-2'), b], 0),
+        ('duplicate dependency', [a, a, b], [a, b], 1),
+        ('cleared', [a, b], [], 2),
+        ('500 bodies, one added', many, many + [d], 1),
+        ('500 bodies, one removed', many, many[1:], 1),
+    ]
+
+    print(f"{'case':>28} {'sync':>6} {'re-add':>8}  result")
+    results = [check(*case) for case in cases]
+    results.append(check('entity deleted', [a, b, c], [a, c], 1, deleted=['b']))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
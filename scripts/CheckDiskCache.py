@@ -0,0 +1,129 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckDiskCache.py                                                           ~
+#  Checks the on-disk body cache in a temporary directory: hits and misses,    ~
+#  eviction by size, corrupt files, failed writes and leftovers of writes.     ~
+#  Cages are built with the stand-in in scripts/fake_adsk.                     ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH / 'fake_adsk'))
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+import adsk.fusion
+from adsk.recording import recorder
+
+from commands.CageCache import DiskCache
+from commands.CageGeometry import b_box_from_points, create_cached_cage_body
+from commands.CageLayout import FeatureValues
+
+FEATURE_VALUES = FeatureValues(0.2, 0.2, 0.5, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1)
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f'{name:>44}  {"ok" if ok else "MISMATCH"}')
+    return ok
+
+
+def build_calls() -> int:
+    return recorder.calls['TemporaryBRepManager.createBox'] + recorder.calls['TemporaryBRepManager.booleanOperation']
+
+
+def check_cages(directory: str) -> list:
+    b_box = b_box_from_points((1, 2, 3), (5, 4, 6))
+    moved_b_box = b_box_from_points((-7, 0, 0), (-3, 2, 3))
+
+    disk_cache = DiskCache(directory)
+    recorder.reset()
+    create_cached_cage_body(b_box, FEATURE_VALUES, disk_cache=disk_cache)
+    counts = (disk_cache.misses, disk_cache.hits, disk_cache.writes)
+    results = [check('first cage is built and saved', counts == (1, 0, 1) and build_calls() > 0)]
+
+    # A new cache on the same directory, like the next session
+    disk_cache = DiskCache(directory)
+    recorder.reset()
+    body = create_cached_cage_body(moved_b_box, FEATURE_VALUES, disk_cache=disk_cache)
+    results += [
+        check('same size elsewhere is a hit', (disk_cache.misses, disk_cache.hits) == (0, 1) and body is not None),
+        check('hit builds nothing', build_calls() == 0),
+        check('hit is loaded from the file', recorder.calls['TemporaryBRepManager.createFromFile'] == 1),
+    ]
+
+    # Saving fails, the cage is still returned and nothing is left behind
+    export = adsk.fusion.TemporaryBRepManager.exportToFile
+
+    def failing_export(self, bodies, filename):
+        raise RuntimeError('disk full')
+
+    adsk.fusion.TemporaryBRepManager.exportToFile = failing_export
+    try:
+        body = create_cached_cage_body(b_box_from_points((0, 0, 0), (9, 9, 9)), FEATURE_VALUES, disk_cache=disk_cache)
+    finally:
+        adsk.fusion.TemporaryBRepManager.exportToFile = export
+    results.append(check('failed save still returns the cage', body is not None and disk_cache.failed_writes == 1
+                         and disk_cache.stats()['files'] == 1 and len(os.listdir(directory)) == 1))
+    return results
+
+
+def write_bytes(size: int):
+    def save(value, path):
+        with open(path, 'wb') as cache_file:
+            cache_file.write(b'x' * size)
+    return save
+
+
+def load_bytes(path: str):
+    with open(path, 'rb') as cache_file:
+        data = cache_file.read()
+    return data if data and set(data) == {ord('x')} else None
+
+
+def check_files(directory: str) -> list:
+    disk_cache = DiskCache(directory, max_bytes=2500, extension='.bin')
+    for key in range(3):
+        disk_cache.put((key,), None, write_bytes(1000))
+    results = [check('eviction keeps the cache under its size', disk_cache.evictions == 1
+                     and disk_cache.total_bytes == 2000 and not os.path.exists(disk_cache.path((0,))))]
+
+    disk_cache.get((1,), load_bytes)
+    disk_cache.put((3,), None, write_bytes(1000))
+    results.append(check('eviction removes the least recently used', os.path.exists(disk_cache.path((1,)))
+                         and not os.path.exists(disk_cache.path((2,)))))
+
+    with open(disk_cache.path((1,)), 'wb') as cache_file:
+        cache_file.write(b'corrupt')
+    misses = disk_cache.misses
+    value = disk_cache.get((1,), load_bytes)
+    results.append(check('corrupt file is a miss and removed', value is None and disk_cache.misses == misses + 1
+                         and not os.path.exists(disk_cache.path((1,)))))
+
+    def failing_save(value, path):
+        with open(path, 'wb') as cache_file:
+            cache_file.write(b'x')
+        raise OSError('disk full')
+
+    disk_cache.put((4,), None, failing_save)
+    results.append(check('failed save leaves no file', disk_cache.failed_writes == 1
+                         and not os.path.exists(disk_cache.path((4,)))
+                         and not os.path.exists(disk_cache.path((4,)) + disk_cache.temporary_suffix)))
+
+    leftover = disk_cache.path((5,)) + disk_cache.temporary_suffix
+    write_bytes(1000)(None, leftover)
+    reopened = DiskCache(directory, max_bytes=2500, extension='.bin')
+    results.append(check('leftover of a write is removed on start', not os.path.exists(leftover)
+                         and reopened.stats()['files'] == 1 and reopened.total_bytes == 1000))
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cage_directory, tempfile.TemporaryDirectory() as file_directory:
+        results = check_cages(cage_directory) + check_files(file_directory)
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckExport3MF.py                                                           ~
+#  Writes small packed build plates as 3MF, opens the ZIP again, parses the    ~
+#  model and checks the mesh objects, the build items and that every item      ~
+#  transform puts its cage on the packed box, turned or not.                   ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import os
+import sys
+import tempfile
+import xml.etree.ElementTree as ElementTree
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+from commands.CageLayout import FeatureValues
+from commands.CagePacking import cage_size, pack
+from commands.Export3MF import MODEL_PATH, export_plate, packed_cages
+
+NAMESPACE = {'m': 'http://schemas.microsoft.com/3dmanufacturing/core/2015/02'}
+SCALE = 10.0
+
+FEATURE_VALUES = FeatureValues(0.2, 0.3, 0.8, 0, 0, 0, 0, 0, 0)
+
+
+def read_plate(path: str) -> tuple:
+    """Vertices of every object by id, and the object id and transform of every build item."""
+    with zipfile.ZipFile(path) as zip_file:
+        names = set(zip_file.namelist())
+        root = ElementTree.fromstring(zip_file.read(MODEL_PATH))
+
+    objects = {}
+    for element in root.findall('m:resources/m:object', NAMESPACE):
+        vertices = [[float(vertex.get(axis)) for axis in 'xyz']
+                    for vertex in element.findall('m:mesh/m:vertices/m:vertex', NAMESPACE)]
+        triangle_count = len(element.findall('m:mesh/m:triangles/m:triangle', NAMESPACE))
+        objects[int(element.get('id'))] = (np.array(vertices), triangle_count)
+
+    items = []
+    for element in root.findall('m:build/m:item', NAMESPACE):
+        values = np.array([float(value) for value in element.get('transform').split()])
+        items.append((int(element.get('objectid')), values))
+    return names, root.get('unit'), objects, items
+
+
+def item_bounds(vertices: np.ndarray, transform: np.ndarray) -> np.ndarray:
+    """Box of the vertices after a 3MF transform, which multiplies row vectors from the left."""
+    placed = vertices @ transform[:9].reshape(3, 3) + transform[9:]
+    return np.array([placed.min(axis=0), placed.max(axis=0)])
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f'{name:>44}  {"ok" if ok else "MISMATCH"}')
+    return ok
+
+
+def check_packed_plate(directory: str) -> list:
+    """Packed cages of three sizes, some turned about Z, land on their packed boxes."""
+    parts = [(4.0, 2.0, 1.5), (3.0, 3.0, 2.0), (5.0, 1.0, 1.0)] * 4
+    boxes = [((0, 0, 0), part, FEATURE_VALUES) for part in parts]
+    sizes = [cage_size(min_point, max_point, FEATURE_VALUES.shell_thickness) for min_point, max_point, _ in boxes]
+    result = pack(sizes, (9.0, 14.0, 10.0), 'extreme_point', 'z', 0.2)
+
+    path = os.path.join(directory, 'plate.3mf')
+    export_plate(path, packed_cages(boxes, result), SCALE)
+    names, unit, objects, items = read_plate(path)
+
+    results = [
+        check('container parts', {'[Content_Types].xml', '_rels/.rels', MODEL_PATH} <= names and unit == 'millimeter'),
+        check('one object per cage size', len(objects) == 3 and all(count > 0 for _, count in objects.values())),
+        check('one build item per placed cage', len(items) == result.placed_count == len(parts)),
+        check('some cages are turned', bool((result.rotations[result.placed] != [0, 1, 2]).any())),
+    ]
+
+    ok = True
+    for (object_id, transform), index in zip(items, np.flatnonzero(result.placed)):
+        expected = np.array([result.positions[index], result.positions[index] + result.sizes[index]]) * SCALE
+        ok &= bool(np.allclose(item_bounds(objects[object_id][0], transform), expected, atol=1e-3))
+    results.append(check('every item lies on its packed box', ok))
+    return results
+
+
+def check_rotations(directory: str) -> list:
+    """The same cage placed as is and turned by 90 degrees about Z shares one object."""
+    min_point, max_point = (0, 0, 0), (4.0, 2.0, 1.5)
+    outer = cage_size(min_point, max_point, FEATURE_VALUES.shell_thickness)
+    cages = [
+        (min_point, max_point, FEATURE_VALUES, (0.0, 0.0, 0.0)),
+        (min_point, max_point, FEATURE_VALUES, (6.0, 1.0, 0.5), [1, 0, 2]),
+    ]
+    path = os.path.join(directory, 'turned.3mf')
+    export_plate(path, cages, SCALE)
+    _, _, objects, items = read_plate(path)
+
+    (first_id, straight), (second_id, turned) = items
+    vertices = objects[first_id][0]
+    turned_bounds = np.array([[6.0, 1.0, 0.5], np.add([6.0, 1.0, 0.5], outer[[1, 0, 2]])]) * SCALE
+    return [
+        check('turned and straight cage share an object', len(objects) == 1 and first_id == second_id),
+        check('0 degree transform is a translation', bool(np.allclose(straight, [1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0]))),
+        check('0 degree item lies on its box',
+              bool(np.allclose(item_bounds(vertices, straight), [[0, 0, 0], outer * SCALE], atol=1e-3))),
+        check('90 degree transform is a proper rotation',
+              bool(np.isclose(np.linalg.det(turned[:9].reshape(3, 3)), 1.0))
+              and bool(np.allclose(np.abs(turned[:9].reshape(3, 3)), [[0, 1, 0], [1, 0, 0], [0, 0, 1]]))),
+        check('90 degree item lies on its box',
+              bool(np.allclose(item_bounds(vertices, turned), turned_bounds, atol=1e-3))),
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        results = check_packed_plate(directory) + check_rotations(directory)
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckGapSolver.py                                                           ~
+#  Checks the cage volumes of the gap solver against the gap cutters that      ~
+#  CageLayout.gap_layout places, that solutions stay within the gap and bar    ~
+#  limits, and that no evenly spaced gap gives less material.                  ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+from commands.CageLayout import FeatureValues, PATTERNS, gap_face_counts, gap_layout
+from commands.GapSolver import cage_volumes, hole_spans, solve_gap_bar
+
+rng = np.random.default_rng(3)
+
+
+def layout_volume(sizes, gap: float, bar: float, thickness: float, pattern: str) -> float:
+    """Shell volume less every gap cutter of the layout, each as deep as the shell."""
+    feature_values = FeatureValues(thickness, bar, gap, 0, 0, 0, 0, 0, 0, pattern)
+    cutters = gap_layout((0, 0, 0), sizes, feature_values)
+    shell = np.prod(np.add(sizes, thickness * 2)) - np.prod(sizes)
+    return float(shell - np.prod(cutters[:, 3:], axis=1).sum()) if len(cutters) else float(shell)
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f'{name:>48}  {"ok" if ok else "MISMATCH"}')
+    return ok
+
+
+def check_volumes() -> bool:
+    """cage_volumes and the hole counts agree with the layout for random sizes and spacings."""
+    ok = True
+    for pattern in PATTERNS:
+        for _ in range(200):
+            sizes = rng.uniform(0.5, 20, 3)
+            gap, bar, thickness = rng.uniform(0.1, 3), rng.uniform(0.05, 1), rng.uniform(0.05, 0.5)
+            volume = cage_volumes(sizes, np.array([gap]), np.array([bar]), thickness, pattern)[0]
+            nums, _, _ = hole_spans(sizes, np.array([gap]), np.array([bar]), thickness, pattern)
+            feature_values = FeatureValues(thickness, bar, gap, 0, 0, 0, 0, 0, 0, pattern)
+
+            counts = gap_face_counts((0, 0, 0), sizes, feature_values)
+            expected_counts = []
+            for u, v in ((1, 2), (0, 2), (0, 1)):
+                along = min(nums[0, v], 1) if pattern == 'slot' else nums[0, v]
+                expected_counts += [nums[0, u] * along] * 2
+            ok &= bool(np.isclose(volume, layout_volume(sizes, gap, bar, thickness, pattern), rtol=1e-9, atol=1e-9))
+            ok &= bool(np.array_equal(counts, expected_counts))
+    return check('cage volumes match the layout', ok)
+
+
+def check_solution(name: str, sizes, thickness: float, min_gap: float, max_gap: float, min_bar: float,
+                   max_bar: float = None, pattern: str = 'grid', expected_gap: float = None) -> bool:
+    solution = solve_gap_bar(sizes, thickness, min_gap, max_gap, min_bar, max_bar, pattern)
+    gap_limit = max(max_gap, min_gap)
+    bar_limit = min_bar if max_bar is None else max_bar
+
+    ok = min_gap <= solution.gap <= gap_limit and min_bar <= solution.bar <= bar_limit
+    ok &= bool(np.isclose(solution.volume, layout_volume(sizes, solution.gap, solution.bar, thickness, pattern)))
+    if expected_gap is not None:
+        ok &= bool(np.isclose(solution.gap, expected_gap))
+
+    # No evenly spaced gap at the chosen bar gives less material
+    sampled = [layout_volume(sizes, gap, solution.bar, thickness, pattern)
+               for gap in np.linspace(min_gap, gap_limit, 400)]
+    ok &= solution.volume <= min(sampled) + 1e-9
+    return check(name, ok)
+
+
+def main():
+    part = np.array([8.0, 5.0, 3.0])
+    thin = np.array([12.0, 6.0, 0.15])
+    thickness = 0.2
+
+    results = [
+        check_volumes(),
+        check_solution('grid within the gap limits', part + 0.6, thickness, 0.4, part.min() * .9, 0.2),
+        check_solution('slot within the gap limits', part + 0.6, thickness, 0.4, part.min() * .9, 0.2,
+                       pattern='slot'),
+        check_solution('grid with a bar range', part + 0.6, thickness, 0.4, part.min() * .9, 0.2, 0.6),
+        check_solution('narrow limits keep the gap at the maximum', part + 0.6, thickness, 0.4, 0.5, 0.2,
+                       expected_gap=0.5),
+        check_solution('equal limits give that gap', part + 0.6, thickness, 0.7, 0.7, 0.2, expected_gap=0.7),
+        # 0.9 of the thinnest side is below the minimum gap, the minimum wins
+        check_solution('thin grid part gets the minimum gap', thin + 0.6, thickness, 0.4, thin.min() * .9, 0.2,
+                       expected_gap=0.4),
+        check_solution('thin slot part gets the minimum gap', thin + 0.6, thickness, 0.4, thin.min() * .9, 0.2,
+                       pattern='slot', expected_gap=0.4),
+    ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckOrientedBounds.py                                                      ~
+#  Fits oriented boxes to turned point clouds of 100k+ vertices and checks     ~
+#  that they hold every point, how much smaller they are than the design axes  ~
+#  box and how long the fit takes.  Then runs an oriented Cage feature compute ~
+#  against the stand-in in scripts/fake_adsk.                                  ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH / 'fake_adsk'))
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+import adsk.fusion
+
+import commands.CageGeometry
+from commands.CageCache import ComputeCache
+from commands.CageGeometry import SelectionBounds, b_box_points, b_box_from_points, compute_feature_body, frame_array
+from commands.CageLayout import FeatureValues
+from commands.OrientedBounds import fit_oriented_box, to_world
+
+POINT_COUNT = 150000
+# Fitted boxes may be this much larger than the known smallest box
+VOLUME_TOLERANCE = 0.02
+
+rng = np.random.default_rng(7)
+
+
+def rotation(x: float, y: float, z: float) -> np.ndarray:
+    cx, sx, cy, sy, cz, sz = np.cos(x), np.sin(x), np.cos(y), np.sin(y), np.cos(z), np.sin(z)
+    turn_x = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    turn_y = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    turn_z = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return turn_z @ turn_y @ turn_x
+
+
+def box_surface(count: int, size) -> np.ndarray:
+    points = rng.uniform(-0.5, 0.5, (count, 3))
+    faces = rng.integers(0, 3, count)
+    points[np.arange(count), faces] = np.sign(points[np.arange(count), faces]) * 0.5
+    return points * size
+
+
+def cylinder_surface(count: int, radius: float, height: float) -> np.ndarray:
+    angles = rng.uniform(0, 2 * np.pi, count)
+    return np.column_stack([radius * np.cos(angles), radius * np.sin(angles), rng.uniform(0, height, count)])
+
+
+# Name, points and the volume of the smallest box around them
+CASES = [
+    ('aligned box', box_surface(POINT_COUNT, [4, 2, 1]), 8.0),
+    ('turned box', box_surface(POINT_COUNT, [4, 2, 1]) @ rotation(0.3, 0.5, 0.7).T + [3, 1, 2], 8.0),
+    ('turned cylinder', cylinder_surface(POINT_COUNT, 1, 6) @ rotation(0.9, 0.2, 0.1).T, 24.0),
+    ('turned plate', box_surface(POINT_COUNT, [5, 3, 0.1]) @ rotation(0.2, 0.4, 0.6).T, 1.5),
+    ('turned L', np.concatenate([
+        box_surface(POINT_COUNT // 2, [6, 1, 1]), box_surface(POINT_COUNT // 2, [1, 4, 1]) + [-2.5, 2.5, 0]
+    ]) @ rotation(0, 0, 0.4).T, 30.0),
+]
+
+
+def check_fits() -> bool:
+    ok = True
+    print(f"{'case':>16} {'ms':>7} {'fitted':>9} {'smallest':>9} {'axes box':>9}  result")
+    for name, points, smallest in CASES:
+        start = time.perf_counter()
+        frame, b_min, b_max = fit_oriented_box(points)
+        seconds = time.perf_counter() - start
+
+        local = points @ frame
+        volume = float(np.prod(b_max - b_min))
+        case_ok = (bool(np.all(local >= b_min - 1e-9) and np.all(local <= b_max + 1e-9))
+                   and volume <= smallest * (1 + VOLUME_TOLERANCE)
+                   and np.isclose(np.linalg.det(frame), 1.0))
+        if name.startswith('aligned'):
+            case_ok &= bool(np.allclose(frame, np.eye(3)))
+        ok &= case_ok
+        print(f'{name:>16} {seconds * 1000:>7.1f} {volume:>9.3f} {smallest:>9.3f} '
+              f'{np.prod(np.ptp(points, axis=0)):>9.3f}  {"ok" if case_ok else "MISMATCH"}')
+    return ok
+
+
+fit_calls = []
+
+
+def counted_fit(*args, **kwargs):
+    fit_calls.append(1)
+    return fit_oriented_box(*args, **kwargs)
+
+
+def count_fits() -> int:
+    return len(fit_calls)
+
+
+def check_compute() -> bool:
+    """An oriented compute holds every vertex, and a body built at the origin lands on the cage box."""
+    _, points, _ = CASES[1]
+    body = adsk.fusion.BRepBody(
+        bounding_box=b_box_from_points(points.min(axis=0), points.max(axis=0)), entity_token='turned', revision_id='1',
+        mesh_coordinates=points.ravel().tolist()
+    )
+    feature_values = FeatureValues(0.2, 0.2, 0.5, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, orientation='minimum')
+    selection_bounds = SelectionBounds()
+
+    frame, b_box = selection_bounds.oriented_b_box([body], 'minimum')
+    b_min, b_max = (np.array(point) for point in b_box_points(b_box))
+    local = points @ frame
+    ok = bool(np.all(local >= b_min) and np.all(local <= b_max))
+
+    corners = np.array([[0, 0, 0], b_max - b_min])
+    placed = (frame_array(frame, b_min) @ np.column_stack([corners, np.ones(2)]).T).T[:, :3]
+    ok &= bool(np.allclose(placed, to_world(corners + b_min, frame)))
+
+    compute_cache = ComputeCache()
+    cage_body, key = compute_feature_body('turned', [body], feature_values, selection_bounds, compute_cache)
+    compute_cache.set_current('turned', key)
+    ok &= cage_body is not None and key[-9:] == tuple(frame.ravel().round(6).tolist())
+
+    # Unchanged inputs are skipped before the fit, a new revision is fitted again
+    fits = count_fits()
+    skipped, skipped_key = compute_feature_body('turned', [body], feature_values, selection_bounds, compute_cache)
+    ok &= skipped is None and skipped_key == key and count_fits() == fits
+    body.revisionId = '2'
+    compute_feature_body('turned', [body], feature_values, selection_bounds, compute_cache)
+    ok &= count_fits() == fits + 1
+
+    print(f'oriented compute: {"ok" if ok else "MISMATCH"}')
+    return ok
+
+
+def main():
+    commands.CageGeometry.fit_oriented_box = counted_fit
+    results = [check_fits(), check_compute()]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
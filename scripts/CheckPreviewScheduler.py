@@ -0,0 +1,98 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckPreviewScheduler.py                                                    ~
+#  Replays bursts of preview events against the preview scheduler on a fake    ~
+#  clock and checks the chosen levels and when an upgrade is asked for.        ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import sys
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+from commands.PreviewScheduler import PreviewScheduler, OUTLINE, SHELL, FULL
+
+# Seconds each preview level takes
+DURATIONS = {OUTLINE: 0.005, SHELL: 0.03, FULL: 0.2}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def event(scheduler: PreviewScheduler, clock: FakeClock, requested: int = FULL) -> int:
+    """One preview event: the preview advances the clock by the time its level takes."""
+    level = scheduler.choose_level(requested)
+
+    def preview():
+        clock.now += DURATIONS[level]
+
+    scheduler.measure(level, preview)
+    return level
+
+
+def check(name: str, actual, expected) -> bool:
+    ok = actual == expected
+    print(f'{name:>40} {str(actual):>8} {str(expected):>8}  {"ok" if ok else "MISMATCH"}')
+    return ok
+
+
+def main():
+    clock = FakeClock()
+    scheduler = PreviewScheduler(budget=0.05, burst_interval=0.15, idle_interval=0.3, clock=clock)
+
+    print(f"{'case':>40} {'actual':>8} {'expected':>8}  result")
+    results = [
+        check('first event gets the requested level', event(scheduler, clock), FULL),
+        check('no upgrade after the requested level', scheduler.needs_upgrade(), False),
+    ]
+
+    # Events 50 ms apart make a burst, the full preview is over budget so the shell is shown
+    clock.now += 0.05
+    results.append(check('burst degrades to the shell', event(scheduler, clock), SHELL))
+    clock.now += 0.05
+    results += [
+        check('burst keeps the shell', event(scheduler, clock), SHELL),
+        check('upgrade pending during the burst', scheduler.upgrade_pending(), True),
+        check('no upgrade during the burst', scheduler.needs_upgrade(), False),
+        check('idle delay after the last preview', round(scheduler.idle_delay(), 6), 0.3),
+    ]
+
+    clock.now += 0.2
+    results.append(check('no upgrade before the idle interval', scheduler.needs_upgrade(), False))
+    clock.now += 0.1
+    results += [
+        check('upgrade once idle', scheduler.needs_upgrade(), True),
+        check('idle delay once idle', scheduler.idle_delay(), 0.0),
+        check('upgraded event gets the full preview', event(scheduler, clock), FULL),
+        check('no upgrade after the full preview', scheduler.needs_upgrade(), False),
+    ]
+
+    # A shell that also goes over budget falls back to the outline
+    DURATIONS[SHELL] = 0.08
+    for _ in range(3):
+        clock.now += 0.05
+        event(scheduler, clock, SHELL)
+    clock.now += 0.05
+    results.append(check('slow shell degrades to the outline', event(scheduler, clock, SHELL), OUTLINE))
+
+    # While dragging the outline is requested, which needs no upgrade
+    clock.now += 0.05
+    event(scheduler, clock, OUTLINE)
+    clock.now += 1.0
+    results.append(check('no upgrade when the outline is requested', scheduler.needs_upgrade(), False))
+
+    scheduler.reset()
+    results += [
+        check('reset clears the pending upgrade', scheduler.upgrade_pending(), False),
+        check('reset starts without a burst', event(scheduler, clock, SHELL), SHELL),
+    ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
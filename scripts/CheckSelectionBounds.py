@@ -0,0 +1,64 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CheckSelectionBounds.py                                                     ~
+#  Checks the combined boxes of selections that share bodies through the body  ~
+#  store, against boxes combined from scratch, and counts the body lookups.    ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import sys
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH / 'fake_adsk'))
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+import adsk.fusion
+from adsk.recording import recorder
+
+from commands.CageGeometry import SelectionBounds, b_box_from_points, b_box_points, body_bounds_store
+
+
+def make_body(name: str, low: float, high: float, revision: int = 1) -> adsk.fusion.BRepBody:
+    return adsk.fusion.BRepBody(bounding_box=b_box_from_points([low] * 3, [high] * 3),
+                                entity_token=name, revision_id=str(revision))
+
+
+def grow(body: adsk.fusion.BRepBody, low: float, high: float):
+    """The same body after an edit, with a new revision."""
+    body._bounding_box = b_box_from_points([low] * 3, [high] * 3)
+    body.revisionId = str(int(body.revisionId) + 1)
+
+
+def check(name: str, b_box, low: float, high: float, lookups: int) -> bool:
+    b_min, b_max = b_box_points(b_box)
+    queried = recorder.calls['BRepBody.boundingBox']
+    ok = list(b_min) == [low] * 3 and list(b_max) == [high] * 3 and queried == lookups
+    print(f'{name:>36} {b_min[0]:>6.1f} {b_max[0]:>6.1f} {queried:>8}  {"ok" if ok else "MISMATCH"}')
+    recorder.reset()
+    return ok
+
+
+def main():
+    body_bounds_store.clear()
+    a, b, c = make_body('a', 0, 2), make_body('b', 1, 3), make_body('c', 5, 6)
+    first, second = SelectionBounds(), SelectionBounds()
+
+    print(f"{'case':>36} {'min':>6} {'max':>6} {'lookups':>8}  result")
+    results = [
+        check('first selection', first.b_box([a, b]), 0, 3, 2),
+        check('second selection shares a', second.b_box([a]), 0, 2, 0),
+    ]
+
+    grow(a, -4, 2)
+    results += [
+        check('a grew, seen by first', first.b_box([a, b]), -4, 3, 1),
+        check('a grew, seen by second', second.b_box([a]), -4, 2, 0),
+        check('unchanged', second.b_box([a]), -4, 2, 0),
+        check('extended by c', first.extend([c]), -4, 6, 1),
+        check('c removed', first.b_box([a, b]), -4, 3, 0),
+        check('a removed', first.b_box([b]), 1, 3, 0),
+    ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
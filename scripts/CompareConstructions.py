@@ -0,0 +1,119 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  CompareConstructions.py                                                     ~
+#  Checks that the 'subtract' and 'bars' cage constructions give the same      ~
+#  geometry and counts the primitives and booleans each one needs.  Runs       ~
+#  outside of Fusion 360 against the stand-in in scripts/fake_adsk.            ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_PATH / 'fake_adsk'))
+sys.path.insert(0, str(SCRIPTS_PATH.parent))
+
+import adsk.core
+from adsk.recording import recorder
+
+from commands.CageLayout import FeatureValues, PATTERNS, bar_face_rows, gap_face_rows, other_axes, shell_slabs
+from commands.CageGeometry import create_cage_body, CONSTRUCTIONS
+
+
+SIZES = [(3.0, 3.0, 3.0), (10.0, 6.0, 4.0), (20.0, 20.0, 10.0)]
+# (gap, bar) pairs, including one where the walls get no holes at all
+SPACINGS = [(1.0, 0.2), (0.5, 0.3), (1.3, 0.25), (10.0, 0.2)]
+THICKNESS = 0.2
+
+
+def box_ranges(rows: np.ndarray, axis: int) -> np.ndarray:
+    return np.column_stack([rows[:, axis] - rows[:, 3 + axis] / 2, rows[:, axis] + rows[:, 3 + axis] / 2])
+
+
+def inside(box: np.ndarray, rows: np.ndarray) -> bool:
+    """Whether every row lies inside box."""
+    return bool(np.all(
+        (rows[:, :3] - rows[:, 3:] / 2 >= box[:3] - box[3:] / 2 - 1e-9) &
+        (rows[:, :3] + rows[:, 3:] / 2 <= box[:3] + box[3:] / 2 + 1e-9)
+    ))
+
+
+def covered(cells_u: np.ndarray, cells_v: np.ndarray, rows: np.ndarray, u: int, v: int) -> np.ndarray:
+    """Which cells (u x v) any of the rows covers."""
+    if len(rows) == 0:
+        return np.zeros((len(cells_u), len(cells_v)), dtype=bool)
+    range_u, range_v = box_ranges(rows, u), box_ranges(rows, v)
+    in_u = (cells_u[:, None] > range_u[None, :, 0]) & (cells_u[:, None] < range_u[None, :, 1])
+    in_v = (cells_v[:, None] > range_v[None, :, 0]) & (cells_v[:, None] < range_v[None, :, 1])
+    return (in_u.astype(np.int32) @ in_v.T.astype(np.int32)) > 0
+
+
+def cell_centers(*ranges: np.ndarray) -> np.ndarray:
+    """Centers of the cells between all distinct box boundaries, which makes the comparison exact."""
+    bounds = np.unique(np.concatenate([r.ravel() for r in ranges]).round(9))
+    return (bounds[:-1] + bounds[1:]) / 2
+
+
+def compare_geometry(min_point, max_point, feature_values: FeatureValues) -> list:
+    """Differences between the two constructions, as messages.  Empty when they match."""
+    slabs = shell_slabs(min_point, max_point, feature_values.shell_thickness)
+    problems = []
+    for face_index, (cutters, bars) in enumerate(zip(gap_face_rows(min_point, max_point, feature_values),
+                                                     bar_face_rows(min_point, max_point, feature_values))):
+        slab = slabs[face_index]
+        cutters = cutters.reshape(-1, 6)
+        axis = face_index // 2
+        u, v = other_axes(axis)
+
+        # Both constructions stay in their wall, so each wall can be compared on its own
+        if not inside(slab, bars) or not inside(slab, cutters):
+            problems.append(f'face {face_index}: bars or cutters leave the wall')
+            continue
+
+        cells_u = cell_centers(box_ranges(slab[None, :], u), box_ranges(cutters, u), box_ranges(bars, u))
+        cells_v = cell_centers(box_ranges(slab[None, :], v), box_ranges(cutters, v), box_ranges(bars, v))
+        subtracted = ~covered(cells_u, cells_v, cutters, u, v)
+        added = covered(cells_u, cells_v, bars, u, v)
+        mismatches = int((subtracted != added).sum())
+        if mismatches:
+            problems.append(f'face {face_index}: {mismatches} cells differ')
+    return problems
+
+
+def count_calls(b_box, feature_values: FeatureValues, construction: str) -> dict:
+    recorder.reset()
+    create_cage_body(b_box, feature_values, construction=construction)
+    return {
+        'boxes': recorder.calls['TemporaryBRepManager.createBox'] + recorder.calls['TemporaryBRepManager.copy'],
+        'booleans': recorder.calls['TemporaryBRepManager.booleanOperation'],
+        'simulated_seconds': recorder.cost,
+    }
+
+
+def main():
+    failures = 0
+    print(f"{'size':>16} {'gap':>5} {'bar':>5} {'pattern':>8} {'construction':>12} "
+          f"{'boxes':>6} {'booleans':>9} {'simulated s':>12}")
+    for size, (gap, bar), pattern in itertools.product(SIZES, SPACINGS, PATTERNS):
+        feature_values = FeatureValues(THICKNESS, bar, gap, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, pattern)
+        min_point, max_point = (0.0, 0.0, 0.0), size
+
+        problems = compare_geometry(min_point, max_point, feature_values)
+        for problem in problems:
+            print(f'MISMATCH {size} gap {gap} bar {bar} {pattern}: {problem}')
+        failures += bool(problems)
+
+        b_box = adsk.core.BoundingBox3D.create(adsk.core.Point3D.create(*min_point), adsk.core.Point3D.create(*size))
+        for construction in CONSTRUCTIONS:
+            calls = count_calls(b_box, feature_values, construction)
+            print(f"{str(size):>16} {gap:>5} {bar:>5} {pattern:>8} {construction:>12} "
+                  f"{calls['boxes']:>6} {calls['booleans']:>9} {calls['simulated_seconds']:>12.4f}")
+
+    print(f'\n{failures} cases with different geometry')
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#  StartupTiming.py                                                            ~
+#  Reports the import cost of every module in commands/, each measured in a    ~
+#  fresh interpreter, and which of them the add-in imports at startup.         ~
+#  Runs outside of Fusion 360 against the stand-ins in scripts/fake_adsk, with ~
+#  the modules imported through the add-in package and apper stubbed.         ~
+#  Registration is timed inside Fusion 360: set INSTRUMENTATION in config.py   ~
+#  and look for the startup_* and lazy_* spans in the exported trace.          ~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).resolve().parent
+ROOT_PATH = SCRIPTS_PATH.parent
+
+# Modules FusionBoxer.py imports when Fusion 360 loads the add-in, everything else is deferred
+STARTUP_MODULES = ['config', 'commands.Instrumentation', 'commands.LazyCommands']
+
+# The add-in modules import each other relative to the add-in package
+PACKAGE = 'FusionBoxer'
+
+IMPORT_SCRIPT = '''
+import sys, time, types
+sys.path[:0] = [{fake!r}]
+package = types.ModuleType({package!r})
+package.__path__ = [{root!r}]
+sys.modules[{package!r}] = package
+
+import apper
+apper_package = types.ModuleType({package!r} + '.apper')
+apper_package.__path__ = []
+apper_package.apper = apper
+sys.modules[{package!r} + '.apper'] = apper_package
+sys.modules[{package!r} + '.apper.apper'] = apper
+
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+'''
+
+IMPORT_TIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+def command_modules() -> list:
+    return sorted(f'commands.{path.stem}' for path in (ROOT_PATH / 'commands').glob('*.py') if path.stem != '__init__')
+
+
+def time_import(module: str) -> dict:
+    """Import ``module`` in a fresh interpreter and return its wall time and the slowest modules it pulled in."""
+    qualified_name = f'{PACKAGE}.{module}'
+    script = IMPORT_SCRIPT.format(
+        fake=str(SCRIPTS_PATH / 'fake_adsk'), root=str(ROOT_PATH), package=PACKAGE, module=qualified_name
+    )
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], capture_output=True, text=True)
+
+    if process.returncode != 0:
+        errors = '\n'.join(line for line in process.stderr.splitlines() if not line.startswith('import time:'))
+        raise RuntimeError(f'Importing {module} failed:\n{errors}')
+
+    imports = []
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            if len(indent) <= 3 and name != qualified_name:
+                imports.append({'module': name, 'self_seconds': int(self_us) / 1e6,
+                                'cumulative_seconds': int(cumulative_us) / 1e6})
+
+    imports.sort(key=lambda item: -item['cumulative_seconds'])
+    return {'module': module, 'seconds': float(process.stdout.strip().splitlines()[-1]), 'imports': imports[:5]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import cost of every FusionBoxer module.')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = [time_import(module) for module in ['config'] + command_modules()]
+
+    print(f"{'module':>36} {'startup':>8} {'ms':>9}  slowest imports")
+    for result in results:
+        startup = 'yes' if result['module'] in STARTUP_MODULES else ''
+        slowest = ', '.join(
+            f"{item['module']} {item['cumulative_seconds'] * 1000:.1f}" for item in result['imports'][:3]
+        )
+        print(f"{result['module']:>36} {startup:>8} {result['seconds'] * 1000:>9.1f}  {slowest}")
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
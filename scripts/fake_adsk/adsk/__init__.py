@@ -0,0 +1,10 @@
+"""Minimal stand-in for the Fusion 360 ``adsk`` package.
+
+Only covers the API used by the FusionBoxer geometry code so it can be run and
+benchmarked outside of Fusion 360.  Add ``scripts/fake_adsk`` to ``sys.path``
+before importing any FusionBoxer module.  Calls are counted and costed on
+``adsk.recording.recorder``.
+"""
+from . import recording
+from . import core
+from . import fusion
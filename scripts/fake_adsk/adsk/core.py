@@ -0,0 +1,165 @@
+import math
+
+from .recording import recorder
+
+
+class Point3D:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        recorder.record('Point3D.create')
+        return Point3D(x, y, z)
+
+    def copy(self):
+        return Point3D(self.x, self.y, self.z)
+
+    def translateBy(self, vector):
+        self.x += vector.x
+        self.y += vector.y
+        self.z += vector.z
+        return True
+
+    def asArray(self):
+        return [self.x, self.y, self.z]
+
+
+class Vector3D:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        recorder.record('Vector3D.create')
+        return Vector3D(x, y, z)
+
+    def copy(self):
+        return Vector3D(self.x, self.y, self.z)
+
+    @property
+    def length(self):
+        return math.sqrt(self.x ** 2 + self.y ** 2 + self.z ** 2)
+
+    def normalize(self):
+        length = self.length
+        if length == 0:
+            return False
+        self.scaleBy(1 / length)
+        return True
+
+    def scaleBy(self, scale):
+        self.x *= scale
+        self.y *= scale
+        self.z *= scale
+        return True
+
+    def asArray(self):
+        return [self.x, self.y, self.z]
+
+
+class BoundingBox3D:
+    def __init__(self, min_point, max_point):
+        self.minPoint = min_point.copy()
+        self.maxPoint = max_point.copy()
+
+    @staticmethod
+    def create(min_point, max_point):
+        recorder.record('BoundingBox3D.create')
+        return BoundingBox3D(min_point, max_point)
+
+    def copy(self):
+        return BoundingBox3D(self.minPoint, self.maxPoint)
+
+    def contains(self, point):
+        return all(
+            getattr(self.minPoint, a) <= getattr(point, a) <= getattr(self.maxPoint, a) for a in 'xyz'
+        )
+
+    def expand(self, point):
+        for a in 'xyz':
+            setattr(self.minPoint, a, min(getattr(self.minPoint, a), getattr(point, a)))
+            setattr(self.maxPoint, a, max(getattr(self.maxPoint, a), getattr(point, a)))
+        return True
+
+    def combine(self, box):
+        self.expand(box.minPoint)
+        self.expand(box.maxPoint)
+        return True
+
+
+class OrientedBoundingBox3D:
+    def __init__(self, center_point, length_direction, width_direction, length, width, height):
+        self.centerPoint = center_point
+        self.lengthDirection = length_direction
+        self.widthDirection = width_direction
+        self.length = length
+        self.width = width
+        self.height = height
+
+    @staticmethod
+    def create(center_point, length_direction, width_direction, length, width, height):
+        recorder.record('OrientedBoundingBox3D.create')
+        return OrientedBoundingBox3D(center_point, length_direction, width_direction, length, width, height)
+
+    def copy(self):
+        return OrientedBoundingBox3D(
+            self.centerPoint.copy(), self.lengthDirection.copy(), self.widthDirection.copy(),
+            self.length, self.width, self.height
+        )
+
+
+class Matrix3D:
+    def __init__(self, values=None):
+        self.values = list(values) if values is not None else [
+            1.0, 0.0, 0.0, 0.0,
+            0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            0.0, 0.0, 0.0, 1.0
+        ]
+
+    @staticmethod
+    def create():
+        recorder.record('Matrix3D.create')
+        return Matrix3D()
+
+    def copy(self):
+        return Matrix3D(self.values)
+
+    def asArray(self):
+        return list(self.values)
+
+    def setWithArray(self, values):
+        self.values = list(values)
+        return True
+
+    @property
+    def translation(self):
+        return Vector3D(self.values[3], self.values[7], self.values[11])
+
+    @translation.setter
+    def translation(self, vector):
+        self.values[3] = vector.x
+        self.values[7] = vector.y
+        self.values[11] = vector.z
+
+
+# Types the add-in only names in annotations or derives from, so its command modules can be imported
+class Command:
+    pass
+
+
+class CommandInputs:
+    pass
+
+
+class CustomEventHandler:
+    pass
+
+
+class DropDownCommandInput:
+    pass
@@ -0,0 +1,169 @@
+import json
+
+from .recording import recorder
+
+
+class BooleanTypes:
+    DifferenceBooleanType = 0
+    IntersectionBooleanType = 1
+    UnionBooleanType = 2
+
+
+class BRepBody:
+    """Stand-in body that tracks how complex it has become.
+
+    Bodies used as selections can be given a bounding box, entity token and revision id, and
+    the vertices its tessellation returns as a flat ``[x0, y0, z0, x1, ...]`` list.
+    """
+
+    def __init__(self, face_count=6, lump_count=1, bounding_box=None, entity_token='', revision_id='',
+                 mesh_coordinates=None):
+        self.face_count = face_count
+        self.lump_count = lump_count
+        self._bounding_box = bounding_box
+        self.entityToken = entity_token
+        self.revisionId = revision_id
+        self.mesh_coordinates = mesh_coordinates
+
+    @property
+    def boundingBox(self):
+        recorder.record('BRepBody.boundingBox')
+        return self._bounding_box.copy()
+
+    @property
+    def meshManager(self):
+        return MeshManager(self)
+
+
+class TriangleMesh:
+    def __init__(self, coordinates):
+        self.nodeCoordinatesAsDouble = coordinates
+
+
+class MeshCalculator:
+    def __init__(self, body):
+        self._body = body
+        self.surfaceTolerance = 0.0
+
+    def calculate(self):
+        recorder.record('MeshCalculator.calculate', self._body.face_count)
+        return TriangleMesh(self._body.mesh_coordinates)
+
+
+class MeshManager:
+    def __init__(self, body):
+        self._body = body
+
+    def createMeshCalculator(self):
+        return MeshCalculator(self._body)
+
+
+class BRepBodies(list):
+    @property
+    def count(self):
+        return len(self)
+
+    def item(self, index):
+        return self[index]
+
+
+class CustomFeatureDependency:
+    def __init__(self, collection, dependency_id, entity):
+        self._collection = collection
+        self.id = dependency_id
+        self.entity = entity
+
+    def deleteMe(self):
+        recorder.record('CustomFeatureDependency.deleteMe')
+        self._collection.remove(self)
+        return True
+
+
+class CustomFeatureDependencies(list):
+    """Stand-in dependency collection.  Ids must be unique, as in Fusion 360."""
+
+    @property
+    def count(self):
+        return len(self)
+
+    def item(self, index):
+        return self[index]
+
+    def itemById(self, dependency_id):
+        return next((dependency for dependency in self if dependency.id == dependency_id), None)
+
+    def add(self, dependency_id, entity):
+        recorder.record('CustomFeatureDependencies.add')
+        if self.itemById(dependency_id) is not None:
+            raise RuntimeError(f'Dependency id {dependency_id} is already used')
+        dependency = CustomFeatureDependency(self, dependency_id, entity)
+        self.append(dependency)
+        return dependency
+
+
+class TemporaryBRepManager:
+    """Records every call on ``adsk.recording.recorder``.
+
+    Booleans are charged for the face count of both operands, which approximates how the
+    real modeler re-evaluates the target on every operation.
+    """
+    _instance = None
+
+    @staticmethod
+    def get():
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    def createBox(self, o_box):
+        recorder.record('TemporaryBRepManager.createBox')
+        return BRepBody()
+
+    def copy(self, body):
+        recorder.record('TemporaryBRepManager.copy', body.face_count)
+        return BRepBody(body.face_count, body.lump_count)
+
+    def transform(self, body, matrix):
+        recorder.record('TemporaryBRepManager.transform')
+        return True
+
+    def exportToFile(self, bodies, filename):
+        recorder.record('TemporaryBRepManager.exportToFile', sum(body.face_count for body in bodies))
+        with open(filename, 'w') as body_file:
+            json.dump([[body.face_count, body.lump_count] for body in bodies], body_file)
+        return True
+
+    def createFromFile(self, filename):
+        with open(filename) as body_file:
+            bodies = BRepBodies(BRepBody(face_count, lump_count) for face_count, lump_count in json.load(body_file))
+        recorder.record('TemporaryBRepManager.createFromFile', sum(body.face_count for body in bodies))
+        return bodies
+
+    def booleanOperation(self, target, tool, boolean_type):
+        recorder.record('TemporaryBRepManager.booleanOperation', target.face_count + tool.face_count)
+        recorder.calls[f'TemporaryBRepManager.booleanOperation.{boolean_type}'] += 1
+        target.face_count += tool.face_count
+        if boolean_type == BooleanTypes.UnionBooleanType:
+            target.lump_count += tool.lump_count
+        return True
+
+
+class ShellFeatureInput:
+    pass
+
+
+# Types the add-in only names in annotations or derives from, so its command modules can be imported
+class BaseFeature:
+    pass
+
+
+class CustomFeature:
+    pass
+
+
+class CustomFeatureEventArgs:
+    pass
+
+
+class ShellFeature:
+    pass
@@ -0,0 +1,56 @@
+"""Call recording and cost model for the stand-in ``adsk`` package.
+
+Every stand-in API call is counted on ``recorder``.  The cost model assigns an assumed time
+in seconds to each call, plus a per-face part for BRep operations, so a benchmark can report
+how long the same calls might take in Fusion 360.  The defaults are rough guesses; measure
+real values with scripts/BenchmarkCutters.py inside Fusion and pass them to ``configure``.
+"""
+from collections import Counter
+
+
+DEFAULT_COSTS = {
+    'Point3D.create': 2e-6,
+    'Vector3D.create': 2e-6,
+    'BoundingBox3D.create': 4e-6,
+    'OrientedBoundingBox3D.create': 5e-6,
+    'Matrix3D.create': 2e-6,
+    'BRepBody.boundingBox': 20e-6,
+    'MeshCalculator.calculate': 5e-3,
+    'MeshCalculator.calculate.per_face': 50e-6,
+    'TemporaryBRepManager.createBox': 150e-6,
+    'TemporaryBRepManager.copy': 40e-6,
+    'TemporaryBRepManager.copy.per_face': 2e-6,
+    'TemporaryBRepManager.transform': 30e-6,
+    'TemporaryBRepManager.exportToFile': 2e-3,
+    'TemporaryBRepManager.exportToFile.per_face': 5e-6,
+    'TemporaryBRepManager.createFromFile': 2e-3,
+    'TemporaryBRepManager.createFromFile.per_face': 5e-6,
+    'TemporaryBRepManager.booleanOperation': 500e-6,
+    'TemporaryBRepManager.booleanOperation.per_face': 10e-6,
+    'CustomFeatureDependencies.add': 50e-6,
+    'CustomFeatureDependency.deleteMe': 50e-6,
+}
+
+
+class Recorder:
+    def __init__(self, costs: dict = None):
+        self.calls = Counter()
+        self.cost = 0.0
+        self.costs = dict(DEFAULT_COSTS if costs is None else costs)
+
+    def configure(self, costs: dict):
+        self.costs.update(costs)
+
+    def record(self, name: str, faces: int = 0):
+        self.calls[name] += 1
+        self.cost += self.costs.get(name, 0.0) + faces * self.costs.get(name + '.per_face', 0.0)
+
+    def reset(self):
+        self.calls.clear()
+        self.cost = 0.0
+
+    def snapshot(self) -> dict:
+        return {'calls': dict(self.calls), 'simulated_seconds': self.cost}
+
+
+recorder = Recorder()
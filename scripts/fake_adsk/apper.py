@@ -0,0 +1,14 @@
+"""Stand-in for the apper submodule, with the base classes the add-in derives from at import time."""
+
+
+class Fusion360CommandBase:
+    def __init__(self, name: str, options: dict):
+        self.name = name
+        self.options = options
+
+
+class Fusion360CustomFeatureBase:
+    def __init__(self, name: str, options: dict):
+        self.name = name
+        self.options = options
+        self.definition = None